@@ -0,0 +1,7 @@
+# Add the parent directory of the tests (the root of the repository) to the Python path,
+# so that the converters can be imported by the tests
+import sys
+import os
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))  # Get the directory of the current script
+sys.path.append(os.path.dirname(SCRIPT_DIR))  # Add the parent directory to the Python path
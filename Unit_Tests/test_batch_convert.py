@@ -0,0 +1,121 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import batch_convert as batch_convert_module
+from batch_convert import batch_convert, collect_inputs, convert_file, output_path_for
+from mps_to_matrix import parse_mps_file
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS_DIR = os.path.join(REPO_DIR, "Test_Datasets")
+
+
+def test_collect_inputs(tmp_path: Path) -> None:
+    for name in ("a.mps", "b.txt", "c.csv"):
+        (tmp_path / name).write_text("")
+
+    assert collect_inputs([str(tmp_path)]) == [str(tmp_path / "a.mps"), str(tmp_path / "b.txt")]
+    assert collect_inputs([str(tmp_path / "*.mps"), str(tmp_path / "a.mps")]) == [str(tmp_path / "a.mps")]
+    assert collect_inputs([str(tmp_path)], [".txt"]) == [str(tmp_path / "b.txt")]
+
+
+def test_output_path_for() -> None:
+    assert output_path_for(os.path.join("in", "x.mps")) == os.path.join("in", "x.txt")
+    assert output_path_for(os.path.join("in", "x.txt"), "out") == os.path.join("out", "x.mps")
+
+
+def test_batch_convert_round_trip(tmp_path: Path) -> None:
+    source = tmp_path / "ex1.mps"
+    shutil.copy(os.path.join(DATASETS_DIR, "ex1.mps"), source)
+
+    # .mps -> .txt into a target directory, then the .txt back to .mps next to it
+    [to_txt] = batch_convert([str(source)], str(tmp_path / "out"), workers=2, report=False)
+    assert to_txt.error is None and os.path.isfile(to_txt.output_path)
+    [to_mps] = batch_convert([to_txt.output_path], workers=1, report=False)
+    assert to_mps.error is None
+
+    original = parse_mps_file(str(source))
+    converted = parse_mps_file(to_mps.output_path)
+    assert np.array_equal(original["A"].toarray(), converted["A"].toarray())
+    assert np.array_equal(original["b"], converted["b"])
+
+
+def test_batch_convert_second_run(tmp_path: Path) -> None:
+    shutil.copy(os.path.join(DATASETS_DIR, "ex1.mps"), tmp_path / "ex1.mps")
+    original = (tmp_path / "ex1.mps").read_bytes()
+    [first] = batch_convert(collect_inputs([str(tmp_path)]), workers=1, report=False)
+    assert first.error is None and first.skipped is None
+
+    # A second run over the directory sees ex1.mps and ex1.txt: the .txt is the output of the older .mps
+    to_txt, to_mps = batch_convert(collect_inputs([str(tmp_path)]), workers=1, report=False)
+    assert to_txt.input_path.endswith("ex1.mps") and "already exists" in str(to_txt.skipped)
+    assert to_mps.skipped == f"Skipped: the output of {tmp_path / 'ex1.mps'}"
+    assert to_txt.error is None and to_mps.error is None
+
+    # With force the .mps is converted again, the original is never overwritten
+    to_txt, to_mps = batch_convert(collect_inputs([str(tmp_path)]), workers=1, report=False, force=True)
+    assert to_txt.skipped is None and to_txt.error is None and to_mps.skipped is not None
+    assert (tmp_path / "ex1.mps").read_bytes() == original
+
+    # An input whose output is another input is skipped
+    (tmp_path / "out").mkdir()
+    shutil.copy(tmp_path / "ex1.txt", tmp_path / "out" / "ex1.txt")
+    skipped, converted = batch_convert([str(tmp_path / "ex1.mps"), str(tmp_path / "out" / "ex1.txt")],
+                                       str(tmp_path / "out"), workers=1, report=False)
+    assert "is also an input" in str(skipped.skipped) and converted.error is None
+
+    # Two inputs with the same output fail
+    (tmp_path / "other").mkdir()
+    shutil.copy(os.path.join(DATASETS_DIR, "ex1.mps"), tmp_path / "other" / "ex1.mps")
+    results = batch_convert([str(tmp_path / "ex1.mps"), str(tmp_path / "other" / "ex1.mps")], str(tmp_path / "new"),
+                            workers=1, report=False)
+    assert all("output of another input" in str(result.error) for result in results)
+    assert not os.path.exists(tmp_path / "new" / "ex1.txt")
+
+
+def test_main_second_run(tmp_path: Path) -> None:
+    # Running the documented command twice over a directory succeeds both times
+    for name in ("ex1.mps", "Lp01.txt"):
+        shutil.copy(os.path.join(DATASETS_DIR, name), tmp_path / name)
+    command = [sys.executable, os.path.join(REPO_DIR, "batch_convert.py"), str(tmp_path), "-j", "1"]
+    first = subprocess.run(command, capture_output=True, text=True)
+    second = subprocess.run(command, capture_output=True, text=True)
+    assert first.returncode == 0 and "Converted 2 of 2 files" in first.stdout
+    assert second.returncode == 0 and "Converted 0 of 4 files" in second.stdout
+    assert "(4 skipped, 0 failed)" in second.stdout
+
+
+def exit_on_broken(input_path: str, output_path: str, layout: str = "dense") -> batch_convert_module.ConversionResult:
+    # Kills the worker process like the out of memory killer would
+    if "broken" in input_path:
+        os._exit(1)
+    return convert_file(input_path, output_path, layout)
+
+
+def test_batch_convert_worker_dies(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "broken.mps").write_text("")
+    monkeypatch.setattr(batch_convert_module, "convert_file", exit_on_broken)
+
+    # The failure is returned, not raised
+    [result] = batch_convert([str(tmp_path / "broken.mps")], workers=1, report=False)
+    assert result.output_path == str(tmp_path / "broken.txt")
+    assert result.error is not None and "BrokenProcessPool" in result.error
+
+
+def test_convert_file_reports_failures(tmp_path: Path) -> None:
+    source = tmp_path / "broken.mps"
+    source.write_text("NAME broken\nROWS\n N COST\nCOLUMNS\n X1 UNKNOWN 1.0\nENDATA\n")
+
+    result = convert_file(str(source), str(tmp_path / "broken.txt"))
+    assert result.error is not None and "KeyError" in result.error
+    assert not os.path.exists(tmp_path / "broken.txt")
+
+
+def test_import_does_not_load_tkinter() -> None:
+    code = "import sys, batch_convert; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR).returncode == 0
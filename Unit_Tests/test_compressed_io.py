@@ -0,0 +1,83 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pytest
+
+import compressed_io
+import mps_to_matrix
+from batch_convert import convert_file, output_path_for
+from compressed_io import detect_compression, open_input
+from lp_generator import LPSpec, write_mps
+from matrix_to_mps import parse_file, save_mps_file
+from mps_to_matrix import parse_mps_file, save_txt_file
+from parse_stats import ParseStats
+
+SPEC = LPSpec(30, 80, density=0.1, bound_mix=(("UP", 0.3), ("FR", 0.1)), seed=3)
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+
+def test_detect_compression(tmp_path: Path) -> None:
+    (tmp_path / "model.mps").write_bytes(b"NAME\n")
+    (tmp_path / "model").write_bytes(lzma.compress(b"NAME\n"))
+    (tmp_path / "model.MPS.GZ").write_bytes(b"")
+    assert detect_compression(str(tmp_path / "model.mps")) is None
+    assert detect_compression(str(tmp_path / "model")) == "xz"
+    assert detect_compression(str(tmp_path / "model.MPS.GZ")) == "gzip"
+
+
+def test_reader_seek_back(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # Small blocks, so that reads, lines and seeks cross block boundaries
+    monkeypatch.setattr(compressed_io, "DECOMPRESS_BLOCK_SIZE", 7)
+    data = b"".join(b"line %d\n" % i for i in range(100))
+    (tmp_path / "data.gz").write_bytes(gzip.compress(data))
+
+    with open_input(str(tmp_path / "data.gz")) as file:
+        assert file.read(20) == data[:20]
+        assert file.readline() == data[20:data.index(b"\n", 20) + 1]
+        position = file.tell()
+        file.seek(-15, os.SEEK_CUR)
+        assert file.tell() == position - 15
+        assert file.read(30) == data[position - 15:position + 15]
+        with pytest.raises(io.UnsupportedOperation):
+            file.seek(10, os.SEEK_CUR)
+        assert b"".join(file) == data[position + 15:]
+
+
+@pytest.mark.parametrize("extension", list(COMPRESSORS))
+def test_compressed_round_trip(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, extension: str) -> None:
+    monkeypatch.setattr(compressed_io, "DECOMPRESS_BLOCK_SIZE", 1000)
+    monkeypatch.setattr(mps_to_matrix, "COLUMNS_CHUNK_SIZE", 500)
+    write_mps(str(tmp_path / "model.mps"), SPEC)
+    (tmp_path / ("model.mps" + extension)).write_bytes(COMPRESSORS[extension]((tmp_path / "model.mps").read_bytes()))
+    expected = parse_mps_file(str(tmp_path / "model.mps"))
+
+    # Compressed .mps -> compressed .txt -> compressed .mps, each read the same as the plain file
+    parsed = parse_mps_file(str(tmp_path / ("model.mps" + extension)), workers=2)
+    save_txt_file(str(tmp_path / ("model.txt" + extension)), **parsed, layout="triplets")
+    stats = ParseStats()
+    loaded = parse_file(str(tmp_path / ("model.txt" + extension)), stats=stats)
+    assert stats["A"].nonzeros == expected["A"].nnz
+    save_mps_file(str(tmp_path / ("saved.mps" + extension)), **loaded)  # type: ignore
+    assert detect_compression(str(tmp_path / ("saved.mps" + extension))) == compressed_io.COMPRESSION_EXTENSIONS[extension]
+
+    for model in (parsed, loaded, parse_mps_file(str(tmp_path / ("saved.mps" + extension)))):
+        assert (model["A"] != expected["A"]).nnz == 0
+        assert np.array_equal(model["b"], expected["b"])
+        assert model["Bounds"] == expected["Bounds"]
+    assert set(parse_file(str(tmp_path / ("model.txt" + extension)), sections=["b", "c"])) == {"b", "c"}
+
+
+def test_convert_compressed(tmp_path: Path) -> None:
+    write_mps(str(tmp_path / "model.mps"), SPEC)
+    (tmp_path / "model.mps.gz").write_bytes(gzip.compress((tmp_path / "model.mps").read_bytes()))
+
+    output_path = output_path_for(str(tmp_path / "model.mps.gz"))
+    assert output_path == str(tmp_path / "model.txt.gz")
+    assert convert_file(str(tmp_path / "model.mps.gz"), output_path).error is None
+    assert np.array_equal(parse_file(output_path)["c"], parse_mps_file(str(tmp_path / "model.mps"))["c"])
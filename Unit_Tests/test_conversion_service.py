@@ -0,0 +1,110 @@
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from conversion_service import ConversionService, send_requests
+from mps_to_matrix import parse_mps_file
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+
+
+def copy_datasets(tmp_path: Path, *file_names: str) -> list[str]:
+    for file_name in file_names:
+        shutil.copy(os.path.join(DATASETS_DIR, file_name), tmp_path / file_name)
+    return [str(tmp_path / file_name) for file_name in file_names]
+
+
+def test_service_bounded_concurrency(tmp_path: Path) -> None:
+    inputs = copy_datasets(tmp_path, "ex1.mps", "afiro.mps", "sc205-2r-8.mps")
+    service = ConversionService(workers=2, max_in_flight=1, output_dir=str(tmp_path / "out"))
+
+    async def run() -> list[Any]:
+        return await asyncio.gather(*(service.convert(path) for path in inputs))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        service.close()
+
+    assert all(result.error is None for result in results)
+    assert os.path.isfile(tmp_path / "out" / "afiro.txt")
+    stats = service.stats.snapshot()
+    assert stats["peak_in_flight"] == 1 and stats["completed"] == 3 and stats["queue_depth"] == 0
+    assert stats["latency_max"] >= stats["latency_p50"] > 0
+
+
+def test_service_over_unix_socket(tmp_path: Path) -> None:
+    [source] = copy_datasets(tmp_path, "ex1.mps")
+    (tmp_path / "broken.mps").write_text("NAME broken\nROWS\n N COST\nCOLUMNS\n X1 UNKNOWN 1.0\nENDATA\n")
+    socket_path = str(tmp_path / "service.sock")
+    service = ConversionService(workers=1)
+
+    async def run() -> list[dict[str, Any]]:
+        server = await service.serve(socket_path)
+        async with server:
+            requests: list[dict[str, Any]] = [
+                {"id": 1, "input": source, "output": str(tmp_path / "ex1.txt"), "layout": "triplets"},
+                {"id": 2, "input": str(tmp_path / "broken.mps")},
+                {"id": 3, "input": str(tmp_path / "model.csv")},
+                {"id": 4},
+                {"id": 6, "input": 5},
+                {"id": 7, "input": source, "layout": ["triplets"]},
+            ]
+            responses = [response async for response in send_requests(requests, socket_path)]
+            # A second connection sees the statistics of the first one
+            responses += [response async for response in send_requests([{"id": 5, "command": "stats"}], socket_path)]
+        return responses
+
+    try:
+        responses = {response["id"]: response for response in asyncio.run(run())}
+    finally:
+        service.close()
+
+    assert set(responses) == {1, 2, 3, 4, 5, 6, 7}
+    assert responses[1]["error"] is None and responses[1]["latency_seconds"] > 0
+    converted = (tmp_path / "ex1.txt").read_text()
+    assert converted.startswith("A_triplets=[ 5 8\n")
+    assert "UNKNOWN" in responses[2]["error"]
+    assert "model.csv" in responses[3]["error"] and "input" in responses[4]["error"]
+    assert responses[6]["error"] == "\"input\" must be a string, not 5"
+    assert responses[7]["error"] == "\"layout\" must be a string, not [\"triplets\"]"
+    assert responses[5]["stats"]["completed"] == 1 and responses[5]["stats"]["failed"] == 1
+
+    # The .txt file converts back through the service to the original model
+    service = ConversionService(workers=1)
+    try:
+        result = asyncio.run(service.convert(str(tmp_path / "ex1.txt")))
+    finally:
+        service.close()
+    assert result.error is None
+    assert np.array_equal(parse_mps_file(result.output_path)["A"].toarray(), parse_mps_file(source)["A"].toarray())
+
+
+def test_service_rejects_conflicting_requests(tmp_path: Path) -> None:
+    [source] = copy_datasets(tmp_path, "ex1.mps")
+    (tmp_path / "ex1.txt").write_text("not converted")
+    original = (tmp_path / "ex1.mps").read_bytes()
+    service = ConversionService(workers=1)
+
+    async def run() -> list[Any]:
+        # ex1.mps -> ex1.txt and ex1.txt -> ex1.mps overwrite each other's input, two conversions to the same
+        # output write the same file
+        return list(await asyncio.gather(service.convert(source), service.convert(str(tmp_path / "ex1.txt")),
+                                         service.convert(source, str(tmp_path / "copy.txt")),
+                                         service.convert(source, str(tmp_path / "copy.txt")), return_exceptions=True))
+
+    try:
+        results = asyncio.run(run())
+        # The files are free again once the conversions are done
+        later = asyncio.run(service.convert(source, str(tmp_path / "copy.txt")))
+    finally:
+        service.close()
+
+    assert results[0].error is None and results[2].error is None and later.error is None
+    assert isinstance(results[1], ValueError) and isinstance(results[3], ValueError)
+    assert "conflicts with a conversion in progress" in str(results[1])
+    assert (tmp_path / "ex1.mps").read_bytes() == original
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import lp_generator
+from lp_generator import LPSpec, generate_model, write_mps, write_txt
+from matrix_to_mps import parse_file
+from mps_to_matrix import parse_mps_file
+
+SPEC = LPSpec(40, 60, density=0.1, objective_density=0.5, bound_mix=(("UP", 0.3), ("FX", 0.1), ("FR", 0.1)),
+              ranges_fraction=0.2, maximize=True, seed=7)
+
+
+@pytest.mark.parametrize("block_entries", [1, 25, 1 << 20])
+def test_generated_files_round_trip(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, block_entries: int) -> None:
+    # The .mps and .txt files hold the model returned by generate_model, whatever the size of the blocks
+    monkeypatch.setattr(lp_generator, "GENERATE_BLOCK_ENTRIES", block_entries)
+    expected = generate_model(SPEC)
+    # The values have 2 decimals, which the files must keep
+    assert np.array_equal(np.round(expected["b"], 2), expected["b"])
+    assert not np.array_equal(np.round(expected["b"]), expected["b"]) and np.all(expected["A"].data != 0)
+    write_mps(str(tmp_path / "model.mps"), SPEC)
+    write_txt(str(tmp_path / "model.txt"), SPEC)
+
+    parsed = parse_mps_file(str(tmp_path / "model.mps"))
+    loaded = parse_file(str(tmp_path / "model.txt"))
+    models: list[dict] = [parsed, loaded]
+    for model in models:
+        assert model["A"].shape == (40, 60)
+        assert (model["A"] != expected["A"]).nnz == 0
+        assert np.array_equal(model["b"], expected["b"])
+        assert np.array_equal(model["c"], expected["c"])
+        assert np.array_equal(model["Eqin"], expected["Eqin"])
+        assert model["Bounds"] == expected["Bounds"]
+        assert model["MinMax"] == 1
+    assert "RANGES\n" in (tmp_path / "model.mps").read_text()
+    assert np.array_equal(parsed["ranges"], expected["ranges"], equal_nan=True)
+
+
+def test_generate_model_mix() -> None:
+    model = generate_model(LPSpec(200, 2000, density=0.02, objective_density=0.25, row_mix=(0.0, 1.0, 0.0)))
+
+    # Every column has an entry and about 2% of the rows, a quarter of the columns have a cost
+    A = model["A"].tocsc()
+    assert np.diff(A.indptr).min() >= 1
+    assert 3.0 < A.nnz / 2000 < 5.0
+    assert 0.2 < np.count_nonzero(model["c"]) / 2000 < 0.3
+    assert set(model["Eqin"]) == {0}
+    assert np.array_equal(generate_model(LPSpec(200, 2000, density=0.02))["A"].toarray(),
+                          generate_model(LPSpec(200, 2000, density=0.02))["A"].toarray())
+
+
+def test_invalid_spec(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        write_mps(str(tmp_path / "model.mps"), LPSpec(10, 10, density=2.0))
+    with pytest.raises(ValueError):
+        write_mps(str(tmp_path / "model.mps"), LPSpec(10, 10, bound_mix=(("XX", 0.1),)))
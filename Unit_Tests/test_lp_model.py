@@ -0,0 +1,97 @@
+import gzip
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+import lp_model
+from lp_model import LPModel
+from mps_to_matrix import parse_mps_file, save_txt_file
+from matrix_to_mps import parse_file
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_mps_model_scan(monkeypatch: pytest.MonkeyPatch, use_mmap: bool) -> None:
+    file_path = os.path.join(DATASETS_DIR, "afiro.mps")
+    expected = parse_mps_file(file_path)
+    model = LPModel(file_path, scan=True, use_mmap=use_mmap)
+
+    # The cheap queries never build A
+    with monkeypatch.context() as patch:
+        patch.setattr(lp_model, "parse_mps_file", None)
+        assert model.shape == expected["A"].shape and model.nnz == expected["A"].nnz
+        assert model.row_type_counts == {"L": 19, "E": 8, "G": 0}
+        assert model["c"] == expected["c"] and model["MinMax"] == expected["MinMax"]
+        assert model["row_names"] == expected["row_names"]
+    assert "A" not in model.loaded_keys
+
+    # The rest is parsed once, on first access
+    A = model["A"]
+    assert model["A"] is A and (A != expected["A"]).nnz == 0
+    assert np.array_equal(model["b"], expected["b"])
+
+
+def test_mps_model_single_parse(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Without `scan` the file is parsed once, for the cheap queries and A alike
+    file_path = os.path.join(DATASETS_DIR, "afiro.mps")
+    expected = parse_mps_file(file_path)
+    calls: list[str] = []
+
+    def counted_parse(path: str, **options: Any) -> dict:
+        calls.append(path)
+        return parse_mps_file(path, **options)
+
+    monkeypatch.setattr(lp_model, "parse_mps_file", counted_parse)
+    monkeypatch.setattr(lp_model, "MpsStream", None)
+    model = LPModel(file_path)
+    assert model.shape == expected["A"].shape and model.nnz == expected["A"].nnz
+    assert model.row_type_counts == {"L": 19, "E": 8, "G": 0}
+    assert (model["A"] != expected["A"]).nnz == 0 and np.array_equal(model["b"], expected["b"])
+    assert calls == [file_path]
+
+
+def test_mps_model_dict(tmp_path: Path) -> None:
+    # dict(model) is the dictionary of parse_mps_file, also for a compressed file
+    file_path = str(tmp_path / "ex1.mps.gz")
+    with open(os.path.join(DATASETS_DIR, "ex1.mps"), "rb") as source, gzip.open(file_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    expected = parse_mps_file(os.path.join(DATASETS_DIR, "ex1.mps"), A_format="csc")
+    parsed = dict(LPModel(file_path, A_format="csc"))
+
+    assert list(parsed) == list(expected)
+    assert parsed["A"].format == "csc" and (parsed["A"] != expected["A"]).nnz == 0
+    for key in ("MinMax", "c", "Eqin", "Bounds", "row_names", "col_names", "rhs_names", "obj_constant"):
+        assert parsed[key] == expected[key]
+    assert np.array_equal(parsed["ranges"], expected["ranges"], equal_nan=True)
+
+
+def test_txt_model_sections(tmp_path: Path) -> None:
+    parsed = parse_mps_file(os.path.join(DATASETS_DIR, "afiro.mps"))
+    save_txt_file(str(tmp_path / "afiro.txt"), **parsed, layout="triplets")
+    model = LPModel(str(tmp_path / "afiro.txt"))
+
+    # Only the sections asked for are loaded
+    assert model.shape == parsed["A"].shape
+    assert model.loaded_keys == ["c", "Eqin"]
+    assert model.nnz == parsed["A"].nnz and "A" in model.loaded_keys and "b" not in model.loaded_keys
+
+    expected = parse_file(str(tmp_path / "afiro.txt"))
+    loaded = dict(model)
+    assert set(loaded) == set(expected)
+    assert (loaded["A"] != expected["A"]).nnz == 0 and np.array_equal(loaded["b"], expected["b"])
+
+    with pytest.raises(KeyError):
+        model["unknown"]
+
+
+def test_txt_model_missing_section(tmp_path: Path) -> None:
+    (tmp_path / "model.txt").write_text("MinMax= -1\nc=[\n1 2\n]\n")
+    model = LPModel(str(tmp_path / "model.txt"))
+    assert model["c"].tolist() == [1, 2] and len(model["Bounds"]) == 0
+    with pytest.raises(ValueError, match="Eqin"):
+        model["Eqin"]
@@ -0,0 +1,277 @@
+import io
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import matrix_to_mps
+from matrix_to_mps import index_txt_sections, parse_A, parse_file, save_mps_file
+from mps_to_matrix import parse_mps_file, save_txt_file
+from parse_stats import ParseStats
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+
+SMALL_MPS = """NAME  LP_PROBLEM_NAME   (MAX)
+ROWS
+ L  ROW0
+ E  ROW1
+ G  ROW2
+ N  OBJ
+COLUMNS
+ COL0  ROW0  1.0  ROW1  2.5
+ COL0  ROW2  -1.0  OBJ  3
+ COL1  ROW1  4.0  ROW2  1e-07
+ COL1  OBJ  0.5
+ COL2  ROW0  -0.0
+ COL3  OBJ  -2
+RHS
+ RHS1  ROW0  2.0
+ RHS1  ROW2  7.5
+BOUNDS
+UP BND1  COL1  4
+FR BND1  COL3  \nENDATA"""  # A bound without value keeps the separator
+
+
+def test_save_mps_file_format(tmp_path: Path) -> None:
+    # Columns with 3 entries and a cost, 2 entries and a cost, an explicit -0.0 and no cost, and only a cost.
+    # The -0.0 is kept, and the int costs of a list are written as ints.
+    A = sparse.csc_array((np.array([1.0, 2.5, -1.0, 4.0, 1e-07, -0.0]), np.array([0, 1, 2, 1, 2, 0]),
+                          np.array([0, 3, 5, 6, 6])), shape=(3, 4))
+    output = tmp_path / "small.mps"
+    save_mps_file(str(output), 1, A, np.array([2.0, 0.0, 7.5]), [3, 0.5, 0, -2], np.array([-1.0, 0.0, 1.0]),
+                  ["UP 1 4", "FR 3 None"])
+
+    assert output.read_text() == SMALL_MPS
+
+
+@pytest.mark.parametrize("batch_entries", [1, 2, 5, 1 << 18])
+@pytest.mark.parametrize("file_name", ["ex1.mps", "afiro.mps", "sc205-2r-8.mps"])
+def test_save_mps_file_batches(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, file_name: str,
+                               batch_entries: int) -> None:
+    parsed = parse_mps_file(os.path.join(DATASETS_DIR, file_name))
+    parsed["A"] = sparse.csc_array(parsed["A"])
+    save_mps_file(str(tmp_path / "expected.mps"), **parsed)
+
+    # The batch size changes how the COLUMNS section is formatted, never what is written
+    monkeypatch.setattr(matrix_to_mps, "WRITE_BATCH_ENTRIES", batch_entries)
+    save_mps_file(str(tmp_path / "batched.mps"), **parsed)
+    assert (tmp_path / "batched.mps").read_bytes() == (tmp_path / "expected.mps").read_bytes()
+
+    # And the file parses back to the same model
+    reparsed = parse_mps_file(str(tmp_path / "batched.mps"))
+    assert (reparsed["A"] != parsed["A"]).nnz == 0
+    assert reparsed["c"] == parsed["c"]
+    assert np.array_equal(reparsed["b"], parsed["b"])
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+@pytest.mark.parametrize("file_name", ["ex1.mps", "afiro.mps", "sc205-2r-50.mps"])
+def test_save_mps_file_parallel(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, file_name: str, workers: int) -> None:
+    # The ranges formatted by the workers are written in order: the file is the one of a single process
+    parsed = parse_mps_file(os.path.join(DATASETS_DIR, file_name), A_format="csc")
+    num_cols = parsed["A"].shape[1]
+    parsed["integrality"] = np.arange(num_cols) % 7 < 3  # Runs of integer columns across the ranges
+    save_mps_file(str(tmp_path / "expected.mps"), **parsed)
+
+    monkeypatch.setattr(matrix_to_mps, "PARALLEL_WRITE_MIN_ENTRIES", 0)
+    monkeypatch.setattr(matrix_to_mps, "WRITE_BATCH_ENTRIES", 16)
+    save_mps_file(str(tmp_path / "parallel.mps"), **parsed, workers=workers)
+    assert (tmp_path / "parallel.mps").read_bytes() == (tmp_path / "expected.mps").read_bytes()
+    assert np.array_equal(parse_mps_file(str(tmp_path / "parallel.mps"))["integrality"], parsed["integrality"])
+
+
+def test_split_columns_by_entries() -> None:
+    indptr = np.array([0, 5, 5, 6, 20, 21])
+    assert matrix_to_mps._split_columns_by_entries(indptr, 3) == [(0, 3), (3, 5)]
+    assert matrix_to_mps._split_columns_by_entries(indptr, 100) == [(0, 2), (2, 3), (3, 4), (4, 5)]
+    assert matrix_to_mps._split_columns_by_entries(np.array([0, 0, 0]), 4) == [(0, 2)]
+
+
+def test_save_mps_file_markers_skip_empty_columns(tmp_path: Path) -> None:
+    # Columns without non-zeros are not written, the markers follow the integrality of the written columns
+    A = sparse.csc_array(np.array([[1.0, 0, 1, 0, 1, 0]]))
+    save_mps_file(str(tmp_path / "model.mps"), -1, A, [1.0], [0] * 6, [-1], [],
+                  integrality=np.array([True, True, True, False, False, True]))
+    columns = (tmp_path / "model.mps").read_text().split("COLUMNS\n")[1].split("RHS\n")[0]
+    assert columns == (matrix_to_mps.MARKER_INTORG + " COL0  ROW0  1.0\n COL2  ROW0  1.0\n"
+                       + matrix_to_mps.MARKER_INTEND + " COL4  ROW0  1.0\n")
+
+
+LP01_A = np.array([
+    [-2, 2, 7, 9, -1, -2, 6, 12],
+    [3, -3, 5, 1, 1, -1, 7, 8],
+    [9, 8, -2, 1, -1, 2, 3, -6],
+    [1, 2, -1, -1, 4, 6, 1, 8],
+    [2, -9, 10, 11, 9, -1, -1, -1],
+    [6, -9, 18, 1, -2, 1, 8, -2],
+])
+
+
+def test_parse_file_lp01() -> None:
+    # Tab separated, data on the header lines and "]" at the end of the last line
+    parsed = parse_file(os.path.join(DATASETS_DIR, "Lp01.txt"))
+
+    A = parsed["A"]
+    assert isinstance(A, sparse.csc_array)
+    assert np.array_equal(A.toarray(), LP01_A)
+    assert np.array_equal(parsed["b"], [90, 25, 10, 100, 30, 10])
+    assert np.array_equal(parsed["c"], [-3, -8, 5, 10, -20, 4, 11, -25])
+    assert np.array_equal(parsed["Eqin"], [-1, -1, 0, 1, 1, 0])
+    assert parsed["MinMax"] == 1
+    assert parsed["Bounds"] == ["LO 0 5", "UP 2 10", "FX 5 20", "UP 6 8", "FR 7 None"]
+
+
+@pytest.mark.parametrize("block_chars", [1, 10, 1 << 24])
+@pytest.mark.parametrize("head, body", [
+    ("", "  1.0  0.0  -2.5\n\n  0.0  0.0  0.0\n  3.0  0.0  4.0\n]\n"),
+    ("\t1\t0\t-2.5", "\n\t0\t0\t0\n\t3\t0\t4]\n"),
+    ("1 0 -2.5", "\n0 0 0\n3 0 4\n]\nb=[\n"),
+])
+def test_parse_A_variants(monkeypatch: pytest.MonkeyPatch, block_chars: int, head: str, body: str) -> None:
+    monkeypatch.setattr(matrix_to_mps, "READ_BLOCK_CHARS", block_chars)
+    file = io.StringIO(body)
+    A = parse_A(file, head)  # type: ignore[arg-type]
+
+    assert A.shape == (3, 3)
+    assert np.array_equal(A.toarray(), [[1.0, 0.0, -2.5], [0.0, 0.0, 0.0], [3.0, 0.0, 4.0]])
+    assert A.has_sorted_indices
+    # The reader stops right after the closing bracket
+    assert file.read() in ("", "b=[\n")
+
+
+def test_parse_A_ragged_rows() -> None:
+    with pytest.raises(ValueError):
+        parse_A(io.StringIO("1 2 3\n4 5\n]\n"))  # type: ignore[arg-type]
+
+
+REORDERED_TXT = """MinMax= -1
+
+c=[
+ 1.0
+ 0.0
+]
+
+BS=[
+ UP 1 4.0
+]
+
+Eqin=[
+ -1
+ 1
+]
+
+A=[
+  1.0  0.0
+  2.0  3.0
+]
+
+b=[
+ 5.0
+ 6.0
+]
+"""
+
+
+def test_index_txt_sections(tmp_path: Path) -> None:
+    file_path = tmp_path / "model.txt"
+    file_path.write_text(REORDERED_TXT)
+    index = index_txt_sections(str(file_path))
+
+    assert set(index) == {"MinMax", "c", "Bounds", "Eqin", "A", "b"}
+    content = file_path.read_bytes()
+    for section in index.values():
+        assert content[section.offset:].startswith(section.header.encode())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_file_any_order(tmp_path: Path, workers: int) -> None:
+    file_path = tmp_path / "model.txt"
+    file_path.write_text(REORDERED_TXT)
+    parsed = parse_file(str(file_path), workers=workers)
+
+    A = parsed["A"]
+    assert isinstance(A, sparse.csc_array)
+    assert np.array_equal(A.toarray(), [[1.0, 0.0], [2.0, 3.0]])
+    assert np.array_equal(parsed["b"], [5.0, 6.0])
+    assert np.array_equal(parsed["c"], [1.0, 0.0])
+    assert np.array_equal(parsed["Eqin"], [-1, 1])
+    assert parsed["MinMax"] == -1
+    assert parsed["Bounds"] == ["UP 1 4.0"]
+
+
+def test_parse_file_selected_sections(tmp_path: Path) -> None:
+    # A is never parsed when it is not requested
+    file_path = tmp_path / "model.txt"
+    file_path.write_text(REORDERED_TXT.replace("  2.0  3.0", "  2.0  not_a_number"))
+    parsed = parse_file(str(file_path), sections=["b", "c"])
+
+    assert set(parsed) == {"b", "c"}
+    assert np.array_equal(parsed["b"], [5.0, 6.0])
+    with pytest.raises(ValueError):
+        parse_file(str(file_path))
+
+
+def test_parse_file_checks_sections(tmp_path: Path) -> None:
+    file_path = tmp_path / "model.txt"
+    file_path.write_text(REORDERED_TXT.replace(" 6.0\n", " 6.0\n 7.0\n"))
+    with pytest.raises(ValueError):
+        parse_file(str(file_path))
+
+    file_path.write_text(REORDERED_TXT.replace("MinMax= -1", ""))
+    with pytest.raises(ValueError):
+        parse_file(str(file_path))
+
+
+def test_names_round_trip(tmp_path: Path) -> None:
+    # .mps -> .txt -> .mps keeps the row and column names of the original file
+    parsed = parse_mps_file(os.path.join(DATASETS_DIR, "ex1.mps"))
+    save_txt_file(str(tmp_path / "ex1.txt"), **parsed)
+    loaded = parse_file(str(tmp_path / "ex1.txt"))
+    save_mps_file(str(tmp_path / "ex1.mps"), **loaded)  # type: ignore[arg-type]
+
+    content = (tmp_path / "ex1.mps").read_text()
+    assert " G  ROW01\n" in content and " COL08  ROW01  -1.0  ROW05  1.9\n" in content
+    assert "UP BND1  COL08  4.3\n" in content
+    reparsed = parse_mps_file(str(tmp_path / "ex1.mps"))
+    assert reparsed["row_names"] == parsed["row_names"] and reparsed["col_names"] == parsed["col_names"]
+    assert (reparsed["A"] != parsed["A"]).nnz == 0
+
+    # Names that don't match the shape of A are rejected
+    with pytest.raises(ValueError):
+        save_mps_file(str(tmp_path / "bad.mps"), **{**parsed, "col_names": ["X"]})
+
+
+def test_names_with_blanks_and_objective_clash(tmp_path: Path) -> None:
+    parsed = parse_mps_file(os.path.join(DATASETS_DIR, "ex1.mps"))
+    row_names = ["OBJ", "LIM 1", "R[2]", "OBJ1", "R]"]
+
+    # The .txt names are read one per line, blanks and brackets included
+    save_txt_file(str(tmp_path / "ex1.txt"), **{**parsed, "row_names": row_names})
+    loaded = parse_file(str(tmp_path / "ex1.txt"))
+    assert loaded["row_names"] == row_names and loaded["col_names"] == parsed["col_names"]
+
+    # A name with blanks can't be written to an .mps file
+    with pytest.raises(ValueError, match="LIM 1"):
+        save_mps_file(str(tmp_path / "bad.mps"), **loaded)  # type: ignore[arg-type]
+
+    # The objective row gets a name no constraint row has
+    row_names[1] = "LIM1"
+    save_mps_file(str(tmp_path / "ex1.mps"), **{**parsed, "row_names": row_names})
+    assert " N  OBJ2\n" in (tmp_path / "ex1.mps").read_text()
+    reparsed = parse_mps_file(str(tmp_path / "ex1.mps"))
+    assert reparsed["row_names"] == row_names and reparsed["c"] == parsed["c"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_file_stats(tmp_path: Path, workers: int) -> None:
+    file_path = tmp_path / "model.txt"
+    file_path.write_text(REORDERED_TXT)
+    stats = ParseStats()
+    parsed = parse_file(str(file_path), workers=workers, stats=stats)
+
+    assert [section.name for section in stats.sections] == ["MinMax", "A", "b", "c", "Eqin", "Bounds"]
+    assert stats["A"].nonzeros == 3 and stats["A"].lines == 5
+    assert stats["b"].nbytes == parsed["b"].nbytes  # type: ignore[union-attr]
+    assert sum(section.bytes_read for section in stats.sections) == file_path.stat().st_size
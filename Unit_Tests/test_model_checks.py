@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from bounds import BoundsArray
+from matrix_to_mps import parse_file
+from model_checks import check_model
+from mps_to_matrix import parse_mps_file, save_txt_file
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+
+# A trailing row without entries and a column with only an objective coefficient
+TRAILING_EMPTY = ("NAME  EMPTY\nROWS\n N  OBJ\n L  R1\n G  R2\n E  R3\nCOLUMNS\n    X1  R1  1   R2  2\n"
+                  "    X2  OBJ  5\nRHS\n    RHS  R3  4\nENDATA\n")
+
+
+@pytest.mark.parametrize("A_format", ["csr", "csc", "coo"])
+def test_exact_shape(tmp_path: Path, A_format: str) -> None:
+    (tmp_path / "model.mps").write_text(TRAILING_EMPTY)
+    parsed = parse_mps_file(str(tmp_path / "model.mps"), A_format=A_format, validate=True)
+
+    assert parsed["A"].shape == (3, 2) and parsed["A"].format == A_format
+    assert np.array_equal(parsed["A"].toarray(), [[1, 0], [2, 0], [0, 0]])
+    assert len(parsed["b"]) == len(parsed["Eqin"]) == 3 and parsed["c"] == [0, 5]
+
+    # The .txt file written from it reads back with the same shape
+    save_txt_file(str(tmp_path / "model.txt"), **parsed, layout="triplets")
+    A = parse_file(str(tmp_path / "model.txt"), validate=True)["A"]
+    assert isinstance(A, sparse.csc_array) and A.shape == (3, 2)
+
+
+@pytest.mark.parametrize("file_name", ["ex1.mps", "afiro.mps", "aircraft.mps"])
+def test_check_datasets(file_name: str) -> None:
+    check_model(parse_mps_file(os.path.join(DATASETS_DIR, file_name), validate=True))
+
+
+def test_check_model_errors() -> None:
+    A = sparse.csr_array(np.array([[1.0, 0.0], [0.0, 2.0]]))
+    valid = {"A": A, "b": np.zeros(2), "c": [1.0, 2.0], "Eqin": [-1, 1], "Bounds": BoundsArray([1], [1], [3.0])}
+    check_model(valid)
+
+    for key, value, message in [("b", np.zeros(3), "b has 3 values"), ("c", [1.0], "c has 1 values"),
+                                ("Eqin", [-1, 2], "Eqin holds"), ("Bounds", BoundsArray([1], [2], [3.0]), "bound"),
+                                ("col_names", ["x"], "col_names")]:
+        with pytest.raises(ValueError, match=message):
+            check_model({**valid, key: value})
+
+    # Indices out of range, checked without building a matrix from them
+    broken = A.copy()
+    broken.indices[1] = 5
+    with pytest.raises(ValueError, match="column indices"):
+        check_model({"A": broken})
+    coo = sparse.coo_array(A)
+    coo.row[0] = -1
+    with pytest.raises(ValueError, match="row indices"):
+        check_model({"A": coo})
+
+    # Without A the vectors are checked against each other, or against the given shape
+    with pytest.raises(ValueError, match="Eqin has 3 values"):
+        check_model({"b": np.zeros(2), "Eqin": [0, 0, 0]})
+    with pytest.raises(ValueError, match="expected 4"):
+        check_model({"c": [1.0, 2.0]}, A_shape=(2, 4))
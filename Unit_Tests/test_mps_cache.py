@@ -0,0 +1,176 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import numpy as np
+import pytest
+
+import mps_cache
+import mps_to_matrix
+from mps_cache import (clear_cache, configure_cache, enable_cache, file_digest, load_cached, parse_incremental,
+                       parse_mps_file_cached, section_digests)
+from mps_to_matrix import parse_mps_file
+from parse_stats import ParseStats
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+
+
+@pytest.fixture
+def cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.setattr(mps_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(mps_cache, "MAX_CACHE_BYTES", 1 << 30)
+    monkeypatch.setattr(mps_cache, "CACHE_ENABLED", True)
+    return tmp_path / "cache"
+
+
+def copy_dataset(tmp_path: Path, file_name: str) -> str:
+    target = tmp_path / file_name
+    shutil.copy(os.path.join(DATASETS_DIR, file_name), target)
+    return str(target)
+
+
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_cache_round_trip(cache_dir: Path, tmp_path: Path, mmap_mode: Optional[Literal["r"]]) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    expected = parse_mps_file(file_path)
+
+    assert load_cached(file_path) is None
+    parse_mps_file_cached(file_path)
+    cached = load_cached(file_path, mmap_mode)
+
+    assert cached is not None
+    assert (cached["A"] != expected["A"]).nnz == 0 and cached["A"].shape == expected["A"].shape
+    assert np.array_equal(cached["b"], expected["b"])
+    for key in ("MinMax", "c", "Eqin", "Bounds", "row_names", "col_names", "rhs_names", "obj_constant"):
+        assert cached[key] == expected[key]
+    assert cached["Bounds"].to_strings() == expected["Bounds"].to_strings()  # With the value texts as read
+    assert (cached["b_sets"] != expected["b_sets"]).nnz == 0
+    assert np.array_equal(cached["ranges"], expected["ranges"], equal_nan=True)
+    assert np.array_equal(cached["integrality"], expected["integrality"])
+
+    # The cache stores CSR, a hit is converted to the requested format
+    assert parse_mps_file_cached(file_path, mmap_mode, A_format="csc")["A"].format == "csc"
+
+
+def test_cache_invalidated_by_changes(cache_dir: Path, tmp_path: Path) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    parse_mps_file_cached(file_path)
+
+    # Same size and modification time but different content: only the content hash notices it
+    stat = os.stat(file_path)
+    content = Path(file_path).read_bytes()
+    Path(file_path).write_bytes(content.replace(b"15.0", b"16.0"))
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load_cached(file_path, verify=False) is not None
+    assert load_cached(file_path) is None
+
+    assert parse_mps_file_cached(file_path)["b"][4] == 16.0
+
+
+def test_cache_eviction_and_clear(cache_dir: Path, tmp_path: Path) -> None:
+    first = copy_dataset(tmp_path, "afiro.mps")
+    second = str(tmp_path / "afiro_copy.mps")
+    shutil.copy(first, second)
+    parse_mps_file_cached(first)
+    entry_bytes = sum(file.stat().st_size for file in cache_dir.rglob("*") if file.is_file())
+
+    # Room for a single entry: storing the second one evicts the first
+    configure_cache(max_bytes=entry_bytes * 3 // 2)
+    parse_mps_file_cached(second)
+    assert load_cached(first) is None and load_cached(second) is not None
+
+    clear_cache()
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_cache_disabled(cache_dir: Path, tmp_path: Path) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    enable_cache(False)
+    parse_mps_file_cached(file_path)
+
+    assert not cache_dir.exists()
+
+
+def test_section_digests(tmp_path: Path) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    digest, sections = section_digests(file_path)
+
+    assert digest == file_digest(file_path)
+    assert [section["name"] for section in sections] == ["NAME", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS", "ENDATA"]
+    content = Path(file_path).read_bytes()
+    assert all(content[section["start"]:].startswith(section["name"].encode()) for section in sections)
+
+
+def test_incremental_parse(monkeypatch: pytest.MonkeyPatch, cache_dir: Path, tmp_path: Path) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    parse_mps_file_cached(file_path)
+
+    # Only the RHS and BOUNDS change: COLUMNS is neither parsed nor read
+    content = Path(file_path).read_bytes()
+    Path(file_path).write_bytes(content.replace(b"15.0", b"16.0").replace(b"4.3", b"5.3"))
+    with monkeypatch.context() as patch:
+        patch.setattr(mps_to_matrix._ColumnsParser, "feed", None)
+        patch.setattr(mps_cache, "parse_mps_file", None)
+        parsed = parse_mps_file_cached(file_path)
+
+    expected = parse_mps_file(file_path)
+    assert (parsed["A"] != expected["A"]).nnz == 0 and np.array_equal(parsed["b"], expected["b"])
+    for key in ("MinMax", "c", "Eqin", "Bounds", "row_names", "col_names", "rhs_names"):
+        assert parsed[key] == expected[key]
+    assert np.array_equal(parsed["ranges"], expected["ranges"], equal_nan=True)
+    assert np.array_equal(parsed["integrality"], expected["integrality"])
+    assert parsed["b"][4] == 16.0 and parsed["Bounds"][4] == "UP 7 5.3"
+
+    # The incremental result was stored: the next call is a plain hit
+    assert load_cached(file_path) is not None
+
+    # A change of COLUMNS needs a full parse
+    Path(file_path).write_bytes(content.replace(b"-1.2", b"-2.2"))
+    assert parse_incremental(file_path) is None
+    assert parse_mps_file_cached(file_path)["A"].toarray()[3, 6] == -2.2
+
+
+def test_cache_keeps_the_mps_format(monkeypatch: pytest.MonkeyPatch, cache_dir: Path, tmp_path: Path) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    parse_mps_file_cached(file_path, mps_format="fixed")
+    assert load_cached(file_path) is None and load_cached(file_path, mps_format="fixed") is not None
+
+    # An entry of another layout is neither loaded nor reused incrementally: the file is parsed again
+    calls: list[str] = []
+
+    def counted_parse(path: str, **options: Any) -> dict:
+        calls.append(options.get("mps_format", "auto"))
+        return parse_mps_file(path, **options)
+
+    monkeypatch.setattr(mps_cache, "parse_mps_file", counted_parse)
+    Path(file_path).write_bytes(Path(file_path).read_bytes().replace(b"15.0", b"16.0"))
+    assert parse_incremental(file_path) is None
+    assert parse_mps_file_cached(file_path)["b"][4] == 16.0 and calls == ["auto"]
+    assert load_cached(file_path) is not None and load_cached(file_path, mps_format="fixed") is None
+
+
+def test_cache_validate_and_stats(cache_dir: Path, tmp_path: Path) -> None:
+    file_path = copy_dataset(tmp_path, "ex1.mps")
+    stats = ParseStats()
+    expected = parse_mps_file_cached(file_path, stats=stats, validate=True)
+    assert stats.sections[0].name == "cache" and "COLUMNS" in stats
+
+    # A hit is measured as the "cache" section alone
+    stats = ParseStats()
+    parse_mps_file_cached(file_path, stats=stats, validate=True)
+    assert [section.name for section in stats.sections] == ["cache"]
+    assert stats["cache"].nonzeros == expected["A"].nnz and stats["cache"].nbytes > 0
+
+    # An incremental parse measures the sections it parses again, not COLUMNS
+    Path(file_path).write_bytes(Path(file_path).read_bytes().replace(b"15.0", b"16.0"))
+    stats = ParseStats()
+    parse_mps_file_cached(file_path, stats=stats)
+    assert "RHS" in stats and "COLUMNS" not in stats
+
+    # A hit is validated too
+    broken = dict(expected, b=expected["b"][:-1])
+    mps_cache.store_cached(file_path, broken)
+    assert len(parse_mps_file_cached(file_path)["b"]) == len(broken["b"])
+    with pytest.raises(ValueError):
+        parse_mps_file_cached(file_path, validate=True)
@@ -0,0 +1,528 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import mps_to_matrix
+from scipy import sparse
+
+import matrix_to_mps
+from bounds import BOUND_CODES, BoundsArray
+from mps_to_matrix import MpsStream, iter_column_blocks, parse_mps_file, save_txt_file, scan_mps_sections
+from mps_to_mps import rewrite_mps_file
+from name_pool import NamePool
+from parse_stats import ParseStats
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+EX1 = os.path.join(DATASETS_DIR, "ex1.mps")
+
+EX1_A = np.array([
+    [3.0, 1.0, 0.0, -2.0, -1.0, 0.0,  0.0, -1.0],
+    [0.0, 2.0, 1.1,  0.0,  0.0, 0.0,  0.0,  0.0],
+    [0.0, 0.0, 1.0,  0.0,  0.0, 1.0,  0.0,  0.0],
+    [0.0, 0.0, 0.0,  2.8,  0.0, 0.0, -1.2,  0.0],
+    [5.6, 0.0, 0.0,  0.0,  1.0, 0.0,  0.0,  1.9],
+])
+
+
+# The .txt file the original converter wrote for ex1.mps: the columns without an objective entry have an int 0 in c
+EX1_TXT = """A=[
+        3.0          1.0          0.0         -2.0         -1.0          0.0          0.0         -1.0
+        0.0          2.0          1.1          0.0          0.0          0.0          0.0          0.0
+        0.0          0.0          1.0          0.0          0.0          1.0          0.0          0.0
+        0.0          0.0          0.0          2.8          0.0          0.0         -1.2          0.0
+        5.6          0.0          0.0          0.0          1.0          0.0          0.0          1.9
+]
+
+b=[
+         2.5
+         2.1
+         4.0
+         1.8
+        15.0
+]
+
+c=[
+         1.0
+           0
+           0
+           0
+         2.0
+           0
+           0
+        -1.0
+]
+
+Eqin=[
+  1
+ -1
+  0
+  1
+ -1
+]
+
+MinMax= -1
+
+BS=[
+ LO 0 2.5
+ UP 1 4.1
+ LO 4 0.5
+ UP 4 4.0
+ UP 7 4.3
+ FX 6 None
+]
+"""
+
+def test_parse_ex1() -> None:
+    parsed = parse_mps_file(EX1)
+
+    assert parsed["MinMax"] == -1
+    assert np.array_equal(parsed["A"].toarray(), EX1_A)
+    assert np.array_equal(parsed["b"], [2.5, 2.1, 4.0, 1.8, 15.0])
+    assert parsed["c"] == [1.0, 0.0, 0.0, 0.0, 2.0, 0.0, 0.0, -1.0]
+    assert parsed["Eqin"] == [1, -1, 0, 1, -1]
+    assert parsed["Bounds"] == ["LO 0 2.5", "UP 1 4.1", "LO 4 0.5", "UP 4 4.0", "UP 7 4.3", "FX 6 None"]
+    assert parsed["row_names"] == ["ROW01", "ROW02", "ROW03", "ROW04", "ROW05"]
+    assert parsed["col_names"] == [f"COL0{k}" for k in range(1, 9)]
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize("file_name", ["afiro.mps", "sc205-2r-8.mps", "aircraft.mps"])
+def test_columns_chunk_boundaries(monkeypatch: pytest.MonkeyPatch, file_name: str, use_mmap: bool) -> None:
+    # Tiny blocks split columns across blocks, the result must not change
+    file_path = os.path.join(DATASETS_DIR, file_name)
+    expected = parse_mps_file(file_path)
+    monkeypatch.setattr(mps_to_matrix, "COLUMNS_CHUNK_SIZE", 100)
+    parsed = parse_mps_file(file_path, use_mmap=use_mmap)
+
+    assert parsed["A"].shape == expected["A"].shape
+    assert (parsed["A"] != expected["A"]).nnz == 0
+    assert parsed["c"] == expected["c"]
+    assert np.array_equal(parsed["b"], expected["b"])
+    assert parsed["Bounds"] == expected["Bounds"]
+
+
+def test_parse_ex1_mmap() -> None:
+    parsed = parse_mps_file(EX1, use_mmap=True)
+
+    assert np.array_equal(parsed["A"].toarray(), EX1_A)
+    assert parsed["c"] == [1.0, 0.0, 0.0, 0.0, 2.0, 0.0, 0.0, -1.0]
+    assert parsed["Eqin"] == [1, -1, 0, 1, -1]
+    assert parsed["Bounds"] == ["LO 0 2.5", "UP 1 4.1", "LO 4 0.5", "UP 4 4.0", "UP 7 4.3", "FX 6 None"]
+
+
+def test_scan_mps_sections() -> None:
+    with open(EX1, "rb") as file:
+        content = file.read()
+    sections = scan_mps_sections(content)
+
+    assert [section.header.split()[0] for section in sections] == \
+        ["NAME", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS", "ENDATA"]
+    columns = sections[2]
+    assert content[columns.start:columns.end].startswith(b"    COL01     OBJ")
+    assert content[columns.end:].startswith(b"RHS")
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_columns_comments_and_objective_only_column(tmp_path: Path, use_mmap: bool) -> None:
+    file_path = os.path.join(tmp_path, "small.mps")
+    with open(file_path, "w") as file:
+        file.write("NAME  SMALL\nROWS\n N  OBJ\n L  R1\n E  R2\nCOLUMNS\n"
+                   "* A comment in the COLUMNS section\n"
+                   "    X1  R1  1.5   OBJ  -2\n"
+                   "    X2  OBJ  4\n"
+                   "\n"
+                   "    X3  R2  1e1   R1  .5\n"
+                   "RHS\n    RHS  R1  3\nENDATA\n")
+    parsed = parse_mps_file(file_path, use_mmap=use_mmap)
+
+    assert np.array_equal(parsed["A"].toarray(), [[1.5, 0.0, 0.5], [0.0, 0.0, 10.0]])
+    assert parsed["c"] == [-2.0, 4.0, 0.0]
+
+
+def test_columns_unknown_row(tmp_path: Path) -> None:
+    file_path = os.path.join(tmp_path, "unknown_row.mps")
+    with open(file_path, "w") as file:
+        file.write("NAME  BAD\nROWS\n N  OBJ\n L  R1\nCOLUMNS\n    X1  R2  1\nRHS\nENDATA\n")
+
+    with pytest.raises(KeyError):
+        parse_mps_file(file_path)
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 5, 1000])
+def test_iter_column_blocks(monkeypatch: pytest.MonkeyPatch, block_size: int) -> None:
+    file_path = os.path.join(DATASETS_DIR, "afiro.mps")
+    expected = parse_mps_file(file_path)
+    monkeypatch.setattr(mps_to_matrix, "COLUMNS_CHUNK_SIZE", 200)
+    blocks = list(iter_column_blocks(file_path, block_size=block_size))
+
+    assert all(len(block.names) == block_size for block in blocks[:-1])
+    assert [block.first_column for block in blocks] == list(range(0, expected["A"].shape[1], block_size))
+    A = sparse.hstack([block.A for block in blocks])
+    assert A.shape == expected["A"].shape
+    assert (A != expected["A"]).nnz == 0
+    assert np.concatenate([block.c for block in blocks]).tolist() == expected["c"]
+
+
+def test_mps_stream() -> None:
+    with MpsStream(EX1, block_size=3) as stream:
+        # NAME and ROWS are parsed as soon as the stream is opened
+        assert stream.Eqin == [1, -1, 0, 1, -1]
+        assert stream.objective_fun == "OBJ"
+
+        blocks = list(stream.column_blocks())
+        assert [block.names for block in blocks] == [["COL01", "COL02", "COL03"], ["COL04", "COL05", "COL06"],
+                                                     ["COL07", "COL08"]]
+        assert all(block.A.shape[0] == 5 for block in blocks)
+
+        stream.finish()
+        assert np.array_equal(stream.b, [2.5, 2.1, 4.0, 1.8, 15.0])
+        assert stream.Bounds[0] == "LO 0 2.5"
+
+
+def test_mps_stream_finish_without_reading_blocks() -> None:
+    with MpsStream(EX1) as stream:
+        stream.finish()
+        assert stream.num_columns == 8
+        assert stream.Bounds == ["LO 0 2.5", "UP 1 4.1", "LO 4 0.5", "UP 4 4.0", "UP 7 4.3", "FX 6 None"]
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+@pytest.mark.parametrize("file_name", ["ex1.mps", "afiro.mps", "sc205-2r-50.mps"])
+def test_parallel_columns(monkeypatch: pytest.MonkeyPatch, file_name: str, workers: int) -> None:
+    file_path = os.path.join(DATASETS_DIR, file_name)
+    expected = parse_mps_file(file_path)
+    monkeypatch.setattr(mps_to_matrix, "PARALLEL_MIN_BYTES", 0)
+    parsed = parse_mps_file(file_path, workers=workers)
+
+    assert parsed["A"].shape == expected["A"].shape
+    assert (parsed["A"] != expected["A"]).nnz == 0
+    assert parsed["c"] == expected["c"]
+    assert parsed["Bounds"] == expected["Bounds"]
+
+
+def test_split_columns_range() -> None:
+    with open(os.path.join(DATASETS_DIR, "afiro.mps"), "rb") as file:
+        content = file.read()
+    columns = next(section for section in scan_mps_sections(content) if section.header.startswith("COLUMNS"))
+    ranges = mps_to_matrix._split_columns_range(content, columns.start, columns.end, 8)
+
+    assert ranges[0][0] == columns.start and ranges[-1][1] == columns.end
+    assert all(previous[1] == following[0] for previous, following in zip(ranges[:-1], ranges[1:]))
+    # Every range starts with a different column than the one the previous range ends with
+    for previous, following in zip(ranges[:-1], ranges[1:]):
+        last_line = content[previous[0]:previous[1]].splitlines()[-1]
+        first_line = content[following[0]:following[1]].splitlines()[0]
+        assert last_line.split()[0] != first_line.split()[0]
+
+
+@pytest.mark.parametrize("layout", ["dense", "triplets", "rows"])
+@pytest.mark.parametrize("file_name", ["ex1.mps", "afiro.mps", "sc205-2r-8.mps"])
+def test_save_txt_file_layouts(tmp_path: Path, file_name: str, layout: str) -> None:
+    parsed = parse_mps_file(os.path.join(DATASETS_DIR, file_name))
+    output = str(tmp_path / "model.txt")
+    save_txt_file(output, **parsed, layout=layout)
+
+    # matrix_to_mps reads every layout back
+    loaded = matrix_to_mps.parse_file(output)
+    A = loaded["A"]
+    assert isinstance(A, sparse.csc_array) and A.shape == parsed["A"].shape
+    assert (A != parsed["A"]).nnz == 0
+    assert np.array_equal(loaded["b"], parsed["b"])
+    assert np.array_equal(loaded["c"], parsed["c"])
+    assert loaded["Bounds"] == parsed["Bounds"]
+    assert loaded["row_names"] == parsed["row_names"] and loaded["col_names"] == parsed["col_names"]
+
+
+@pytest.mark.parametrize("block_elements", [1, 7, 1 << 20])
+def test_save_txt_file_dense_format(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, block_elements: int) -> None:
+    monkeypatch.setattr(mps_to_matrix, "TXT_BLOCK_ELEMENTS", block_elements)
+    # 1/3 is longer than the 11 character cells, the rows of its block are joined as strings
+    A = sparse.csr_array(np.array([[0.0, 2.5, 0.0], [0.0, 0.0, 0.0], [1 / 3, 0.0, -4.0]]))
+    output = tmp_path / "model.txt"
+    save_txt_file(str(output), -1, A, np.zeros(3), [0.0, 0.0, 0.0], [0, 0, 0], [])
+
+    expected = "".join("  ".join(f"{elem:>11}" for elem in row) + "\n" for row in A.toarray())
+    assert output.read_text().startswith("A=[\n" + expected + "]\n")
+
+
+def test_save_txt_file_ex1(tmp_path: Path) -> None:
+    parsed = parse_mps_file(EX1)
+    assert [type(value) for value in parsed["c"]] == [float, int, int, int, float, int, int, float]
+    # The arguments of the original converter (with the names, their sections would be added at the end)
+    save_txt_file(str(tmp_path / "ex1.txt"), parsed["MinMax"], parsed["A"], parsed["b"], parsed["c"], parsed["Eqin"],
+                  parsed["Bounds"])
+    assert (tmp_path / "ex1.txt").read_bytes() == EX1_TXT.encode()
+
+def test_save_txt_file_unknown_layout(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        save_txt_file(str(tmp_path / "model.txt"), -1, sparse.csr_array((1, 1)), np.zeros(1), [0.0], [0], [],
+                      layout="csv")
+
+
+def test_bounds_array() -> None:
+    Bounds = parse_mps_file(EX1)["Bounds"]
+
+    assert isinstance(Bounds, BoundsArray)
+    assert Bounds.kinds.tolist() == [BOUND_CODES[kind] for kind in ("LO", "UP", "LO", "UP", "UP", "FX")]
+    assert Bounds.columns.tolist() == [0, 1, 4, 4, 7, 6]
+    assert np.array_equal(Bounds.values, [2.5, 4.1, 0.5, 4.0, 4.3, np.nan], equal_nan=True)
+    # The compatibility view gives the former strings
+    assert Bounds[5] == "FX 6 None" and list(Bounds)[0] == "LO 0 2.5"
+    assert Bounds == BoundsArray.from_strings(Bounds.to_strings())
+
+    lower, upper = Bounds.to_dense(8)
+    assert np.array_equal(lower, [2.5, 0, 0, 0, 0.5, 0, np.nan, 0], equal_nan=True)
+    assert np.array_equal(upper, [np.inf, 4.1, np.inf, np.inf, 4.0, np.inf, np.nan, 4.3], equal_nan=True)
+
+
+def test_bounds_array_to_dense() -> None:
+    Bounds = BoundsArray.from_strings(["LO 0 2", "UP 0 3", "LO 0 1", "FR 1", "MI 2 None", "BV 3", "PL 4", "FX 5 7"])
+    lower, upper = Bounds.to_dense(7)
+
+    # The last bound of a column wins
+    assert np.array_equal(lower, [1, -np.inf, -np.inf, 0, 0, 7, 0])
+    assert np.array_equal(upper, [3, np.inf, np.inf, 1, np.inf, 7, np.inf])
+
+
+def test_bounds_keep_value_texts(tmp_path: Path) -> None:
+    # The values are written back as they were read, "4" stays "4" and "1e30" stays "1e30"
+    (tmp_path / "model.mps").write_text("NAME  B\nROWS\n N  OBJ\n L  R1\nCOLUMNS\n    X1  R1  1\n    X2  R1  1\n"
+                                        "RHS\n    RHS  R1  5\nBOUNDS\n UP BND  X1  4\n LO BND  X2  1e30\n"
+                                        " FR BND  X2\nENDATA\n")
+    parsed = parse_mps_file(str(tmp_path / "model.mps"))
+    assert parsed["Bounds"].to_strings() == ["UP 0 4", "LO 1 1e30", "FR 1 None"]
+    assert parsed["Bounds"][1:].to_strings() == ["LO 1 1e30", "FR 1 None"]
+    assert np.array_equal(parsed["Bounds"].values, [4.0, 1e30, np.nan], equal_nan=True)
+
+    save_txt_file(str(tmp_path / "model.txt"), **parsed)
+    assert "BS=[\n UP 0 4\n LO 1 1e30\n FR 1 None\n]\n" in (tmp_path / "model.txt").read_text()
+    parsed_txt = matrix_to_mps.parse_file(str(tmp_path / "model.txt"))
+    matrix_to_mps.save_mps_file(str(tmp_path / "saved.mps"), **parsed_txt)  # type: ignore
+    assert (tmp_path / "saved.mps").read_text().endswith("BOUNDS\nUP BND1  X1  4\nLO BND1  X2  1e30\n"
+                                                         "FR BND1  X2  \nENDATA")
+
+
+def test_name_pool() -> None:
+    names = ["ROW1", "A_MUCH_LONGER_ROW_NAME", "R", "ROW1", "é"]
+    pool = NamePool.from_names(names)
+
+    assert len(pool) == 5 and pool == names and list(pool) == names
+    assert pool[1] == "A_MUCH_LONGER_ROW_NAME" and pool[-1] == "é"
+    assert pool[1:3] == names[1:3] and pool[::2] == names[::2]
+    assert pool.nbytes == len("".join(names).encode()) + 8 * 6
+
+    # Bulk lookup, a repeated name maps to its first index
+    assert pool.lookup(np.array([b"R", b"ROW1", "é".encode()])).tolist() == [2, 0, 4]
+    assert pool.index("A_MUCH_LONGER_ROW_NAME") == 1 and "R" in pool and "ROW2" not in pool
+    with pytest.raises(KeyError):
+        pool.lookup(["ROW2"])
+
+    assert NamePool.from_bytes_array(pool.to_bytes_array()) == pool
+    assert NamePool.concatenate([pool[:2], pool[2:]]) == pool
+    assert NamePool() == [] and NamePool().lookup([]).size == 0
+
+
+@pytest.mark.parametrize("use_mmap, workers", [(False, 1), (True, 1), (True, 2)])
+def test_parse_stats(monkeypatch: pytest.MonkeyPatch, use_mmap: bool, workers: int) -> None:
+    monkeypatch.setattr(mps_to_matrix, "PARALLEL_MIN_BYTES", 0)
+    reported: list[str] = []
+    stats = ParseStats(callback=lambda section: reported.append(section.name))
+    parsed = parse_mps_file(EX1, use_mmap=use_mmap, workers=workers, stats=stats)
+
+    assert reported == ["NAME", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS", "assemble"]
+    assert [section.name for section in stats.sections] == reported
+    assert stats["COLUMNS"].nonzeros == parsed["A"].nnz
+    assert [stats[name].lines for name in ("ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS")] == [6, 11, 5, 2, 6]
+    b_sets = parsed["b_sets"]
+    assert stats["RHS"].nbytes == parsed["b"].nbytes + b_sets.data.nbytes + b_sets.indices.nbytes + b_sets.indptr.nbytes
+    assert stats["RANGES"].nbytes == parsed["ranges"].nbytes
+    assert stats["BOUNDS"].bytes_read > 0 and stats["assemble"].nbytes > 0
+    assert "total" in stats.report()
+
+
+@pytest.mark.parametrize("A_format", ["csr", "csc", "coo"])
+def test_parse_A_format(A_format: str) -> None:
+    parsed = parse_mps_file(EX1, A_format=A_format)
+
+    A = parsed["A"]
+    assert A.format == A_format
+    assert np.array_equal(A.toarray(), EX1_A)
+    assert all(array.dtype == np.int32 for array in ((A.row, A.col) if A_format == "coo" else (A.indices, A.indptr)))
+    with pytest.raises(ValueError):
+        parse_mps_file(EX1, A_format="dense")
+
+
+def test_typed_buffer_growth() -> None:
+    buffer = mps_to_matrix._TypedBuffer(np.int32, capacity=2)
+    buffer.extend(np.arange(3))
+    view = buffer.view()  # A live view makes the buffer grow by copying instead of in place
+    buffer.extend(np.arange(3, 10))
+    assert view.tolist() == [0, 1, 2]
+    del view
+    buffer.extend(np.arange(10, 40))
+
+    values = buffer.release()
+    assert values.tolist() == list(range(40)) and values.dtype == np.int32
+    assert len(buffer) == 0 and len(buffer.view()) == 0
+
+
+MULTI_RHS = ("NAME  SCENARIOS\nROWS\n N  COST\n L  R1\n G  R2\n E  R3\n E  R4\nCOLUMNS\n"
+             "    X1  R1  1   R2  1\n    X1  R3  1   R4  1\n    X1  COST  1\n"
+             "RHS\n    BASE  COST  -7.5   R1  4\n    BASE  R2  1   R3  2\n    HIGH  R1  8\n"
+             "    BASE  R4  3\n    HIGH  R3  6   R1  9\n"
+             "RANGES\n    RNG  R1  2   R2  -3\n    RNG  R3  4   R4  -1\n    OTHER  R1  100\n"
+             "ENDATA\n")
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_rhs_sets_and_ranges(tmp_path: Path, use_mmap: bool) -> None:
+    (tmp_path / "model.mps").write_text(MULTI_RHS)
+    parsed = parse_mps_file(str(tmp_path / "model.mps"), use_mmap=use_mmap)
+
+    # Every RHS set is a column (a value given twice keeps the last one), b is the first set
+    assert parsed["rhs_names"].to_list() == ["BASE", "HIGH"]
+    assert np.array_equal(parsed["b_sets"].toarray(), [[4, 9], [1, 0], [2, 6], [3, 0]])
+    assert np.array_equal(parsed["b"], [4, 1, 2, 3])
+    assert parsed["obj_constant"] == 7.5
+    assert np.array_equal(parsed["ranges"], [2, -3, 4, -1])  # Only the first RANGES set
+
+    lower, upper = mps_to_matrix.range_bounds(parsed["b"], parsed["Eqin"], parsed["ranges"])
+    assert np.array_equal(lower, [2, 1, 2, 2]) and np.array_equal(upper, [4, 4, 6, 3])
+    lower, upper = mps_to_matrix.range_bounds(parsed["b_sets"].toarray(), parsed["Eqin"], np.full(4, np.nan))
+    assert np.array_equal(lower[:, 1], [-np.inf, 0, 6, 0]) and np.array_equal(upper[:, 1], [9, np.inf, 6, 0])
+
+    # Written back by save_mps_file
+    matrix_to_mps.save_mps_file(str(tmp_path / "saved.mps"), **parsed)
+    saved = parse_mps_file(str(tmp_path / "saved.mps"))
+    for key in ("b", "ranges", "obj_constant", "rhs_names"):
+        assert np.array_equal(saved[key], parsed[key])
+    assert (saved["b_sets"] != parsed["b_sets"]).nnz == 0
+
+
+def test_no_rhs_section(tmp_path: Path) -> None:
+    (tmp_path / "model.mps").write_text("NAME  EMPTY\nROWS\n N  OBJ\n L  R1\nCOLUMNS\n    X1  R1  1\nENDATA\n")
+    parsed = parse_mps_file(str(tmp_path / "model.mps"))
+    assert parsed["b_sets"].shape == (1, 0) and len(parsed["rhs_names"]) == 0
+    assert np.array_equal(parsed["b"], [0.0]) and np.isnan(parsed["ranges"]).all() and parsed["obj_constant"] == 0.0
+
+
+# Fixed MPS: the fields are at their byte columns and the names contain spaces
+FIXED_MPS = """NAME          FIXED MODEL
+OBJSENSE
+    MAX
+ROWS
+ N  PROFIT
+ L  LIM 1
+ G  LIM 2
+COLUMNS
+    MARKER                 'MARKER'                 'INTORG'
+    X ONE     PROFIT             1.0   LIM 1              2.0
+    X ONE     LIM 2              1.0
+    MARKER                 'MARKER'                 'INTEND'
+    Y TWO     PROFIT             3.0   LIM 2             -1.0
+RHS
+    RHS       LIM 1              4.0   LIM 2              1.0
+RANGES
+    RNG       LIM 1              2.5
+BOUNDS
+ UP BND       X ONE              4.0
+ MI BND       Y TWO
+ENDATA
+"""
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize("mps_format", ["auto", "fixed"])
+def test_fixed_format(tmp_path: Path, use_mmap: bool, mps_format: str) -> None:
+    (tmp_path / "model.mps").write_text(FIXED_MPS)
+    parsed = parse_mps_file(str(tmp_path / "model.mps"), use_mmap=use_mmap, mps_format=mps_format)
+
+    assert parsed["MinMax"] == 1
+    assert parsed["row_names"].to_list() == ["LIM 1", "LIM 2"]
+    assert parsed["col_names"].to_list() == ["X ONE", "Y TWO"]
+    assert np.array_equal(parsed["A"].toarray(), [[2, 0], [1, -1]]) and parsed["c"] == [1, 3]
+    assert np.array_equal(parsed["b"], [4, 1]) and np.array_equal(parsed["ranges"], [2.5, np.nan], equal_nan=True)
+    assert parsed["Bounds"] == ["UP 0 4.0", "MI 1 None"]
+    assert np.array_equal(parsed["integrality"], [True, False])
+
+    # Split at blanks, the names are broken up
+    with pytest.raises(ValueError):
+        parse_mps_file(str(tmp_path / "model.mps"), mps_format="free")
+    with pytest.raises(ValueError):
+        parse_mps_file(str(tmp_path / "model.mps"), mps_format="unknown")
+
+
+def test_fixed_format_names_with_blanks(tmp_path: Path) -> None:
+    (tmp_path / "model.mps").write_text(FIXED_MPS)
+    parsed = parse_mps_file(str(tmp_path / "model.mps"))
+
+    # .mps -> .txt -> dictionary keeps the names, one per line
+    save_txt_file(str(tmp_path / "model.txt"), **parsed)
+    loaded = matrix_to_mps.parse_file(str(tmp_path / "model.txt"), validate=True)
+    assert loaded["row_names"] == ["LIM 1", "LIM 2"] and loaded["col_names"] == ["X ONE", "Y TWO"]
+    assert (sparse.csr_array(loaded["A"]) != parsed["A"]).nnz == 0 and loaded["Bounds"] == parsed["Bounds"]
+
+    # Free MPS can't hold them: the writers raise, and write the model without the names
+    with pytest.raises(ValueError, match="LIM 1"):
+        matrix_to_mps.save_mps_file(str(tmp_path / "saved.mps"), **parsed)
+    with pytest.raises(ValueError, match="LIM 1"):
+        rewrite_mps_file(str(tmp_path / "model.mps"), str(tmp_path / "rewritten.mps"), keep_names=True)
+    del parsed["row_names"], parsed["col_names"]
+    matrix_to_mps.save_mps_file(str(tmp_path / "saved.mps"), **parsed)
+    rewrite_mps_file(str(tmp_path / "model.mps"), str(tmp_path / "rewritten.mps"))
+    assert (tmp_path / "rewritten.mps").read_bytes() == (tmp_path / "saved.mps").read_bytes()
+
+    reparsed = parse_mps_file(str(tmp_path / "rewritten.mps"))
+    assert reparsed["row_names"] == ["ROW0", "ROW1"] and (reparsed["A"] != parsed["A"]).nnz == 0
+    assert np.array_equal(reparsed["ranges"], parsed["ranges"], equal_nan=True)
+    assert np.array_equal(reparsed["integrality"], parsed["integrality"]) and reparsed["Bounds"] == parsed["Bounds"]
+
+
+@pytest.mark.parametrize("header, expected", [("NAME  MODEL\n", -1), ("NAME  MODEL  (MAX)\n", 1),
+                                              ("NAME  TWO WORDS\n", -1), ("NAME  M\nOBJSENSE\n    MAX\n", 1),
+                                              ("NAME  M  (MAX)\nOBJSENSE MIN\n", -1), ("NAME  M\nOBJSENSE MAXIMIZE\n", 1)])
+def test_objective_sense(tmp_path: Path, header: str, expected: int) -> None:
+    # A name of several words is not a maximization, OBJSENSE (free MPS puts it on the header line) overrides (MAX)
+    (tmp_path / "model.mps").write_text(header + "ROWS\n N  OBJ\n L  R1\nCOLUMNS\n    X1  R1  1\nENDATA\n")
+    assert parse_mps_file(str(tmp_path / "model.mps"))["MinMax"] == expected
+
+
+def test_unknown_objective_sense(tmp_path: Path) -> None:
+    (tmp_path / "model.mps").write_text("NAME  M\nOBJSENSE\n    UP\nROWS\n N  OBJ\nENDATA\n")
+    with pytest.raises(ValueError, match="OBJSENSE"):
+        parse_mps_file(str(tmp_path / "model.mps"))
+
+
+@pytest.mark.parametrize("use_mmap, workers", [(False, 1), (True, 1), (True, 3)])
+def test_integer_markers(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, use_mmap: bool, workers: int) -> None:
+    # Runs of integer columns across the chunks and the ranges of the workers
+    monkeypatch.setattr(mps_to_matrix, "COLUMNS_CHUNK_SIZE", 64)
+    monkeypatch.setattr(mps_to_matrix, "PARALLEL_MIN_BYTES", 0)
+    lines, expected = [], []
+    for j in range(60):
+        if j % 7 == 2:
+            lines.append(f"    M{j}  'MARKER'  'INTORG'")
+        if j % 7 == 5:
+            lines.append(f"    M{j}  'MARKER'  'INTEND'")
+        expected.append(2 <= j % 7 < 5)
+        lines.append(f"    X{j}  OBJ  {j + 1}   R1  1")
+    (tmp_path / "model.mps").write_text("NAME  INT\nROWS\n N  OBJ\n L  R1\nCOLUMNS\n" + "\n".join(lines)
+                                        + "\nRHS\n    RHS  R1  5\nENDATA\n")
+    parsed = parse_mps_file(str(tmp_path / "model.mps"), use_mmap=use_mmap, workers=workers)
+
+    assert np.array_equal(parsed["integrality"], expected)
+    assert parsed["A"].shape == (1, 60) and parsed["c"] == list(range(1, 61))
+
+    # Written back between MARKER lines
+    matrix_to_mps.save_mps_file(str(tmp_path / "saved.mps"), **parsed)
+    assert (tmp_path / "saved.mps").read_text().count("'MARKER'") == 2 * 9
+    assert np.array_equal(parse_mps_file(str(tmp_path / "saved.mps"))["integrality"], expected)
+
+
+def test_unknown_marker(tmp_path: Path) -> None:
+    (tmp_path / "model.mps").write_text("NAME  M\nROWS\n N  OBJ\n L  R1\nCOLUMNS\n"
+                                        "    M1  'MARKER'  'SOS1'\n    X1  R1  1\nENDATA\n")
+    with pytest.raises(ValueError, match="MARKER"):
+        parse_mps_file(str(tmp_path / "model.mps"))
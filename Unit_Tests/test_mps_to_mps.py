@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from matrix_to_mps import save_mps_file
+from mps_to_matrix import parse_mps_file
+from mps_to_mps import rewrite_mps_file
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Test_Datasets")
+
+
+@pytest.mark.parametrize("keep_names", [False, True])
+@pytest.mark.parametrize("block_size", [3, 1 << 16])
+@pytest.mark.parametrize("file_name", ["ex1.mps", "afiro.mps", "sc205-2r-8.mps"])
+def test_rewrite_matches_save_mps_file(tmp_path: Path, file_name: str, block_size: int, keep_names: bool) -> None:
+    # The streaming rewrite writes the file of the parse -> save_mps_file pipeline
+    file_path = os.path.join(DATASETS_DIR, file_name)
+    parsed = parse_mps_file(file_path)
+    if not keep_names:
+        del parsed["row_names"], parsed["col_names"]
+    save_mps_file(str(tmp_path / "expected.mps"), **parsed)
+
+    result = rewrite_mps_file(file_path, str(tmp_path / "rewritten.mps"), keep_names, block_size=block_size)
+    assert (tmp_path / "rewritten.mps").read_bytes() == (tmp_path / "expected.mps").read_bytes()
+    assert (result.num_rows, result.num_columns) == parsed["A"].shape and result.nnz == parsed["A"].nnz
+
+
+@pytest.mark.parametrize("block_size", [1, 1 << 16])
+def test_rewrite_keeps_integer_markers(tmp_path: Path, block_size: int) -> None:
+    # A run of integer columns continues across blocks, the MARKER lines are written at its ends only
+    (tmp_path / "model.mps").write_text(
+        "NAME  INT\nROWS\n N  OBJ\n L  R1\nCOLUMNS\n    X1  OBJ  1   R1  1\n    M1  'MARKER'  'INTORG'\n"
+        "    X2  OBJ  2   R1  1\n    X3  OBJ  3   R1  1\n    M2  'MARKER'  'INTEND'\n    X4  R1  1\n"
+        "    M3  'MARKER'  'INTORG'\n    X5  R1  1\n    M4  'MARKER'  'INTEND'\nRHS\n    RHS  R1  5\nENDATA\n")
+    parsed = parse_mps_file(str(tmp_path / "model.mps"))
+    save_mps_file(str(tmp_path / "expected.mps"), **parsed)
+
+    rewrite_mps_file(str(tmp_path / "model.mps"), str(tmp_path / "rewritten.mps"), True, block_size=block_size)
+    assert (tmp_path / "rewritten.mps").read_bytes() == (tmp_path / "expected.mps").read_bytes()
+    assert (tmp_path / "rewritten.mps").read_text().count("'MARKER'") == 4
+
+
+def test_rewrite_objective_name_clash(tmp_path: Path) -> None:
+    # A constraint row named OBJ keeps its name, the objective row gets another one
+    (tmp_path / "model.mps").write_text(
+        "NAME  CLASH\nROWS\n N  COST\n L  OBJ\nCOLUMNS\n    X1  COST  2   OBJ  1\nRHS\n    RHS  OBJ  5\nENDATA\n")
+    rewrite_mps_file(str(tmp_path / "model.mps"), str(tmp_path / "rewritten.mps"), True)
+    assert " N  OBJ1\n" in (tmp_path / "rewritten.mps").read_text()
+    parsed = parse_mps_file(str(tmp_path / "rewritten.mps"))
+    assert parsed["row_names"] == ["OBJ"] and parsed["c"] == [2.0] and parsed["A"].toarray().tolist() == [[1.0]]
+
+
+@pytest.mark.parametrize("row_name, col_name", [("LIM 1", "X1"), ("LIM1", "X ONE")])
+def test_rewrite_rejects_names_with_blanks(tmp_path: Path, row_name: str, col_name: str) -> None:
+    # The names of a fixed MPS file may have blanks, the free MPS output can't keep them
+    (tmp_path / "model.mps").write_text(
+        f"NAME          FIXED\nROWS\n N  COST\n L  {row_name}\nCOLUMNS\n"
+        f"    {col_name:<8}  COST               1.0   {row_name:<8}           2.0\n"
+        f"RHS\n    RHS       {row_name:<8}           4.0\nENDATA\n")
+    with pytest.raises(ValueError, match="blanks"):
+        rewrite_mps_file(str(tmp_path / "model.mps"), str(tmp_path / "rewritten.mps"), True)
+    assert not (tmp_path / "rewritten.mps").exists()
+
+    # Without the names the model is rewritten
+    rewrite_mps_file(str(tmp_path / "model.mps"), str(tmp_path / "rewritten.mps"), False)
+    parsed = parse_mps_file(str(tmp_path / "rewritten.mps"))
+    assert parsed["row_names"] == ["ROW0"] and parsed["A"].toarray().tolist() == [[2.0]] and parsed["b"][0] == 4
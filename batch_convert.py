@@ -0,0 +1,275 @@
+# Headless batch conversion of whole directories of models, in both directions:
+#   .mps -> .txt  (mps_to_matrix.parse_mps_file -> mps_to_matrix.save_txt_file)
+#   .txt -> .mps  (matrix_to_mps.parse_file     -> matrix_to_mps.save_mps_file)
+#
+# Usage:
+#   python batch_convert.py Test_Datasets                  # Convert every .mps and .txt file of the directory
+#   python batch_convert.py "models/*.mps" -o out -j 8     # Glob, target directory and 8 worker processes
+#   python batch_convert.py netlib                         # Also converts model.mps.gz to model.txt.gz (gz, bz2, xz)
+#   python batch_convert.py Test_Datasets --force          # Overwrite the converted files of a previous run
+#
+# A file is skipped if its output already exists and --force is not given, or if its output is one of the inputs.
+# When x.mps and x.txt are both found (e.g. on a second run over a directory), the older one is converted and the
+# newer one, its output, is skipped. Skipped files are reported but are not failures.
+#
+# No GUI is used (tkinter is never imported), so it can run in scheduled jobs.
+
+import argparse
+import glob
+import os
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, as_completed
+from typing import Iterable, NamedTuple, Optional
+
+import mps_to_matrix
+import matrix_to_mps
+from compressed_io import strip_compression
+
+# The target extension of each input extension
+CONVERSIONS = {".mps": ".txt", ".txt": ".mps"}
+
+
+class ConversionResult(NamedTuple):
+    """
+    The outcome of the conversion of a single file.
+    """
+    input_path: str
+    output_path: str
+    parse_seconds: float          # Wall time spent parsing the input
+    save_seconds: float           # Wall time spent writing the output
+    error: Optional[str] = None   # The traceback of the failure, None if the conversion succeeded
+    skipped: Optional[str] = None  # Why the file was not converted without failing (see `plan_outputs`), or None
+
+
+def collect_inputs(sources: Iterable[str], extensions: Iterable[str] = tuple(CONVERSIONS)) -> list[str]:
+    """
+    Expands directories and glob patterns into the sorted list of the files to convert.
+
+    Parameters:
+    -----------
+    sources : Iterable[str]
+        Files, directories (all their files with one of `extensions` are used, not recursively) or glob patterns.
+    extensions : Iterable[str]
+        The extensions of the files to convert, e.g. (".mps",) to only convert MPS files to txt.
+
+    Returns:
+    --------
+    list[str]
+        The paths of the files to convert, without duplicates.
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    paths: set[str] = set()
+    for source in sources:
+        if os.path.isdir(source):
+            candidates = [os.path.join(source, name) for name in os.listdir(source)]
+        else:
+            candidates = glob.glob(source) or [source]
+        # A compressed file is converted by its inner extension, e.g. "model.mps.gz" as an .mps file
+        paths.update(path for path in candidates
+                     if os.path.isfile(path) and strip_compression(path).lower().endswith(extensions))
+    return sorted(paths)
+
+
+def output_path_for(input_path: str, output_dir: Optional[str] = None) -> str:
+    """
+    The path of the converted file: same name with the target extension, next to the input or in `output_dir`.
+    A compressed input gives an output with the same compression, e.g. "model.mps.gz" -> "model.txt.gz".
+    """
+    inner_path = strip_compression(input_path)
+    stem, extension = os.path.splitext(inner_path)
+    output_path = stem + CONVERSIONS[extension.lower()] + input_path[len(inner_path):]
+    if output_dir is not None:
+        output_path = os.path.join(output_dir, os.path.basename(output_path))
+    return output_path
+
+
+def path_key(path: str) -> str:
+    # The same key for every spelling of a path (relative, absolute, through a symbolic link)
+    return os.path.normcase(os.path.realpath(path))
+
+
+def plan_outputs(input_paths: list[str], output_dir: Optional[str] = None,
+                 force: bool = False) -> list[tuple[str, str, Optional[ConversionResult]]]:
+    """
+    Chooses the output of every input, and the inputs that are not converted.
+
+    Parameters:
+    -----------
+    input_paths : list[str]
+        The files to convert (see `collect_inputs`).
+    output_dir : Optional[str]
+        The directory the converted files are written to. None writes them next to the inputs.
+    force : bool
+        If True an output that already exists is overwritten (unless it is converted itself).
+
+    Returns:
+    --------
+    list[tuple[str, str, Optional[ConversionResult]]]
+        (input path, output path, the result of an input that is not converted or None), in the order of
+        `input_paths`. An input is skipped if:
+        - it and its output are the outputs of each other (x.mps and x.txt of the same directory, after an earlier
+          run): the older file is the source, the newer one is skipped as its output;
+        - its output is another input, which would be overwritten while it is converted;
+        - its output already exists and `force` is False.
+        An input fails if another input has the same output (e.g. a/x.mps and b/x.mps with the same `output_dir`).
+    """
+    output_paths = [output_path_for(path, output_dir) for path in input_paths]
+    input_keys = {path_key(path): path for path in input_paths}
+    output_keys = {path_key(input_path): path_key(output_path)
+                   for input_path, output_path in zip(input_paths, output_paths)}
+    output_counts = Counter(output_keys.values())
+
+    def mtime(path: str) -> float:
+        return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+    plan: list[tuple[str, str, Optional[ConversionResult]]] = []
+    for input_path, output_path in zip(input_paths, output_paths):
+        key = path_key(output_path)
+        skipped = error = None
+        if key in input_keys and output_keys.get(key) == path_key(input_path):
+            # A pair of files converted from each other, the older one is the source (the .mps if they tie)
+            source = input_keys[key]
+            newer = (mtime(input_path), strip_compression(input_path).lower().endswith(".txt")) > \
+                    (mtime(source), strip_compression(source).lower().endswith(".txt"))
+            if newer:
+                skipped = f"Skipped: the output of {source}"
+            elif not force:
+                skipped = f"Skipped: the output {output_path} already exists (use --force to overwrite it)"
+        elif key in input_keys:
+            skipped = f"Skipped: the output {output_path} is also an input"
+        elif output_counts[key] > 1:
+            error = f"Not converted: the output {output_path} is also the output of another input"
+        elif not force and os.path.exists(output_path):
+            skipped = f"Skipped: the output {output_path} already exists (use --force to overwrite it)"
+        result = None
+        if skipped is not None or error is not None:
+            result = ConversionResult(input_path, output_path, 0.0, 0.0, error, skipped)
+        plan.append((input_path, output_path, result))
+    return plan
+
+
+def convert_file(input_path: str, output_path: str, layout: str = "dense") -> ConversionResult:
+    """
+    Converts a single file, in the direction given by its extension. Failures are returned, not raised,
+    so that one bad file does not stop a batch. `layout` is the layout of A in the .txt files that are written
+    (see `mps_to_matrix.save_txt_file`).
+    """
+    parse_seconds = save_seconds = 0.0
+    try:
+        start = time.perf_counter()
+        if strip_compression(input_path).lower().endswith(".mps"):
+            parsed_data = mps_to_matrix.parse_mps_file(input_path)
+            parse_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            mps_to_matrix.save_txt_file(output_path, **parsed_data, layout=layout)
+        else:
+            parsed_txt = matrix_to_mps.parse_file(input_path)
+            parse_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            matrix_to_mps.save_mps_file(output_path, **parsed_txt)  # type: ignore
+        save_seconds = time.perf_counter() - start
+    except Exception:
+        return ConversionResult(input_path, output_path, parse_seconds, save_seconds, traceback.format_exc())
+    return ConversionResult(input_path, output_path, parse_seconds, save_seconds)
+
+
+def batch_convert(input_paths: list[str], output_dir: Optional[str] = None, workers: Optional[int] = None,
+                  layout: str = "dense", report: bool = True, force: bool = False) -> list[ConversionResult]:
+    """
+    Converts many files in a process pool. The files skipped by `plan_outputs` are returned with the reason in
+    `skipped`, the ones it refuses and the ones whose worker process died (e.g. killed when out of memory) as
+    failures; the other files are still converted.
+
+    Parameters:
+    -----------
+    input_paths : list[str]
+        The files to convert (see `collect_inputs`).
+    output_dir : Optional[str]
+        The directory the converted files are written to (created if needed). None writes them next to the inputs.
+    workers : Optional[int]
+        The number of worker processes. None uses one per CPU.
+    layout : str
+        The layout of A in the .txt files that are written, one of `mps_to_matrix.TXT_LAYOUTS`.
+    report : bool
+        If True a line is printed for every file as soon as it is done.
+    force : bool
+        If True the outputs that already exist are overwritten (see `plan_outputs`).
+
+    Returns:
+    --------
+    list[ConversionResult]
+        The results, in the order of `input_paths`.
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    results: dict[str, ConversionResult] = {}
+    jobs = []
+    for input_path, output_path, planned in plan_outputs(input_paths, output_dir, force):
+        if planned is None:
+            jobs.append((input_path, output_path))
+        else:
+            results[input_path] = planned
+            if report:
+                print_result(planned)
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(convert_file, input_path, output_path, layout): (input_path, output_path)
+                       for input_path, output_path in jobs}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except BrokenExecutor as error:
+                    # A worker died: the pool is unusable and every file not done yet is reported as failed
+                    input_path, output_path = futures[future]
+                    result = ConversionResult(input_path, output_path, 0.0, 0.0,
+                                              f"The worker process died: {type(error).__name__}: {error}")
+                results[result.input_path] = result
+                if report:
+                    print_result(result)
+
+    return [results[path] for path in input_paths]
+
+
+def print_result(result: ConversionResult) -> None:
+    # One line per file, followed by the traceback if it failed or the reason if it was skipped
+    status = "FAILED" if result.error else "skipped" if result.skipped else "ok"
+    print(f"{status:<8}{result.parse_seconds:>9.3f}s parse{result.save_seconds:>9.3f}s save   "
+          f"{result.input_path} -> {result.output_path}")
+    if result.error or result.skipped:
+        print(result.error or result.skipped)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert .mps files to .txt and .txt files to .mps in bulk.")
+    parser.add_argument("sources", nargs="+", help="Files, directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", help="Write the converted files here instead of next to the inputs")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument("--to", choices=["txt", "mps"], help="Only convert to this format")
+    parser.add_argument("--layout", choices=mps_to_matrix.TXT_LAYOUTS, default="dense",
+                        help="Layout of A in the .txt files (the sparse layouts are much smaller for large models)")
+    parser.add_argument("--force", action="store_true", help="Overwrite the converted files that already exist")
+    args = parser.parse_args()
+
+    extensions = [source for source, target in CONVERSIONS.items() if args.to is None or target == "." + args.to]
+    input_paths = collect_inputs(args.sources, extensions)
+    if not input_paths:
+        print("No files to convert")
+        return 1
+
+    start = time.perf_counter()
+    results = batch_convert(input_paths, args.output_dir, args.workers, args.layout, force=args.force)
+    failures = [result for result in results if result.error]
+    skipped = [result for result in results if result.skipped]
+    print(f"Converted {len(results) - len(failures) - len(skipped)} of {len(results)} files in "
+          f"{time.perf_counter() - start:.3f}s ({len(skipped)} skipped, {len(failures)} failed)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+"""
+Benchmark of the bulk COLUMNS tokenizer of `mps_to_matrix.parse_mps_file` against the previous
+line-by-line implementation (kept below as `legacy_parse_mps_file`).
+
+Every instance of `Test_Datasets/*.mps` is parsed, together with a synthetic instance that is large
+enough for the COLUMNS section to dominate the parse time. Both parsers must return the same `A` and `c`.
+
+Usage:
+    python benchmarks/bench_columns.py [--columns 200000] [--nnz-per-column 10] [--repeat 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import numpy as np
+from scipy import sparse
+
+# Make the modules of the repository importable when the script is run directly
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.append(REPO_DIR)
+
+from mps_to_matrix import parse_mps_file  # noqa: E402
+
+
+def legacy_parse_mps_file(input_file_path: str) -> dict:
+    """
+    The line-by-line parser that `parse_mps_file` used before the bulk COLUMNS tokenizer, used as the reference.
+    """
+    A_values: list[float] = []
+    A_rows: list[int] = []
+    A_cols: list[int] = []
+    A_cols_names: dict[str, int] = {}
+    last_column_name: str = ""
+    nnz: int = 0
+    current_col: int = -1
+    zeros_in_c_in_a_row: int = 0
+
+    b: np.ndarray = np.zeros(0)
+    c: list[float] = []
+    Eqin: list[int] = []
+    MinMax: int = -1
+    Bounds: list[str] = []
+    convert_dict = {"L": -1, "E": 0, "G": 1}
+    objective_fun: str = ""
+    num_of_restrains: int = 0
+    Restrains_names: dict[str, int] = {}
+    current_section = None
+
+    with open(input_file_path, 'r') as file:
+        for line in file:
+            if line.startswith('*') or line.strip() == '':
+                continue
+            if line.startswith(("NAME", "ROWS", "COLUMNS", "RHS", "BOUNDS", "RANGES", "ENDATA")):
+                if line.startswith("NAME"):
+                    current_section = "NAME"
+                    if len(line.split()) == 3:
+                        MinMax = 1
+                elif line.startswith("ROWS"):
+                    current_section = "ROWS"
+                elif line.startswith("COLUMNS"):
+                    current_section = "COLUMNS"
+                elif line.startswith("RHS"):
+                    b = np.zeros(num_of_restrains)
+                    current_section = "RHS"
+                elif line.startswith("BOUNDS"):
+                    current_section = "BOUNDS"
+                elif line.startswith("RANGES"):
+                    current_section = "RANGES"
+                elif line.startswith("ENDATA"):
+                    break
+            elif current_section == "ROWS":
+                a = line.split()
+                if a[0] == "N":
+                    objective_fun = a[1]
+                else:
+                    Eqin.append(convert_dict[a[0]])
+                    Restrains_names[a[1]] = num_of_restrains
+                    num_of_restrains += 1
+            elif current_section == "COLUMNS":
+                a = line.strip().split()
+                if a[0] != last_column_name:
+                    last_column_name = a[0]
+                    current_col += 1
+                    A_cols_names[a[0]] = current_col
+                    A_cols.append(nnz)
+                    zeros_in_c_in_a_row += 1
+                for k in (1, 3):
+                    if k >= len(a):
+                        break
+                    try:
+                        A_rows.append(Restrains_names[a[k]])
+                        A_values.append(float(a[k + 1]))
+                        nnz += 1
+                    except KeyError:
+                        if a[k] != objective_fun:
+                            raise
+                        c.extend([0] * (zeros_in_c_in_a_row - 1))
+                        zeros_in_c_in_a_row = 0
+                        c.append(float(a[k + 1]))
+            elif current_section == "RHS":
+                a = line.strip().split()
+                b[Restrains_names[a[1]]] = float(a[2])
+                if len(a) > 3:
+                    b[Restrains_names[a[3]]] = float(a[4])
+            elif current_section == "BOUNDS":
+                a = line.split()
+                value = a[3] if len(a) > 3 else "None"
+                Bounds.append(f"{a[0]} {A_cols_names[a[2]]} {value}")
+
+    A_cols.append(nnz)
+    c.extend([0] * zeros_in_c_in_a_row)
+    A = sparse.csc_array((A_values, A_rows, A_cols)).tocsr()
+    return {"MinMax": MinMax, "A": A, "b": b, "c": c, "Eqin": Eqin, "Bounds": Bounds}
+
+
+def write_synthetic_mps(file_path: str, num_rows: int, num_columns: int, nnz_per_column: int, seed: int = 0) -> None:
+    """
+    Writes a random LP in free MPS format, with `nnz_per_column` non-zeros and an objective coefficient in every column.
+    """
+    rng = np.random.default_rng(seed)
+    with open(file_path, "w") as file:
+        file.write("NAME          SYNTHETIC\nROWS\n N  COST\n")
+        file.write("".join(f" L  R{i:07d}\n" for i in range(num_rows)))
+        file.write("COLUMNS\n")
+        for j in range(num_columns):
+            rows = rng.choice(num_rows, size=nnz_per_column, replace=False)
+            values = np.round(rng.uniform(-100, 100, size=nnz_per_column), 3)
+            entries = [("COST", round(float(rng.uniform(-10, 10)), 3))] + [(f"R{r:07d}", v) for r, v in zip(rows, values)]
+            for k in range(0, len(entries), 2):
+                pair = entries[k:k + 2]
+                file.write(f"    X{j:07d}  " + "   ".join(f"{name}  {value}" for name, value in pair) + "\n")
+        file.write("RHS\n")
+        file.write("".join(f"    RHS       R{i:07d}  1.\n" for i in range(num_rows)))
+        file.write("ENDATA\n")
+
+
+def best_time(function: Callable[[str], dict], file_path: str, repeat: int) -> tuple[float, dict]:
+    # Best wall time out of `repeat` runs, the best time is the least affected by other processes
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(file_path)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, default=200000, help="Columns of the synthetic instance (0 to skip it)")
+    parser.add_argument("--nnz-per-column", type=int, default=10, help="Non-zeros per column of the synthetic instance")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser, the best time is reported")
+    args = parser.parse_args()
+
+    instances = sorted(glob.glob(os.path.join(REPO_DIR, "Test_Datasets", "*.mps")))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.columns:
+            synthetic = os.path.join(tmp_dir, "synthetic.mps")
+            write_synthetic_mps(synthetic, max(args.columns // 2, args.nnz_per_column), args.columns, args.nnz_per_column)
+            instances.append(synthetic)
+
+        print(f"{'instance':<22}{'MB':>8}{'nnz':>11}{'legacy (s)':>12}{'bulk (s)':>10}{'speedup':>9}")
+        for file_path in instances:
+            legacy_time, expected = best_time(legacy_parse_mps_file, file_path, args.repeat)
+            bulk_time, result = best_time(parse_mps_file, file_path, args.repeat)
+
+            # Both parsers must agree on the matrix and the objective function
+            assert result["A"].shape == expected["A"].shape and (result["A"] != expected["A"]).nnz == 0
+            assert np.array_equal(result["c"], expected["c"])
+
+            size_mb = os.path.getsize(file_path) / 2**20
+            print(f"{os.path.basename(file_path):<22}{size_mb:>8.2f}{result['A'].nnz:>11}"
+                  f"{legacy_time:>12.4f}{bulk_time:>10.4f}{legacy_time / bulk_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
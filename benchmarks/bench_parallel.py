@@ -0,0 +1,77 @@
+"""
+Scaling benchmark of the parallel COLUMNS parser of `mps_to_matrix.parse_mps_file` (the `workers` option).
+
+Every instance of `Test_Datasets/*.mps` (and optionally a synthetic instance) is parsed with an increasing
+number of worker processes. The result must match the serial parse. The instances of `Test_Datasets` are
+below `PARALLEL_MIN_BYTES`, so the threshold is lowered to 0 to force them through the process pool.
+
+Usage:
+    python benchmarks/bench_parallel.py [--workers 1,2,4,8,16,32] [--columns 400000] [--repeat 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.append(REPO_DIR)
+
+import mps_to_matrix  # noqa: E402
+from mps_to_matrix import parse_mps_file  # noqa: E402
+from bench_columns import write_synthetic_mps  # noqa: E402
+
+
+def best_time(file_path: str, workers: int, repeat: int) -> tuple[float, dict]:
+    # Best wall time out of `repeat` runs
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse_mps_file(file_path, workers=workers)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma separated worker counts")
+    parser.add_argument("--columns", type=int, default=0, help="Columns of a synthetic instance (0 to skip it)")
+    parser.add_argument("--nnz-per-column", type=int, default=10, help="Non-zeros per column of the synthetic instance")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count, the best time is reported")
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(",")]
+
+    mps_to_matrix.PARALLEL_MIN_BYTES = 0
+    instances = sorted(glob.glob(os.path.join(REPO_DIR, "Test_Datasets", "*.mps")))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.columns:
+            synthetic = os.path.join(tmp_dir, "synthetic.mps")
+            write_synthetic_mps(synthetic, max(args.columns // 2, args.nnz_per_column), args.columns, args.nnz_per_column)
+            instances.append(synthetic)
+
+        print(f"CPUs: {os.cpu_count()}")
+        print(f"{'instance':<22}{'MB':>8}" + "".join(f"{f'{count} (s)':>10}" for count in worker_counts)
+              + f"{'best speedup':>14}")
+        for file_path in instances:
+            times = []
+            expected = None
+            for count in worker_counts:
+                elapsed, result = best_time(file_path, count, args.repeat)
+                times.append(elapsed)
+                if expected is None:
+                    expected = result
+                else:
+                    # Every worker count must give the same model
+                    assert (result["A"] != expected["A"]).nnz == 0 and result["c"] == expected["c"]
+                    assert result["Bounds"] == expected["Bounds"]
+
+            size_mb = os.path.getsize(file_path) / 2**20
+            print(f"{os.path.basename(file_path):<22}{size_mb:>8.2f}" + "".join(f"{t:>10.4f}" for t in times)
+                  + f"{times[0] / min(times):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmark suite of both converters over `Test_Datasets/*.mps` and synthetic scaled-up instances, with
+regression tracking against a saved baseline.
+
+For every instance the stages of a round trip are measured:
+    parse_mps   mps_to_matrix.parse_mps_file   (.mps -> arrays)
+    save_txt    mps_to_matrix.save_txt_file    (arrays -> .txt)
+    parse_txt   matrix_to_mps.parse_file       (.txt -> arrays)
+    save_mps    matrix_to_mps.save_mps_file    (arrays -> .mps)
+    round_trip  the four stages together; the model read back must match the original
+Each stage reports its best wall time out of `--repeat` runs, the throughput in MB/s (of the file read or written)
+and in non-zeros/s, and its peak Python memory (measured by tracemalloc in one extra run, NumPy arrays included).
+
+The results are saved as JSON. Comparing with a baseline flags the stages that got slower or use more memory than
+the baseline by more than `--threshold` (the exit code is then 1), so the suite can gate changes in CI.
+
+Usage:
+    python benchmarks/bench_suite.py --save baseline.json                       # Record a baseline
+    python benchmarks/bench_suite.py --baseline baseline.json --save new.json   # Compare a change against it
+    python benchmarks/bench_suite.py --scales 100000,400000 --layout rows       # Larger synthetic instances
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple, Optional
+
+import numpy as np
+import scipy
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.append(REPO_DIR)
+
+import matrix_to_mps  # noqa: E402
+import mps_to_matrix  # noqa: E402
+from bench_columns import write_synthetic_mps  # noqa: E402
+
+# Version of the layout of the JSON results
+RESULTS_FORMAT_VERSION = 1
+
+# The metrics compared with the baseline, a higher value is worse for all of them
+COMPARED_METRICS = ("seconds", "peak_mb")
+
+
+class Regression(NamedTuple):
+    """
+    A metric of a stage that got worse than the baseline by more than the threshold.
+    """
+    instance: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def measure(function: Callable[[], Any], repeat: int) -> tuple[float, float, Any]:
+    """
+    Runs `function` `repeat` times and once more under tracemalloc. Returns the best wall time, the peak
+    memory (in MB) and the last result. The converters print progress messages, they are discarded.
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            result = function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return min(times), peak / 2**20, result
+
+
+def stage_metrics(seconds: float, peak_mb: float, file_bytes: int, nnz: int) -> dict[str, float]:
+    return {
+        "seconds": seconds,
+        "peak_mb": peak_mb,
+        "mb_per_s": file_bytes / 2**20 / seconds if seconds else 0.0,
+        "nnz_per_s": nnz / seconds if seconds else 0.0,
+    }
+
+
+def bench_instance(mps_path: str, work_dir: str, repeat: int, layout: str) -> dict[str, Any]:
+    """
+    Measures the stages of the round trip of an .mps file (see the top of the module).
+
+    Raises:
+    -------
+    AssertionError
+        If the model read back from the .txt and .mps files differs from the original.
+    """
+    txt_path = os.path.join(work_dir, "round_trip.txt")
+    out_path = os.path.join(work_dir, "round_trip.mps")
+
+    seconds, peak, parsed = measure(lambda: mps_to_matrix.parse_mps_file(mps_path), repeat)
+    nnz = int(parsed["A"].nnz)
+    results: dict[str, Any] = {"mps_mb": os.path.getsize(mps_path) / 2**20, "shape": list(parsed["A"].shape),
+                               "nnz": nnz}
+    stages = {"parse_mps": stage_metrics(seconds, peak, os.path.getsize(mps_path), nnz)}
+
+    seconds, peak, _ = measure(lambda: mps_to_matrix.save_txt_file(txt_path, **parsed, layout=layout), repeat)
+    stages["save_txt"] = stage_metrics(seconds, peak, os.path.getsize(txt_path), nnz)
+
+    seconds, peak, loaded = measure(lambda: matrix_to_mps.parse_file(txt_path), repeat)
+    stages["parse_txt"] = stage_metrics(seconds, peak, os.path.getsize(txt_path), nnz)
+
+    seconds, peak, _ = measure(lambda: matrix_to_mps.save_mps_file(out_path, **loaded), repeat)
+    stages["save_mps"] = stage_metrics(seconds, peak, os.path.getsize(out_path), nnz)
+
+    # The round trip is the sum of its stages (the best runs), its peak memory the highest of them
+    stages["round_trip"] = stage_metrics(sum(stage["seconds"] for stage in stages.values()),
+                                         max(stage["peak_mb"] for stage in stages.values()),
+                                         os.path.getsize(mps_path), nnz)
+
+    # The model must survive the round trip
+    with contextlib.redirect_stdout(io.StringIO()):
+        reparsed = mps_to_matrix.parse_mps_file(out_path)
+    assert reparsed["A"].shape == parsed["A"].shape and (reparsed["A"] != parsed["A"]).nnz == 0
+    assert np.array_equal(reparsed["b"], parsed["b"]) and np.array_equal(reparsed["c"], parsed["c"])
+
+    results["stages"] = stages
+    return results
+
+
+def run_suite(instances: list[str], repeat: int = 3, layout: str = "triplets",
+              report: bool = True) -> dict[str, Any]:
+    """
+    Benchmarks every instance and returns the results in the JSON layout (see `compare`).
+    """
+    results: dict[str, Any] = {
+        "version": RESULTS_FORMAT_VERSION,
+        "environment": {
+            "python": platform.python_version(), "numpy": np.__version__, "scipy": scipy.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(), "layout": layout, "repeat": repeat,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "instances": {},
+    }
+    if report:
+        print(f"{'instance':<22}{'stage':<12}{'seconds':>10}{'MB/s':>10}{'Mnnz/s':>10}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for mps_path in instances:
+            name = os.path.splitext(os.path.basename(mps_path))[0]
+            results["instances"][name] = bench_instance(mps_path, work_dir, repeat, layout)
+            if report:
+                for stage, metrics in results["instances"][name]["stages"].items():
+                    print(f"{name:<22}{stage:<12}{metrics['seconds']:>10.4f}{metrics['mb_per_s']:>10.1f}"
+                          f"{metrics['nnz_per_s'] / 1e6:>10.2f}{metrics['peak_mb']:>10.1f}")
+    return results
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.1,
+            memory_threshold: Optional[float] = None, min_seconds: float = 0.005) -> list[Regression]:
+    """
+    Compares results with a baseline (both as returned by `run_suite` or loaded from its JSON files).
+
+    Parameters:
+    -----------
+    results, baseline : dict[str, Any]
+        The results of the current run and of the baseline. Only the instances and stages found in both are compared.
+    threshold : float
+        The relative slowdown that is flagged, e.g. 0.1 flags stages more than 10% slower than the baseline.
+    memory_threshold : Optional[float]
+        The relative growth of the peak memory that is flagged. None uses `threshold`.
+    min_seconds : float
+        Slowdowns smaller than this (in seconds) are timer noise on the small instances and are not flagged.
+
+    Returns:
+    --------
+    list[Regression]
+        The metrics that got worse by more than the thresholds.
+    """
+    limits = {"seconds": threshold, "peak_mb": threshold if memory_threshold is None else memory_threshold}
+    regressions = []
+    for name, instance in results["instances"].items():
+        baseline_stages = baseline["instances"].get(name, {}).get("stages", {})
+        for stage, metrics in instance["stages"].items():
+            for metric in COMPARED_METRICS:
+                if stage not in baseline_stages or metric not in baseline_stages[stage]:
+                    continue
+                reference, current = baseline_stages[stage][metric], metrics[metric]
+                if metric == "seconds" and current - reference < min_seconds:
+                    continue
+                if current > reference * (1 + limits[metric]):
+                    regressions.append(Regression(name, stage, metric, reference, current))
+    return regressions
+
+
+def default_instances(work_dir: str, scales: list[int], nnz_per_column: int) -> list[str]:
+    # The .mps files of Test_Datasets and a synthetic instance of every scale (number of columns)
+    instances = sorted(glob.glob(os.path.join(REPO_DIR, "Test_Datasets", "*.mps")))
+    for columns in scales:
+        synthetic = os.path.join(work_dir, f"synthetic-{columns}.mps")
+        write_synthetic_mps(synthetic, max(columns // 2, nnz_per_column), columns, nnz_per_column)
+        instances.append(synthetic)
+    return instances
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("instances", nargs="*", help=".mps files to benchmark (default: Test_Datasets and synthetic)")
+    parser.add_argument("--scales", default="20000,100000",
+                        help="Comma separated column counts of the synthetic instances (empty to skip them)")
+    parser.add_argument("--nnz-per-column", type=int, default=10, help="Non-zeros per column of the synthetic instances")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, the best time is reported")
+    parser.add_argument("--layout", choices=mps_to_matrix.TXT_LAYOUTS, default="triplets",
+                        help="Layout of A in the .txt files (dense is m*n and slow for the synthetic instances)")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown flagged as a regression")
+    parser.add_argument("--memory-threshold", type=float, help="Relative peak memory growth flagged (default: threshold)")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Smaller slowdowns are ignored as noise")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        scales = [int(scale) for scale in args.scales.split(",") if scale]
+        instances = args.instances or default_instances(work_dir, scales, args.nnz_per_column)
+        results = run_suite(instances, args.repeat, args.layout)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold, args.memory_threshold, args.min_seconds)
+        for regression in regressions:
+            print(f"REGRESSION {regression.instance} {regression.stage} {regression.metric}: "
+                  f"{regression.baseline:.4g} -> {regression.current:.4g} ({regression.ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regression against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
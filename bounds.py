@@ -0,0 +1,171 @@
+# An array backed representation of the variable bounds of a linear program (the BOUNDS section of an .mps file),
+# shared by mps_to_matrix and matrix_to_mps.
+#
+# Every bound is a type code, a 0-based column index and a float64 value (NaN for the types without a value,
+# such as FR). The bounds used to be "TYPE column value" strings ("UP 3 10"); `BoundsArray` is still a
+# sequence of such strings, so code that iterates, indexes or compares the old lists keeps working. The values
+# read from a file also keep their text ("10", not "10.0"), so that they are written back as they were read.
+
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Optional, Tuple, Union, overload
+
+import numpy as np
+
+# The MPS bound types, the code of a type is its index in BOUND_TYPES
+BOUND_TYPES = ("LO", "UP", "FX", "FR", "MI", "PL", "BV", "LI", "UI", "SC")
+BOUND_CODES = {name: code for code, name in enumerate(BOUND_TYPES)}
+
+
+class BoundsArray(Sequence):
+    """
+    The variable bounds as three parallel arrays:
+        kinds   : uint8 codes of the bound types (indices of `BOUND_TYPES`)
+        columns : int64 0-based column indices
+        values  : float64 values, NaN for a bound without value
+
+        texts   : optional bytes texts of the values as read ("None" for a bound without value)
+
+    Indexing and iterating give the former "TYPE column value" strings ("None" for a missing value), and
+    a `BoundsArray` equals a list of such strings with the same bounds (values are compared as numbers).
+    """
+
+    def __init__(self, kinds: Iterable[int] = (), columns: Iterable[int] = (), values: Iterable[float] = (),
+                 texts: Optional[Iterable[bytes]] = None) -> None:
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        self.columns = np.asarray(columns, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+        # Without texts the values are formatted like str(float)
+        self.texts = np.asarray(texts, dtype=bytes) if texts is not None else None
+        if not len(self.kinds) == len(self.columns) == len(self.values):
+            raise ValueError("kinds, columns and values must have the same length")
+        if self.texts is not None and len(self.texts) != len(self.values):
+            raise ValueError("texts and values must have the same length")
+
+    @classmethod
+    def from_strings(cls, bounds: Iterable[str]) -> "BoundsArray":
+        """
+        Builds the arrays from "TYPE column value" strings (the value may be "None" or missing).
+
+        Raises:
+        -------
+        KeyError
+            If a bound type is not one of `BOUND_TYPES`.
+        """
+        kinds: list[int] = []
+        columns: list[str] = []
+        texts: list[str] = []
+        for bound in bounds:
+            a = bound.split()
+            kinds.append(BOUND_CODES[a[0]])
+            columns.append(a[1])
+            texts.append(a[2] if len(a) > 2 else "None")
+        # The numbers are converted at once, the texts are kept
+        return cls.from_texts(kinds, np.array(columns, dtype=np.int64), texts)
+
+    @classmethod
+    def from_texts(cls, kinds: Iterable[int], columns: Iterable[int], texts: list[str]) -> "BoundsArray":
+        """
+        Builds the arrays from the texts of the values ("None" for a bound without value), which are kept.
+
+        Raises:
+        -------
+        ValueError
+            If a text is not a number.
+        """
+        text_array = np.array(texts, dtype=bytes) if texts else np.empty(0, dtype="S1")
+        values = np.where(text_array == b"None", b"nan", text_array).astype(np.float64)
+        return cls(kinds, columns, values, text_array)
+
+    @property
+    def nbytes(self) -> int:
+        # The memory used by the arrays
+        return int(self.kinds.nbytes + self.columns.nbytes + self.values.nbytes
+                   + (self.texts.nbytes if self.texts is not None else 0))
+
+    def type_names(self) -> np.ndarray:
+        # The bound type of every bound ("LO", "UP", ...)
+        return np.array(BOUND_TYPES)[self.kinds]
+
+    def value_texts(self) -> np.ndarray:
+        # The values as read (or formatted like str(float) without texts), "None" for the bounds without value
+        if self.texts is not None:
+            return self.texts.astype(str).astype(object)
+        texts = self.values.astype(str).astype(object)
+        texts[np.isnan(self.values)] = "None"
+        return texts
+
+    def to_strings(self) -> list[str]:
+        """
+        The bounds in the former string form, e.g. ["UP 3 10.0", "FR 4 None"].
+        """
+        texts = (self.type_names().astype(object) + " " + self.columns.astype(str).astype(object) + " "
+                 + self.value_texts())
+        return list(texts.tolist())
+
+    def to_dense(self, num_columns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The lower and upper bound of every column, applying the bounds in order over the MPS defaults
+        (lower 0, upper +inf):
+            LO, LI: lower = value        UP, UI, SC: upper = value     FX: lower = upper = value
+            FR: lower = -inf, upper = +inf     MI: lower = -inf     PL: upper = +inf     BV: lower = 0, upper = 1
+        """
+        kinds = self.type_names()
+        lower = np.zeros(num_columns)
+        upper = np.full(num_columns, np.inf)
+        for target, value_types, constants in (
+            (lower, ("LO", "LI", "FX"), {"FR": -np.inf, "MI": -np.inf, "BV": 0.0}),
+            (upper, ("UP", "UI", "SC", "FX"), {"FR": np.inf, "PL": np.inf, "BV": 1.0}),
+        ):
+            new_values = np.where(np.isin(kinds, value_types), self.values, np.nan)
+            for name, constant in constants.items():
+                new_values[kinds == name] = constant
+            sets = np.isin(kinds, value_types + tuple(constants))
+            # When a column has several bounds on the same side the last one wins
+            columns = self.columns[sets][::-1]
+            _, last = np.unique(columns, return_index=True)
+            target[columns[last]] = new_values[sets][::-1][last]
+        return lower, upper
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "BoundsArray": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "BoundsArray"]:
+        if isinstance(index, slice):
+            return BoundsArray(self.kinds[index], self.columns[index], self.values[index],
+                               self.texts[index] if self.texts is not None else None)
+        value = self.values[index]
+        if self.texts is not None:
+            value_text = self.texts[index].decode()
+        else:
+            value_text = "None" if np.isnan(value) else str(float(value))
+        return f"{BOUND_TYPES[self.kinds[index]]} {self.columns[index]} {value_text}"
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_strings())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BoundsArray):
+            if not isinstance(other, (list, tuple)):
+                return NotImplemented
+            try:
+                other = BoundsArray.from_strings(other)
+            except (KeyError, IndexError, ValueError, AttributeError):
+                return False
+        return (np.array_equal(self.kinds, other.kinds) and np.array_equal(self.columns, other.columns)
+                and np.array_equal(self.values, other.values, equal_nan=True))
+
+    def __repr__(self) -> str:
+        return f"BoundsArray({self.to_strings()!r})"
+
+
+def as_bounds(Bounds: Union[BoundsArray, Iterable[str]]) -> BoundsArray:
+    """
+    The bounds as a `BoundsArray`, converting a list of "TYPE column value" strings.
+    """
+    return Bounds if isinstance(Bounds, BoundsArray) else BoundsArray.from_strings(Bounds)
@@ -0,0 +1,269 @@
+# Transparent gzip / bz2 / xz input and output for both converters, so that compressed models (such as the
+# .mps.gz files of Netlib and MIPLIB) are read and written without temporary files.
+#
+# Usage:
+#   with open_input("afiro.mps.gz") as file: ...          # Binary, decompressed by a background thread
+#   with open_output("afiro.txt.xz") as file: ...         # Text, compressed while it is written
+#
+# The compression of an input is detected by its extension or, failing that, by its magic bytes; the compression
+# of an output by its extension. Files that are not compressed are opened as usual.
+#
+# zlib, bz2 and lzma release the GIL while they work, so the thread of `DecompressingReader` decompresses the
+# next blocks while the caller parses the previous ones.
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from collections import deque
+from typing import IO, Any, BinaryIO, Callable, Deque, Iterator, Optional, TextIO, Union
+
+# The compressions by file extension and by magic bytes, and how their files are opened
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+_OPENERS: dict[str, Callable[..., IO[Any]]] = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+# Compression levels of the files written, the defaults of the gzip, bzip2 and xz command line tools
+COMPRESSION_LEVELS = {"gzip": {"compresslevel": 6}, "bz2": {"compresslevel": 9}, "xz": {"preset": 6}}
+
+# Size (in bytes) of the blocks decompressed by the background thread, and number of blocks it may run ahead
+DECOMPRESS_BLOCK_SIZE: int = 1 << 22
+DECOMPRESS_QUEUE_BLOCKS: int = 4
+
+# Bytes a `DecompressingReader` keeps after returning them, so that the caller can seek back over them
+REWIND_LIMIT: int = 1 << 24
+
+
+def compression_of_path(file_path: str) -> Optional[str]:
+    """
+    The compression given by the extension of a path ("gzip", "bz2" or "xz"), None for other extensions.
+    """
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    The compression of an existing file, from its extension or else from its first bytes. None if it is not compressed.
+    """
+    compression = compression_of_path(file_path)
+    if compression is not None:
+        return compression
+    with open(file_path, "rb") as file:
+        head = file.read(6)
+    return next((name for magic, name in COMPRESSION_MAGIC.items() if head.startswith(magic)), None)
+
+
+def strip_compression(file_path: str) -> str:
+    # "model.mps.gz" -> "model.mps"
+    stem, extension = os.path.splitext(file_path)
+    return stem if extension.lower() in COMPRESSION_EXTENSIONS else file_path
+
+
+class DecompressingReader:
+    """
+    A read-only binary file that decompresses a compressed file in a background thread, `DECOMPRESS_BLOCK_SIZE`
+    bytes at a time and up to `DECOMPRESS_QUEUE_BLOCKS` blocks ahead of the reader.
+
+    It supports what the stream parsers need of a file: `read`, `readline`, iterating over lines, `tell`, and
+    seeking back from the current position (`seek(-n, os.SEEK_CUR)`) over the last `REWIND_LIMIT` bytes read.
+    """
+
+    def __init__(self, file_path: str, compression: str) -> None:
+        self.name = file_path
+        self._stream = _OPENERS[compression](file_path, "rb")
+        self._blocks: "queue.Queue[Union[bytes, BaseException]]" = queue.Queue(DECOMPRESS_QUEUE_BLOCKS)
+        self._stop = threading.Event()
+        self._buffer = b""        # The block being read
+        self._pos = 0             # Position in `_buffer`
+        self._offset = 0          # Position in the decompressed data (see `tell`)
+        self._eof = False
+        self._recent: Deque[bytes] = deque()  # The data returned last, for seeking back
+        self._recent_size = 0
+        self.closed = False
+        self._thread = threading.Thread(target=self._decompress, name="decompress", daemon=True)
+        self._thread.start()
+
+    def _decompress(self) -> None:
+        # Runs in the background thread: queue the decompressed blocks, then b"" (or the error that stopped it)
+        try:
+            while not self._stop.is_set():
+                block = self._stream.read(DECOMPRESS_BLOCK_SIZE)
+                self._put(block)
+                if not block:
+                    return
+        except BaseException as error:
+            self._put(error)
+
+    def _put(self, item: Union[bytes, BaseException]) -> None:
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _fill(self) -> bool:
+        # Moves to the next block, False at the end of the data
+        if self._eof:
+            return False
+        item = self._blocks.get()
+        if isinstance(item, BaseException):
+            self._eof = True
+            raise item
+        if not item:
+            self._eof = True
+            return False
+        self._buffer, self._pos = item, 0
+        return True
+
+    def _returned(self, data: bytes) -> bytes:
+        # Keeps the last REWIND_LIMIT bytes returned (as references to the returned objects)
+        self._offset += len(data)
+        self._recent.append(data)
+        self._recent_size += len(data)
+        while self._recent_size - len(self._recent[0]) >= REWIND_LIMIT:
+            self._recent_size -= len(self._recent.popleft())
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        remaining = size if size is not None and size >= 0 else float("inf")
+        while remaining > 0:
+            if self._pos >= len(self._buffer) and not self._fill():
+                break
+            end = len(self._buffer) if remaining == float("inf") else self._pos + int(remaining)
+            part = self._buffer[self._pos:end]
+            self._pos += len(part)
+            remaining -= len(part)
+            parts.append(part)
+        return self._returned(parts[0] if len(parts) == 1 else b"".join(parts))
+
+    def readline(self, size: int = -1) -> bytes:
+        parts = []
+        while True:
+            if self._pos >= len(self._buffer) and not self._fill():
+                break
+            end = self._buffer.find(b"\n", self._pos)
+            part = self._buffer[self._pos:] if end < 0 else self._buffer[self._pos:end + 1]
+            self._pos += len(part)
+            parts.append(part)
+            if end >= 0:
+                break
+        return self._returned(b"".join(parts))
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def tell(self) -> int:
+        return self._offset
+
+    def seekable(self) -> bool:
+        return False
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """
+        Seeks back over data already read (the target must be within the last `REWIND_LIMIT` bytes read).
+
+        Raises:
+        -------
+        io.UnsupportedOperation
+            If the target is ahead of the current position or too far back.
+        """
+        target = offset if whence == os.SEEK_SET else self._offset + offset if whence == os.SEEK_CUR else -1
+        back = self._offset - target
+        if whence not in (os.SEEK_SET, os.SEEK_CUR) or back < 0 or back > self._recent_size:
+            raise io.UnsupportedOperation("A compressed file can only seek back over recently read data")
+        if back:
+            # The data to read again is put in front of the rest of the current block
+            parts: list[bytes] = []
+            needed = back
+            while needed:
+                part = self._recent.pop()
+                self._recent_size -= len(part)
+                if len(part) > needed:
+                    self._recent.append(part[:len(part) - needed])
+                    self._recent_size += len(part) - needed
+                    part = part[len(part) - needed:]
+                parts.append(part)
+                needed -= len(part)
+            self._buffer = b"".join(reversed(parts)) + self._buffer[self._pos:]
+            self._pos = 0
+            self._offset = target
+        return self._offset
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._stop.set()
+        self._thread.join()
+        self._stream.close()
+
+    def __enter__(self) -> "DecompressingReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+# What `open_input` returns: both are read the same way by the stream parsers
+InputFile = Union[BinaryIO, DecompressingReader]
+
+
+def open_input(file_path: str) -> InputFile:
+    """
+    Opens a file for reading in binary mode, decompressing it in a background thread if it is compressed
+    (see `detect_compression`).
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "rb")
+    return DecompressingReader(file_path, compression)
+
+
+def open_text_input(file_path: str) -> io.TextIOWrapper:
+    """
+    `open_input` in text mode.
+    """
+    raw = open_input(file_path)
+    if isinstance(raw, DecompressingReader):
+        return io.TextIOWrapper(io.BufferedReader(_RawReader(raw)))  # type: ignore[arg-type]
+    return io.TextIOWrapper(raw)  # type: ignore[arg-type]
+
+
+class _RawReader(io.RawIOBase):
+    # Presents a DecompressingReader as a raw stream, for io.BufferedReader / io.TextIOWrapper
+    def __init__(self, reader: DecompressingReader) -> None:
+        self._reader = reader
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._reader.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self._reader.close()
+        super().close()
+
+
+def open_output(file_path: str, buffering: int = -1) -> TextIO:
+    """
+    Opens a file for writing in text mode, compressed if its extension is one of `COMPRESSION_EXTENSIONS`
+    (with the level of `COMPRESSION_LEVELS`). `buffering` is the buffer size of an uncompressed file.
+    """
+    compression = compression_of_path(file_path)
+    if compression is None:
+        return open(file_path, "w", buffering=buffering)
+    return _OPENERS[compression](file_path, "wt", **COMPRESSION_LEVELS[compression])  # type: ignore[return-value]
@@ -0,0 +1,341 @@
+# A long-lived conversion service, so that many files can be converted without starting Python (and importing
+# NumPy / SciPy) for each of them:
+#   .mps -> .txt  (mps_to_matrix.parse_mps_file -> mps_to_matrix.save_txt_file)
+#   .txt -> .mps  (matrix_to_mps.parse_file     -> matrix_to_mps.save_mps_file)
+#
+# Usage:
+#   python conversion_service.py --socket /tmp/mps.sock -j 8         # Serve on a Unix socket with 8 worker processes
+#   python conversion_service.py --port 8765 --max-in-flight 4       # Serve on localhost:8765
+#
+# Protocol: newline delimited JSON. Every request line gets one response line, sent as soon as it is ready,
+# so the responses of a connection may come back in another order than the requests (match them by "id"):
+#   {"id": 1, "input": "model.mps", "output": "model.txt", "layout": "triplets"}   ("output" and "layout" are optional)
+#       -> {"id": 1, "input_path": ..., "output_path": ..., "parse_seconds": ..., "save_seconds": ...,
+#           "latency_seconds": ..., "error": null}
+#   {"id": 2, "command": "stats"}
+#       -> {"id": 2, "stats": {"queue_depth": ..., "in_flight": ..., "completed": ..., "latency_p50": ..., ...}}
+#
+# The conversions run in a process pool (the same `batch_convert.convert_file` as the batch converter), and at most
+# `max_in_flight` of them are handed to the pool at a time; the other requests wait in the queue. A request whose
+# input is the output of a queued or running conversion, or whose output is its input or output, gets an "error":
+# the conversions of x.mps and x.txt would otherwise overwrite each other's input.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Iterable, Optional
+
+import mps_to_matrix
+from batch_convert import ConversionResult, convert_file, output_path_for, path_key
+
+# Number of the most recent conversions the latency statistics are computed over
+LATENCY_WINDOW: int = 1000
+
+
+class ServiceStats:
+    """
+    Counters and latency statistics of a `ConversionService`.
+    """
+
+    def __init__(self) -> None:
+        self.queue_depth = 0        # Requests waiting for a free slot
+        self.in_flight = 0          # Conversions running in the process pool
+        self.peak_in_flight = 0     # Highest number of conversions that ran at the same time
+        self.completed = 0          # Conversions that succeeded
+        self.failed = 0             # Conversions that failed
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)    # Request to result, in seconds
+        self.queue_times: deque[float] = deque(maxlen=LATENCY_WINDOW)  # Time spent waiting for a slot
+
+    def record(self, result: ConversionResult, queue_seconds: float, latency_seconds: float) -> None:
+        if result.error:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self.queue_times.append(queue_seconds)
+        self.latencies.append(latency_seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        The current statistics, as a JSON serializable dictionary. The latencies (in seconds) are over the last
+        `LATENCY_WINDOW` conversions and are None before the first one.
+        """
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction: float) -> Optional[float]:
+            return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] if latencies else None
+
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else None,
+            "queue_mean": sum(self.queue_times) / len(self.queue_times) if self.queue_times else None,
+        }
+
+
+class ConversionService:
+    """
+    Converts files in a process pool on behalf of asyncio clients, with at most `max_in_flight` conversions
+    handed to the pool at a time.
+
+    Example:
+    --------
+    >>> async def run() -> None:
+    ...     service = ConversionService(workers=4)
+    ...     server = await service.serve(socket_path="/tmp/mps.sock")
+    ...     async with server:
+    ...         await server.serve_forever()
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 output_dir: Optional[str] = None, layout: str = "dense") -> None:
+        """
+        Parameters:
+        -----------
+        workers : Optional[int]
+            The number of worker processes. None uses one per CPU.
+        max_in_flight : Optional[int]
+            The number of conversions that run at the same time. None uses `workers`. More requests are queued.
+        output_dir : Optional[str]
+            The directory the converted files are written to when a request has no "output". None writes them
+            next to the inputs.
+        layout : str
+            The default layout of A in the .txt files (see `mps_to_matrix.save_txt_file`).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers
+        self.output_dir = output_dir
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        self.layout = layout
+        self.stats = ServiceStats()
+        # The workers are spawned, not forked: a forked worker would inherit the sockets of the connections open
+        # at that time and keep them open after the service closes them
+        self._pool = self._new_pool()
+        self._slots: Optional[asyncio.Semaphore] = None  # Created in the event loop of the first request
+        # The files of the queued and running conversions (see `path_key`): the inputs, which may be read by
+        # several of them, and the outputs
+        self._reading: Counter[str] = Counter()
+        self._writing: set[str] = set()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self) -> None:
+        """
+        Shuts the process pool down, after the running conversions.
+        """
+        self._pool.shutdown()
+
+    async def convert(self, input_path: str, output_path: Optional[str] = None,
+                      layout: Optional[str] = None) -> ConversionResult:
+        """
+        Converts a file in the process pool, waiting for a free slot first.
+
+        Parameters:
+        -----------
+        input_path : str
+            The .mps or .txt file, converted in the direction given by its extension.
+        output_path : Optional[str]
+            The converted file. None uses `batch_convert.output_path_for` with the `output_dir` of the service.
+        layout : Optional[str]
+            The layout of A if a .txt file is written. None uses the `layout` of the service.
+
+        Returns:
+        --------
+        ConversionResult
+            The result of `batch_convert.convert_file` (failures are returned, not raised). If the worker process
+            dies the result is a failure and the process pool is replaced.
+
+        Raises:
+        -------
+        ValueError
+            If the extension of `input_path` is not one of `batch_convert.CONVERSIONS`, `layout` is unknown, or
+            the conversion would read or write a file written by a queued or running conversion.
+        """
+        if output_path is None:
+            try:
+                output_path = output_path_for(input_path, self.output_dir)
+            except KeyError:
+                raise ValueError(f"Don't know how to convert {input_path!r}") from None
+        layout = layout or self.layout
+        if layout not in mps_to_matrix.TXT_LAYOUTS:
+            raise ValueError(f"Unknown layout {layout!r}, expected one of {mps_to_matrix.TXT_LAYOUTS}")
+        input_key, output_key = path_key(input_path), path_key(output_path)
+        if input_key == output_key or output_key in self._reading or {input_key, output_key} & self._writing:
+            raise ValueError(f"Converting {input_path!r} to {output_path!r} conflicts with a conversion in progress")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+        # The files are claimed until the conversion is done, also while it waits for a slot
+        self._reading[input_key] += 1
+        self._writing.add(output_key)
+        try:
+            result, queue_seconds, start = await self._run(input_path, output_path, layout)
+        finally:
+            self._reading[input_key] -= 1
+            if not self._reading[input_key]:
+                del self._reading[input_key]
+            self._writing.discard(output_key)
+
+        self.stats.record(result, queue_seconds, time.perf_counter() - start)
+        return result
+
+    async def _run(self, input_path: str, output_path: str, layout: str) -> tuple[ConversionResult, float, float]:
+        # Waits for a slot and converts the file in the process pool: (result, seconds in the queue, start time)
+        assert self._slots is not None
+        stats = self.stats
+        start = time.perf_counter()
+        stats.queue_depth += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            stats.queue_depth -= 1
+        queue_seconds = time.perf_counter() - start
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        pool = self._pool
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, convert_file, input_path,
+                                                                      output_path, layout)
+        except BrokenExecutor as error:
+            # A worker died (e.g. out of memory): the pool can't be used anymore, the next requests get a new one
+            result = ConversionResult(input_path, output_path, 0.0, 0.0,
+                                      f"The worker process died: {type(error).__name__}: {error}")
+            if self._pool is pool:
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False)
+        finally:
+            stats.in_flight -= 1
+            self._slots.release()
+        return result, queue_seconds, start
+
+    async def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Answers a single request of the protocol (see the top of the module). Invalid requests get a response
+        with an "error" instead of closing the connection.
+        """
+        response: dict[str, Any] = {"id": request.get("id")}
+        if request.get("command") == "stats":
+            response["stats"] = self.stats.snapshot()
+        elif "input" in request:
+            start = time.perf_counter()
+            try:
+                for key in ("input", "output", "layout"):
+                    value = request.get(key)
+                    if not isinstance(value, str) and (key == "input" or value is not None):
+                        raise ValueError(f"\"{key}\" must be a string, not {json.dumps(value)}")
+                result = await self.convert(request["input"], request.get("output"), request.get("layout"))
+            except ValueError as error:
+                response["error"] = str(error)
+            else:
+                response.update(result._asdict(), latency_seconds=time.perf_counter() - start)
+        else:
+            response["error"] = "A request needs an \"input\" file or a \"command\""
+        return response
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves a connection: every request line is handled concurrently and its response is written as soon
+        as it is ready. The connection is closed once the client has stopped sending and every response is sent.
+        """
+        lock = asyncio.Lock()
+
+        async def respond(line: bytes) -> None:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("A request must be a JSON object")
+            except ValueError as error:
+                response: dict[str, Any] = {"id": None, "error": f"Invalid request: {error}"}
+            else:
+                response = await self.handle_request(request)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        tasks = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                tasks.append(asyncio.ensure_future(respond(line)))
+        await asyncio.gather(*tasks)
+        writer.close()
+        await writer.wait_closed()
+
+    async def serve(self, socket_path: Optional[str] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> asyncio.Server:
+        """
+        Starts serving on a Unix socket (if `socket_path` is given) or on `host`:`port` (0 picks a free port).
+        """
+        if socket_path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path=socket_path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+async def send_requests(requests: Iterable[dict[str, Any]], socket_path: Optional[str] = None,
+                        host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[dict[str, Any]]:
+    """
+    A client of the service: sends the requests on a single connection and yields the responses as they arrive.
+    """
+    if socket_path is not None:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.writelines(json.dumps(request).encode() + b"\n" for request in requests)
+        await writer.drain()
+        writer.write_eof()  # The service answers every request, then closes the connection
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+async def _serve_forever(service: ConversionService, socket_path: Optional[str], host: str, port: int) -> None:
+    server = await service.serve(socket_path, host, port)
+    addresses = [socket_path] if socket_path else [f"{host}:{sock.getsockname()[1]}" for sock in server.sockets]
+    print(f"Listening on {', '.join(addresses)} with {service.workers} workers")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve .mps <-> .txt conversions over a Unix socket or localhost.")
+    parser.add_argument("--socket", help="Path of the Unix socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on without --socket")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on without --socket")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument("--max-in-flight", type=int, help="Conversions running at the same time (default: workers)")
+    parser.add_argument("-o", "--output-dir", help="Write the converted files here when a request has no output")
+    parser.add_argument("--layout", choices=mps_to_matrix.TXT_LAYOUTS, default="dense",
+                        help="Default layout of A in the .txt files")
+    args = parser.parse_args()
+
+    service = ConversionService(args.workers, args.max_in_flight, args.output_dir, args.layout)
+    try:
+        asyncio.run(_serve_forever(service, args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
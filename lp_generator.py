@@ -0,0 +1,345 @@
+# Generator of synthetic linear programs, for scale and stress testing of both converters.
+#
+# The model is described by an `LPSpec` (size, density, objective sparsity, row types, bound mix and RANGES)
+# and written straight to disk as an .mps file or a .txt file (triplet layout), one block of columns or rows
+# at a time, so files of tens of GB are written with a memory budget of about `GENERATE_BLOCK_ENTRIES` entries.
+#
+# Usage:
+#   python lp_generator.py big.mps --rows 1000000 --columns 5000000 --density 2e-6 --ranges 0.05
+#   python lp_generator.py big.txt --rows 1000000 --columns 5000000 --bounds UP=0.3,FX=0.01,FR=0.01
+#
+# Every block is drawn from its own random stream, seeded by the seed of the spec and the block number, so
+# the same spec always gives the same model, the .mps and the .txt file of a spec hold the same model, and
+# `generate_model` returns it in memory (like `parse_mps_file`) for checking small instances.
+
+import argparse
+from typing import Iterator, NamedTuple, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from bounds import BOUND_CODES, BoundsArray
+from compressed_io import open_output
+from matrix_to_mps import WRITE_BUFFER_SIZE, _format_columns, _format_entries
+
+# Approximate number of matrix entries generated (and formatted) at a time
+GENERATE_BLOCK_ENTRIES: int = 1 << 20
+
+# Codes of the row types L, E and G in Eqin, in the order of `LPSpec.row_mix`
+ROW_TYPES = ("L", "E", "G")
+ROW_CODES = np.array([-1, 0, 1], dtype=np.int64)
+
+# The bound types that take a value, and the range of the values drawn for each
+BOUND_VALUE_RANGES = {"LO": (-10.0, 0.0), "UP": (1.0, 100.0), "FX": (0.0, 10.0), "LI": (-10.0, 0.0),
+                      "UI": (1.0, 100.0), "SC": (1.0, 100.0)}
+
+# Random streams of a spec: one per kind of block
+_ROWS_STREAM, _ENTRIES_STREAM, _COLUMN_DATA_STREAM = 0, 1, 2
+
+
+class LPSpec(NamedTuple):
+    """
+    The shape and mix of a synthetic linear program.
+    """
+    num_rows: int
+    num_columns: int
+    density: float = 1e-3                        # Expected fraction of the rows in a column (every column has an entry)
+    objective_density: float = 1.0               # Fraction of the columns with an objective coefficient
+    row_mix: Tuple[float, float, float] = (0.6, 0.2, 0.2)                       # Fractions of L, E and G rows
+    bound_mix: Tuple[Tuple[str, float], ...] = (("UP", 0.2), ("LO", 0.05), ("FX", 0.01), ("FR", 0.01))  # Fraction of the columns with each bound type
+    ranges_fraction: float = 0.0                 # Fraction of the rows with a RANGES entry (.mps files only)
+    maximize: bool = False
+    seed: int = 0
+
+    def validate(self) -> None:
+        """
+        Raises:
+        -------
+        ValueError
+            If a size is negative, a fraction is not in [0, 1] or a bound type is unknown.
+        """
+        if self.num_rows < 1 or self.num_columns < 0:
+            raise ValueError(f"Invalid shape ({self.num_rows}, {self.num_columns})")
+        fractions = [self.density, self.objective_density, self.ranges_fraction, sum(self.row_mix),
+                     sum(fraction for _, fraction in self.bound_mix)]
+        if not all(0.0 <= fraction <= 1.0 + 1e-9 for fraction in fractions):
+            raise ValueError(f"Fractions must be between 0 and 1 in {self}")
+        unknown = [name for name, _ in self.bound_mix if name not in BOUND_CODES]
+        if unknown:
+            raise ValueError(f"Unknown bound types {unknown}")
+
+
+class RowBlock(NamedTuple):
+    """
+    A block of consecutive rows: their types, right-hand sides and ranges.
+    """
+    first_row: int
+    Eqin: np.ndarray       # -1 for <=, 0 for =, 1 for >=
+    b: np.ndarray
+    ranges: np.ndarray     # The RANGES value of every row, NaN for the rows without one
+
+
+class GeneratedColumns(NamedTuple):
+    """
+    A block of consecutive columns: their entries, objective coefficients and bounds.
+    """
+    first_column: int
+    A: sparse.csc_array    # The columns (with all the rows), in CSC format with sorted indices
+    c: np.ndarray
+    Bounds: BoundsArray    # The bounds of the columns, with 0-based column indices in the whole model
+
+
+def _rng(spec: LPSpec, stream: int, block: int) -> np.random.Generator:
+    return np.random.default_rng([spec.seed, stream, block])
+
+
+def _values(rng: np.random.Generator, low: float, high: float, size: int) -> np.ndarray:
+    # Random values with 2 decimals, without zeros (a zero would not be written to an .mps file)
+    values = np.round(rng.uniform(low, high, size), 2)
+    values[values == 0] = 1.0
+    return values
+
+
+def generate_rows(spec: LPSpec) -> Iterator[RowBlock]:
+    """
+    Generates the rows of the model in blocks of about `GENERATE_BLOCK_ENTRIES` rows.
+    """
+    for block, first in enumerate(range(0, spec.num_rows, GENERATE_BLOCK_ENTRIES)):
+        count = min(GENERATE_BLOCK_ENTRIES, spec.num_rows - first)
+        rng = _rng(spec, _ROWS_STREAM, block)
+        mix = np.asarray(spec.row_mix, dtype=np.float64)
+        Eqin = ROW_CODES[rng.choice(3, size=count, p=mix / mix.sum())]
+        b = _values(rng, -100.0, 100.0, count)
+        ranges = np.full(count, np.nan)
+        with_range = rng.random(count) < spec.ranges_fraction
+        ranges[with_range] = _values(rng, 1.0, 50.0, int(with_range.sum()))
+        yield RowBlock(first, Eqin, b, ranges)
+
+
+def _column_block_size(spec: LPSpec) -> int:
+    # Columns per block, so that a block holds about GENERATE_BLOCK_ENTRIES entries
+    return max(1, int(GENERATE_BLOCK_ENTRIES // max(spec.density * spec.num_rows, 1.0)))
+
+
+def _column_entries(spec: LPSpec, block: int, count: int) -> sparse.csc_array:
+    # The entries of a block of columns: a binomial number of distinct random rows per column
+    rng = _rng(spec, _ENTRIES_STREAM, block)
+    m = spec.num_rows
+    counts = np.maximum(rng.binomial(m, min(spec.density, 1.0), size=count), 1)
+    columns = np.repeat(np.arange(count, dtype=np.int64), counts)
+    rows = rng.integers(0, m, size=len(columns), dtype=np.int64)
+    # Sorting by (column, row) at once puts the entries in CSC order, repeated rows of a column are dropped
+    keys = np.sort(columns * m + rows)
+    keys = keys[np.append(True, keys[1:] != keys[:-1])]
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // m, minlength=count), out=indptr[1:])
+    # Models repeat a small set of coefficients, quarters keep the formatting of the entries cheap
+    values = rng.integers(-400, 401, size=len(keys)) / 4
+    values[values == 0] = 1.0
+    return sparse.csc_array((values, keys % m, indptr), shape=(m, count))
+
+
+def _column_data(spec: LPSpec, block: int, first: int, count: int) -> Tuple[np.ndarray, BoundsArray]:
+    # The objective coefficients and the bounds of a block of columns
+    rng = _rng(spec, _COLUMN_DATA_STREAM, block)
+    c = np.zeros(count)
+    with_cost = rng.random(count) < spec.objective_density
+    c[with_cost] = _values(rng, -10.0, 10.0, int(with_cost.sum()))
+
+    # Every column gets at most one bound, the bound types split [0, 1) by their fractions
+    draws = rng.random(count)
+    kinds, columns, values = [], [], []
+    low = 0.0
+    for name, fraction in spec.bound_mix:
+        selected = np.flatnonzero((draws >= low) & (draws < low + fraction))
+        low += fraction
+        kinds.append(np.full(len(selected), BOUND_CODES[name], dtype=np.uint8))
+        columns.append(selected + first)
+        if name in BOUND_VALUE_RANGES:
+            values.append(_values(rng, *BOUND_VALUE_RANGES[name], len(selected)))
+        else:
+            values.append(np.full(len(selected), np.nan))
+    if not kinds:
+        return c, BoundsArray()
+    order = np.argsort(np.concatenate(columns), kind="stable")
+    return c, BoundsArray(np.concatenate(kinds)[order], np.concatenate(columns)[order], np.concatenate(values)[order])
+
+
+def generate_columns(spec: LPSpec, with_entries: bool = True) -> Iterator[GeneratedColumns]:
+    """
+    Generates the columns of the model in blocks of about `GENERATE_BLOCK_ENTRIES` entries.
+
+    Parameters:
+    -----------
+    spec : LPSpec
+        The model to generate.
+    with_entries : bool
+        If False the entries of `A` are not generated (the blocks then have an empty `A`), for writing the
+        objective or the bounds on their own.
+    """
+    spec.validate()
+    block_size = _column_block_size(spec)
+    for block, first in enumerate(range(0, spec.num_columns, block_size)):
+        count = min(block_size, spec.num_columns - first)
+        A = _column_entries(spec, block, count) if with_entries else sparse.csc_array((spec.num_rows, count))
+        c, bounds = _column_data(spec, block, first, count)
+        yield GeneratedColumns(first, A, c, bounds)
+
+
+def generate_model(spec: LPSpec) -> dict:
+    """
+    Generates the whole model in memory, with the keys of `mps_to_matrix.parse_mps_file` ("MinMax", "A" in CSR
+    format, "b", "c", "Eqin", "Bounds") plus "ranges" (NaN for the rows without a range). Meant for small specs.
+    """
+    rows = list(generate_rows(spec))
+    columns = list(generate_columns(spec))
+    A = sparse.hstack([block.A for block in columns], format="csr") if columns else sparse.csr_array((spec.num_rows, 0))
+    bounds = [block.Bounds for block in columns]
+    return {
+        "MinMax": 1 if spec.maximize else -1,
+        "A": sparse.csr_array(A),
+        "b": np.concatenate([block.b for block in rows]),
+        "c": np.concatenate([block.c for block in columns]).tolist() if columns else [],
+        "Eqin": np.concatenate([block.Eqin for block in rows]).tolist(),
+        "Bounds": BoundsArray(np.concatenate([bound.kinds for bound in bounds]),
+                              np.concatenate([bound.columns for bound in bounds]),
+                              np.concatenate([bound.values for bound in bounds])) if bounds else BoundsArray(),
+        "ranges": np.concatenate([block.ranges for block in rows]),
+    }
+
+
+def _names(prefix: str, indices: np.ndarray) -> np.ndarray:
+    # The names of rows ("R<i>") or columns ("X<j>")
+    return np.char.add(prefix, indices.astype(str)).astype(object)
+
+
+def _join_lines(first: np.ndarray, *parts: Union[np.ndarray, str]) -> str:
+    # Concatenates the parts (object arrays or strings) element wise, one line per element
+    lines = first
+    for part in parts:
+        lines = lines + part
+    return "".join((lines + "\n").tolist())
+
+
+def _mps_bounds(bounds: BoundsArray) -> str:
+    if not len(bounds):
+        return ""
+    values = np.where(np.isnan(bounds.values), "", np.char.add("  ", bounds.values.astype(str))).astype(object)
+    return _join_lines(bounds.type_names().astype(object), " BND1  ", _names("X", bounds.columns), values)
+
+
+def write_mps(file_path: str, spec: LPSpec) -> None:
+    """
+    Writes the model of `spec` as an .mps file, streaming it one block of rows or columns at a time.
+    The objective row is "COST", the rows are "R0", "R1", ... and the columns "X0", "X1", ...
+    The BOUNDS section is generated again after the columns, without their entries.
+    A path ending with .gz, .bz2 or .xz is compressed while it is written.
+    """
+    spec.validate()
+    with open_output(file_path, WRITE_BUFFER_SIZE) as file:
+        file.write("NAME  SYNTHETIC   (MAX)\n" if spec.maximize else "NAME  SYNTHETIC\n")
+
+        file.write("ROWS\n N  COST\n")
+        for rows in generate_rows(spec):
+            types = np.array(ROW_TYPES, dtype=object)[rows.Eqin + 1]
+            file.write(_join_lines(" " + types, "  ", _names("R", np.arange(len(rows.Eqin)) + rows.first_row)))
+
+        file.write("COLUMNS\n")
+        for columns in generate_columns(spec):
+            # Only the names of the rows used by the block are formatted
+            used, local_rows = np.unique(columns.A.indices, return_inverse=True)
+            A = sparse.csc_array((columns.A.data, local_rows.ravel(), columns.A.indptr), shape=(len(used), columns.A.shape[1]))
+            col_names = _names("X", np.arange(A.shape[1]) + columns.first_column)
+            file.writelines(_format_columns(A, columns.c, col_names, _names("R", used), "COST"))
+
+        file.write("RHS\n")
+        for rows in generate_rows(spec):
+            indices = np.arange(len(rows.b)) + rows.first_row
+            file.write(_join_lines("    RHS1  " + _names("R", indices), "  ", rows.b.astype(str).astype(object)))
+
+        if spec.ranges_fraction > 0:
+            file.write("RANGES\n")
+            for rows in generate_rows(spec):
+                selected = np.flatnonzero(~np.isnan(rows.ranges))
+                if len(selected):
+                    file.write(_join_lines("    RNG1  " + _names("R", selected + rows.first_row), "  ",
+                                           rows.ranges[selected].astype(str).astype(object)))
+
+        if spec.bound_mix:
+            file.write("BOUNDS\n")
+            for columns in generate_columns(spec, with_entries=False):
+                file.write(_mps_bounds(columns.Bounds))
+        file.write("ENDATA\n")
+
+
+def write_txt(file_path: str, spec: LPSpec) -> None:
+    """
+    Writes the model of `spec` as a .txt file with `A` in the triplet layout (see `mps_to_matrix.save_txt_file`),
+    streaming it one block at a time. The .txt format has no ranges, they are left out.
+    """
+    spec.validate()
+    with open_output(file_path, WRITE_BUFFER_SIZE) as file:
+        file.write(f"A_triplets=[ {spec.num_rows} {spec.num_columns}\n")
+        for columns in generate_columns(spec):
+            A = columns.A
+            if A.nnz:
+                # The column index is formatted once per column, the values once per distinct value
+                cols = np.repeat(_names(" ", np.arange(A.shape[1]) + columns.first_column), np.diff(A.indptr))
+                file.write(_join_lines(A.indices.astype(str).astype(object), cols, _format_entries(A.data, " ")))
+        file.write("]\n\n")
+
+        for header, key in (("b=[", "b"), ("Eqin=[", "Eqin")):
+            file.write(f"{header}\n")
+            for rows in generate_rows(spec):
+                file.write(_join_lines(" " + getattr(rows, key).astype(str).astype(object)))
+            file.write("]\n\n")
+
+        file.write("c=[\n")
+        for columns in generate_columns(spec, with_entries=False):
+            file.write(_join_lines(" " + columns.c.astype(str).astype(object)) if len(columns.c) else "")
+        file.write("]\n\n")
+
+        file.write(f"MinMax= {1 if spec.maximize else -1}\n\n")
+
+        if spec.bound_mix:
+            file.write("BS=[\n")
+            for columns in generate_columns(spec, with_entries=False):
+                if len(columns.Bounds):
+                    file.write(" " + "\n ".join(columns.Bounds.to_strings()) + "\n")
+            file.write("]\n")
+
+
+def _parse_bound_mix(text: str) -> Tuple[Tuple[str, float], ...]:
+    # "UP=0.2,FX=0.01" -> (("UP", 0.2), ("FX", 0.01))
+    pairs = [item.split("=") for item in text.split(",") if item]
+    return tuple((name.strip().upper(), float(fraction)) for name, fraction in pairs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic LP as an .mps or .txt file (by extension).")
+    parser.add_argument("output", help="The file to write, .mps or .txt")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of constraint rows")
+    parser.add_argument("--columns", type=int, default=50000, help="Number of columns")
+    parser.add_argument("--density", type=float, default=1e-3, help="Expected fraction of the rows in each column")
+    parser.add_argument("--objective-density", type=float, default=1.0,
+                        help="Fraction of the columns with an objective coefficient")
+    parser.add_argument("--row-mix", default="0.6,0.2,0.2", help="Fractions of L, E and G rows")
+    parser.add_argument("--bounds", default="UP=0.2,LO=0.05,FX=0.01,FR=0.01",
+                        help="Fraction of the columns with each bound type, e.g. UP=0.2,FR=0.01 (empty for none)")
+    parser.add_argument("--ranges", type=float, default=0.0, help="Fraction of the rows with a range (.mps only)")
+    parser.add_argument("--max", action="store_true", help="Write a maximization problem")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random streams")
+    args = parser.parse_args()
+
+    L, E, G = (float(fraction) for fraction in args.row_mix.split(","))
+    spec = LPSpec(args.rows, args.columns, args.density, args.objective_density, (L, E, G),
+                  _parse_bound_mix(args.bounds), args.ranges, args.max, args.seed)
+    if args.output.endswith(".txt"):
+        write_txt(args.output, spec)
+    else:
+        write_mps(args.output, spec)
+    print(f"Model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
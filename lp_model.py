@@ -0,0 +1,204 @@
+# A lazy, read-only view of a linear program stored in an .mps or a .txt file, for the tools that only need part
+# of it (its size, its row types, its objective) and should not pay for building the whole model:
+#
+#   model = LPModel("model.mps")
+#   A = model["A"]                                  # The whole file is parsed on first access, then kept
+#   parsed_data = dict(model)                       # The dictionary of parse_mps_file / parse_file
+#
+#   model = LPModel("model.mps", scan=True)
+#   model.shape, model.nnz, model.row_type_counts   # One streaming pass over the file, A is never built
+#
+# An .mps file is parsed once with `parse_mps_file` on the first access to any value. With `scan=True` the cheap
+# values (MinMax, Eqin, c, the names, the shape and the number of non-zeros) come from a streaming pass with
+# `MpsStream` instead, the blocks of columns are counted and dropped; the first access to any other key then parses
+# the whole file again, so `scan` is for the tools that only need the size of a model. A .txt file is indexed with
+# `index_txt_sections` and every section is loaded on its own, on first access.
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from bounds import BoundsArray
+from compressed_io import detect_compression, strip_compression
+from matrix_to_mps import TXT_OPTIONAL_SECTIONS, TxtSection, index_txt_sections, load_txt_section, parse_file
+from mps_to_matrix import MpsStream, objective_list, parse_mps_file
+
+# The keys of the dictionary returned by `parse_mps_file`, in order
+MPS_KEYS = ("MinMax", "A", "b", "c", "Eqin", "Bounds", "row_names", "col_names", "b_sets", "rhs_names", "ranges",
+            "obj_constant", "integrality")
+
+# The keys of an .mps file known after the scan of its ROWS and COLUMNS sections, without building A
+MPS_SCAN_KEYS = ("MinMax", "c", "Eqin", "row_names", "col_names", "integrality")
+
+# The keys of the dictionary returned by `parse_file` for a .txt file (the names only if the file has them)
+TXT_KEYS = ("MinMax", "A", "b", "c", "Eqin", "Bounds")
+
+# The letters of the row types of `Eqin`
+ROW_TYPES = {-1: "L", 0: "E", 1: "G"}
+
+
+class LPModel(Mapping):
+    """
+    A linear program read from a file on demand. It is a read-only mapping with the keys of `parse_mps_file`
+    (for .mps files, compressed or not) or of `parse_file` (for the other files), whose values are parsed on
+    first access and kept, so `dict(model)` gives the same dictionary as these functions.
+
+    With `scan`, `shape`, `nnz`, `row_type_counts` and the keys of `MPS_SCAN_KEYS` of an .mps file come from a
+    single streaming pass over the file that never holds more than a block of columns of A.
+    """
+
+    def __init__(self, file_path: str, scan: bool = False, **parse_options: Any) -> None:
+        """
+        Parameters:
+        -----------
+        file_path : str
+            The .mps file (detected by its extension, after any .gz, .bz2 or .xz) or .txt file.
+        scan : bool
+            If True the cheap values of an .mps file are read by a streaming pass that does not build A, and the
+            other keys parse the file again on first access. If False (the default) the first access to any value
+            of an .mps file parses it whole, once. Ignored for .txt files.
+        **parse_options : Any
+            Passed to `parse_mps_file` (use_mmap, workers, A_format, mps_format) or to `parse_file` (workers).
+            The scan of an .mps file uses use_mmap, workers and mps_format.
+        """
+        self.file_path = file_path
+        self.is_mps = strip_compression(file_path).lower().endswith(".mps")
+        self.scan = scan
+        self._options = parse_options
+        self._values: Dict[str, Any] = {}             # The values parsed so far, by key
+        self._shape: Optional[Tuple[int, int]] = None
+        self._nnz: Optional[int] = None
+        self._index: Optional[Dict[str, TxtSection]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        if key not in self._keys():
+            raise KeyError(key)
+        if self.is_mps:
+            if self.scan and key in MPS_SCAN_KEYS:
+                self._scan_mps()
+            else:
+                self._load_mps()
+        else:
+            self._load_txt(key)
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"LPModel({self.file_path!r}, loaded={sorted(self._values)})"
+
+    @property
+    def loaded_keys(self) -> list[str]:
+        # The keys whose values have been parsed so far
+        return [key for key in self._keys() if key in self._values]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        # The shape of A, (number of constraint rows, number of columns)
+        if self._shape is None:
+            if self.is_mps and self.scan:
+                self._scan_mps()
+            elif self.is_mps:
+                self._load_mps()
+            elif "A" in self._values:
+                self._shape = self._values["A"].shape
+            else:
+                self._shape = (len(self["Eqin"]), len(self["c"]))
+        assert self._shape is not None
+        return self._shape
+
+    @property
+    def nnz(self) -> int:
+        # The number of non-zeros of A (for a .txt file A is loaded, its sections are not counted on their own)
+        if self._nnz is None:
+            if self.is_mps and self.scan:
+                self._scan_mps()
+            elif self.is_mps:
+                self._load_mps()
+            else:
+                self._nnz = int(self["A"].nnz)
+        assert self._nnz is not None
+        return self._nnz
+
+    @property
+    def row_type_counts(self) -> Dict[str, int]:
+        # The number of rows of each type, {"L": ..., "E": ..., "G": ...}
+        types, counts = np.unique(np.asarray(self["Eqin"], dtype=np.int64), return_counts=True)
+        found = dict(zip(types.tolist(), counts.tolist()))
+        return {letter: int(found.get(code, 0)) for code, letter in ROW_TYPES.items()}
+
+    def _keys(self) -> Tuple[str, ...]:
+        # The keys of the model, see `MPS_KEYS` and `TXT_KEYS`
+        if self.is_mps:
+            return MPS_KEYS
+        index = self._txt_index()
+        if index is None:
+            self._load_txt("A")  # A compressed file is read in one pass, its keys are the ones loaded
+            return tuple(self._values)
+        return TXT_KEYS + tuple(key for key in ("row_names", "col_names") if key in index)
+
+    def _scan_mps(self) -> None:
+        """
+        Reads the NAME, OBJSENSE, ROWS and COLUMNS sections of an .mps file, counting the columns and non-zeros
+        of A block by block without keeping the blocks. The sections after COLUMNS are not read.
+        """
+        if self._nnz is not None:
+            return
+        options = {key: self._options[key] for key in ("use_mmap", "workers", "mps_format") if key in self._options}
+        nnz = 0
+        c_parts: list[np.ndarray] = []
+        has_cost_parts: list[np.ndarray] = []
+        with MpsStream(self.file_path, **options) as stream:
+            for block in stream.column_blocks():
+                nnz += block.A.nnz
+                c_parts.append(block.c)
+                has_cost_parts.append(block.has_cost)
+            scanned = {"MinMax": stream.MinMax, "Eqin": stream.Eqin, "row_names": stream.row_names,
+                       "col_names": stream.col_names, "integrality": stream.integrality,
+                       "c": objective_list(np.concatenate(c_parts), np.concatenate(has_cost_parts)) if c_parts else []}
+            self._shape = (len(stream.row_names), stream.num_columns)
+        self._nnz = nnz
+        for key, value in scanned.items():
+            self._values.setdefault(key, value)
+
+    def _load_mps(self) -> None:
+        # Parses the whole .mps file, the values already known are kept so that their objects do not change
+        parsed_data = parse_mps_file(self.file_path, **self._options)
+        for key, value in parsed_data.items():
+            self._values.setdefault(key, value)
+        self._shape = parsed_data["A"].shape
+        self._nnz = int(parsed_data["A"].nnz)
+
+    def _txt_index(self) -> Optional[Dict[str, TxtSection]]:
+        # The sections of a .txt file, None for a compressed file (which can't be indexed)
+        if self._index is None and detect_compression(self.file_path) is None:
+            self._index = index_txt_sections(self.file_path)
+        return self._index
+
+    def _load_txt(self, key: str) -> None:
+        """
+        Loads a section of a .txt file. A compressed file is parsed whole by `parse_file` on first access.
+
+        Raises:
+        -------
+        ValueError
+            If the section is missing from the file and is not one of `TXT_OPTIONAL_SECTIONS`.
+        """
+        index = self._txt_index()
+        if index is None:
+            if not self._values:
+                self._values.update(parse_file(self.file_path, **self._options))
+            return
+        if key in index:
+            self._values[key] = load_txt_section(self.file_path, index[key])
+        elif key == "Bounds":
+            self._values[key] = BoundsArray()  # The bounds are optional
+        elif key not in TXT_OPTIONAL_SECTIONS:
+            raise ValueError(f"Section {key!r} not found in {self.file_path}")
@@ -1,16 +1,43 @@
 # Made with help from GPT
 
 import time
-import tkinter as tk
-from tkinter import filedialog
 import os
+import itertools
+import mmap
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 
-from typing import List, Dict, Union
+from typing import Any, Deque, Iterable, Iterator, List, Dict, NamedTuple, Optional, Sequence, TextIO, Tuple, Union
 from io import TextIOWrapper
 
 import numpy as np
 from scipy import sparse
 
+from bounds import BoundsArray, as_bounds
+from compressed_io import detect_compression, open_output, open_text_input
+from model_checks import check_model
+from name_pool import NamePool
+from parse_stats import ParseStats, SectionStats
+
+# Number of non-zeros of A formatted at once by `save_mps_file`
+WRITE_BATCH_ENTRIES: int = 1 << 18
+
+# Buffer size (in bytes) of the file written by `save_mps_file`
+WRITE_BUFFER_SIZE: int = 1 << 24
+
+# Non-zeros of A below which `save_mps_file` formats the COLUMNS section in this process, whatever the workers
+PARALLEL_WRITE_MIN_ENTRIES: int = 1 << 20
+
+# Ranges of columns formatted per worker by a parallel `save_mps_file` (more ranges balance the load better),
+# and ranges formatted ahead of the one being written per worker (bounds the memory held by formatted text)
+PARALLEL_WRITE_RANGES_PER_WORKER: int = 4
+PARALLEL_WRITE_AHEAD_PER_WORKER: int = 2
+
+# Characters of a dense "A=[" section converted to numbers at once by `parse_A`
+READ_BLOCK_CHARS: int = 1 << 24
+
+
 def select_file(window_title: str = "Select a file") -> str:
     """
     Opens a file selection dialog to allow the user to choose a file. 
@@ -27,6 +54,10 @@ def select_file(window_title: str = "Select a file") -> str:
         - The dialog restricts the file selection to `.txt` files by default, but allows selecting any file type.
         - The initial directory is set to the current working directory.
     """ 
+    # tkinter is imported here so that the module can be used without a display (e.g. by batch_convert)
+    import tkinter as tk
+    from tkinter import filedialog
+
     # Create a root window (it won't be displayed)
     root = tk.Tk()
     root.withdraw()  # Hide the root window
@@ -67,6 +98,10 @@ def select_save_file_path(default_name: str = "untitled.mps", save_dir: str = os
         - The `.mps` extension is added automatically if the user does not specify one.
     """
 
+    # tkinter is imported here so that the module can be used without a display (e.g. by batch_convert)
+    import tkinter as tk
+    from tkinter import filedialog
+
     # Create a root window (it won't be displayed)
     root = tk.Tk()
     root.withdraw()  # Hide the root window
@@ -95,71 +130,163 @@ def select_save_file_path(default_name: str = "untitled.mps", save_dir: str = os
 #     return A
 
 
-def parse_A(file: TextIOWrapper) -> sparse.csc_array:
+def _bracket_lines(file: TextIOWrapper, head: str = "") -> Iterator[str]:
+    """
+    Yields the data lines of a "name=[ ... ]" section, without the brackets and skipping empty lines.
+
+    The data may start on the header line (`head` is the rest of the header line after "[") and the closing "]"
+    may be on a line of its own or at the end of the last data line, as in Test_Datasets/Lp01.txt.
+    """
+    for line in itertools.chain([head], file):
+        data, closed, _ = line.partition("]")
+        if data.strip():
+            yield data
+        if closed:
+            return
+
+def _iter_line_blocks(lines: Iterable[str], block_chars: int) -> Iterator[list[str]]:
+    # Groups lines in blocks of about `block_chars` characters
+    block: list[str] = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= block_chars:
+            yield block
+            block, size = [], 0
+    if block:
+        yield block
+
+def parse_A(file: TextIOWrapper, head: str = "") -> sparse.csc_array:
     """
     Reads a matrix from a file in a dense format and converts it to a sparse CSC matrix.
+
+    The rows are read in blocks of about `READ_BLOCK_CHARS` characters. Every block is converted to numbers at
+    once by `np.loadtxt`, its non-zeros are kept with a mask, and the CSC arrays are built from the non-zeros
+    of all the blocks by counting the entries of every column.
     
     Parameters:
     -----------
     file : TextIOWrapper
-        The file object to read the matrix from.
+        The file object to read the matrix from, positioned after the "A=[" line.
+    head : str
+        The rest of the "A=[" line, which may hold the first row (the values can be separated by spaces or tabs
+        and the closing "]" can follow the last row on the same line).
     
     Returns:
     --------
-    sparse.csr_array
+    sparse.csc_array
         The matrix in CSC (Compressed Sparse Column) format.
+
+    Raises:
+    -------
+    ValueError
+        If a value is not a number or the rows have different lengths.
     """
-    rows : list[int]    = []  # Stores the row indices of non-zero elements
-    cols : list[int]    = []  # Stores the column indices of non-zero elements
-    data : list[float]  = []  # Stores the non-zero values
-    
-    # Read the first non-empty line to determine the number of columns
+    rows : list[np.ndarray] = []  # Row indices of the non-zero elements, one array per block
+    cols : list[np.ndarray] = []  # Column indices of the non-zero elements
+    data : list[np.ndarray] = []  # The non-zero values
+    num_rows = 0
+    num_cols = 0
+
+    for block in _iter_line_blocks(_bracket_lines(file, head), READ_BLOCK_CHARS):
+        values = np.loadtxt(block, dtype=float, ndmin=2)
+        if num_rows and values.shape[1] != num_cols:
+            raise ValueError(f"Row {num_rows + 1} of A has {values.shape[1]} values instead of {num_cols}")
+        num_cols = values.shape[1]
+
+        block_rows, block_cols = np.nonzero(values)
+        rows.append(block_rows + num_rows)
+        cols.append(block_cols)
+        data.append(values[block_rows, block_cols])
+        num_rows += values.shape[0]
+
+    if not num_rows:
+        return sparse.csc_array((0, 0))
+
+    # The entries are in row major order, a stable sort by column gives the CSC order with sorted rows
+    all_cols = np.concatenate(cols)
+    order = np.argsort(all_cols, kind="stable")
+    indptr = np.zeros(num_cols + 1, dtype=np.int64)
+    np.cumsum(np.bincount(all_cols, minlength=num_cols), out=indptr[1:])
+
+    return sparse.csc_array((np.concatenate(data)[order], np.concatenate(rows)[order], indptr),
+                            shape=(num_rows, num_cols))
+
+def _read_block(file: TextIOWrapper) -> list[str]:
+    # The lines of a section, up to (not including) the closing "]"
+    lines = []
     for line in file:
-        stripped_line = line.strip()
-        if stripped_line and stripped_line != "]":
-            first_row_values = [float(x) for x in stripped_line.split()]
-            num_cols = len(first_row_values)
-
-            # Add the first row data to the matrix
-            for col_index, value in enumerate(first_row_values):
-                if value != 0.0:
-                    rows.append(0)
-                    cols.append(col_index)
-                    data.append(value)
-
+        if line.strip() == "]":
             break
+        lines.append(line)
+    return lines
 
-    row_index = 1  # Track the row number in the matrix
-    
-    for line in file:
-        stripped_line = line.strip()
-        if stripped_line == "]":
-            break
-        
-        # Convert the line into a list of floats
-        row_values = [float(x) for x in stripped_line.split()]
-        
-        # Iterate over the row and store non-zero values
-        for col_index, value in enumerate(row_values):
-            if value != 0.0:  # Only consider non-zero elements
-                rows.append(row_index)
-                cols.append(col_index)
-                data.append(value)
-        
-        row_index += 1
-    
-    # Create a CSC matrix from the collected data
-    A_sparse_csc = sparse.csc_array((data, (rows, cols)), shape=(row_index, num_cols))
+def parse_A_triplets(file: TextIOWrapper, header: str) -> sparse.csc_array:
+    """
+    Reads a matrix written in the triplet layout of `mps_to_matrix.save_txt_file`: a header "A_triplets=[ m n"
+    followed by one "row col value" line (0-based indices) per non-zero.
+
+    Parameters:
+    -----------
+    file : TextIOWrapper
+        The file object to read the matrix from, positioned after the header line.
+    header : str
+        The header line, which holds the shape of the matrix.
+
+    Returns:
+    --------
+    sparse.csc_array
+        The matrix in CSC (Compressed Sparse Column) format.
+    """
+    num_rows, num_cols = (int(x) for x in header.split()[1:3])
+    tokens = "".join(_read_block(file)).split()
+
+    # All the numbers are converted at once, the indices straight to integers
+    rows = np.array(tokens[0::3], dtype=np.int64)
+    cols = np.array(tokens[1::3], dtype=np.int64)
+    data = np.array(tokens[2::3], dtype=float)
+
+    return sparse.csc_array((data, (rows, cols)), shape=(num_rows, num_cols))
+
+def parse_A_rows(file: TextIOWrapper, header: str) -> sparse.csc_array:
+    """
+    Reads a matrix written in the row layout of `mps_to_matrix.save_txt_file`: a header "A_rows=[ m n" followed
+    by one line of "col:value" pairs (0-based columns) per row, an empty line for an empty row.
+
+    Parameters:
+    -----------
+    file : TextIOWrapper
+        The file object to read the matrix from, positioned after the header line.
+    header : str
+        The header line, which holds the shape of the matrix.
+
+    Returns:
+    --------
+    sparse.csc_array
+        The matrix in CSC (Compressed Sparse Column) format.
+    """
+    num_rows, num_cols = (int(x) for x in header.split()[1:3])
+    lines = _read_block(file)
+    if len(lines) != num_rows:
+        raise ValueError(f"Expected {num_rows} rows in the A_rows section, found {len(lines)}")
+
+    # Every pair holds exactly one ":", so the count gives the non-zeros of each row
+    row_nnz = np.array([line.count(":") for line in lines], dtype=np.int64)
+    tokens = "".join(lines).replace(":", " ").split()
+    cols = np.array(tokens[0::2], dtype=np.int64)
+    data = np.array(tokens[1::2], dtype=float)
+    rows = np.repeat(np.arange(num_rows), row_nnz)
 
-    return A_sparse_csc
+    return sparse.csc_array((data, (rows, cols)), shape=(num_rows, num_cols))
 
-def parse_column_vector(file: TextIOWrapper, v_size : int ) -> np.ndarray :
+def parse_column_vector(file: TextIOWrapper, v_size : Optional[int], head: str = "" ) -> np.ndarray :
     """
     Parses a column vector from a text file and returns it as a NumPy array.
 
-    This function reads exactly `v_size` lines from the provided text file,
-    converts each line into a floating-point number, and stores these numbers
-    in a pre-allocated NumPy array.
+    This function reads the values up to the closing "]" from the provided
+    text file (one or more per line, the first ones may be on the header line
+    and the "]" may follow the last value) and converts them at once.
 
     Parameters:
     -----------
@@ -167,51 +294,54 @@ def parse_column_vector(file: TextIOWrapper, v_size : int ) -> np.ndarray :
         A file-like object that supports the iterator protocol. It should be
         opened in a mode that allows reading text data (e.g., 'r' mode).
         
-    v_size : int
-        The number of lines to read from the file. This determines the size
-        of the output array.
+    v_size : Optional[int]
+        The number of values of the vector. None accepts any number of
+        values (the vector is sized by its section).
+
+    head : str
+        The rest of the header line (e.g. "b=[") after the "[".
 
     Returns:
     --------
     np.ndarray
-        A NumPy array of shape (v_size,) containing the parsed floating-point
-        numbers from the file.
+        A NumPy array containing the parsed floating-point numbers from the
+        file.
 
     Raises:
     -------
     ValueError
-        If the number of lines in the file is less than `v_size` or if
-        a line cannot be converted to a float.
+        If the number of values is not `v_size` or if a value cannot be
+        converted to a float.
     """
-    # Pre-allocate numpy array with the specified size
-    v = np.zeros(v_size, dtype=float)
-        
-    # Read exactly v_size lines
-    for i in range(v_size):
-        stripped_line = next(file).strip()  # Read the next line and strip it
-        v[i] = float(stripped_line)        # Parse the number and insert it into the array
-
+    v = np.array(" ".join(_bracket_lines(file, head)).split(), dtype=float)
+    if v_size is not None and v.size != v_size:
+        raise ValueError(f"Expected {v_size} values, found {v.size}")
     return v
 
-def parse_BS(file: TextIOWrapper) -> List[str]:
+def parse_BS(file: TextIOWrapper, head: str = "") -> BoundsArray:
     """
-    Parses a list of strings from a text file until a closing bracket is encountered.
+    Parses the bounds from a text file until a closing bracket is encountered.
 
     This function reads lines from the provided text file and collects them
-    into a list of strings. The reading stops when a line containing only
-    a closing bracket (']') is encountered.
+    into a `BoundsArray`. The reading stops at the closing bracket (']'),
+    on a line of its own or at the end of the last bound.
+
+    Bounds are read as "TYPE column value" (0-based column). Bounds written as
+    "x<k> TYPE value" (the variables x1, x2, ... as in Test_Datasets/Lp01.txt)
+    are converted to that form.
 
     Parameters:
     -----------
     file : TextIOWrapper
         A file-like object that supports the iterator protocol. It should be
         opened in a mode that allows reading text data (e.g., 'r' mode).
+    head : str
+        The rest of the "BS=[" line after the "[".
 
     Returns:
     --------
-    List[str]
-        A list of strings containing the lines read from the file, excluding
-        the closing bracket line and any trailing whitespace.
+    BoundsArray
+        The bounds as arrays of type codes, columns and values (NaN for "None").
 
     Example:
     --------
@@ -219,14 +349,209 @@ def parse_BS(file: TextIOWrapper) -> List[str]:
         bs_lines = parse_BS(f)
     """
     BS = []
-    for line in file:
-        stripped_line = line.strip()
-        if stripped_line == "]":
+    for line in _bracket_lines(file, head):
+        a = line.split()
+        variable = re.fullmatch(r"[xX](\d+)", a[0])
+        if variable and len(a) > 1:
+            value = a[2] if len(a) > 2 else "None"
+            BS.append(f"{a[1]} {int(variable.group(1)) - 1} {value}")
+        else:
+            BS.append(" ".join(a))  # Append each BS line as is
+    return BoundsArray.from_strings(BS)
+
+def parse_names(file: TextIOWrapper, head: str = "") -> NamePool:
+    """
+    Parses the names of a "RowNames=[" or "ColNames=[" section, one name per line (without its leading and trailing
+    blanks, a name may contain blanks and brackets), until a line with only the closing bracket.
+
+    Parameters:
+    -----------
+    file : TextIOWrapper
+        The file, positioned after the header line.
+    head : str
+        The rest of the header line after the "[".
+
+    Returns:
+    --------
+    NamePool
+        The names, in order.
+    """
+    names = []
+    for line in itertools.chain([head], file):
+        name = line.strip()
+        if name == "]":
             break
-        BS.append(stripped_line)  # Append each BS line as is
-    return BS
+        if name:
+            names.append(name)
+    return NamePool.from_names(names)
+
+class TxtSection(NamedTuple):
+    """
+    A section of a .txt file, as found by `index_txt_sections`.
+    """
+    key: str        # The key of the section in the dictionary returned by `parse_file` ("A", "b", "Bounds", ...)
+    header: str     # The header that starts the section ("A=[", "A_triplets=[", "MinMax=", ...)
+    offset: int     # Byte offset of the header line
+
+
+# The headers of the sections of a .txt file and the key of each in the dictionary returned by `parse_file`
+TXT_SECTION_KEYS = {
+    "A=[": "A", "A_triplets=[": "A", "A_rows=[": "A",
+    "b=[": "b", "c=[": "c", "Eqin=[": "Eqin", "BS=[": "Bounds", "MinMax=": "MinMax",
+    "RowNames=[": "row_names", "ColNames=[": "col_names",
+}
+
+# The sections `parse_file` loads when they are present, without requiring them
+TXT_OPTIONAL_SECTIONS = ("Bounds", "row_names", "col_names")
+
+# A section header at the start of a line (after optional indentation)
+_TXT_HEADER_RE = re.compile(rb"^[ \t]*(A_triplets=\[|A_rows=\[|A=\[|b=\[|c=\[|Eqin=\[|BS=\[|MinMax=|RowNames=\[|ColNames=\[)",
+                            re.MULTILINE)
+
+def index_txt_sections(file_path: str) -> Dict[str, TxtSection]:
+    """
+    Finds the byte offset of every section of a .txt file in a single pass, without parsing any of them.
+
+    The file is memory mapped and searched for the next section header. The body of a bracketed section is
+    skipped with a plain search for its closing "]", so the (large) "A=[" section costs almost nothing to index.
+
+    Parameters:
+    -----------
+    file_path : str
+        The path to the .txt file.
 
-def parse_file(file_path: str) -> Dict[str, Union[List[float],np.ndarray , int , sparse.csc_array  ]]:
+    Returns:
+    --------
+    Dict[str, TxtSection]
+        The sections by key ("A", "b", "c", "Eqin", "MinMax", "Bounds", "row_names", "col_names"). If a section is repeated the last
+        one is used, as when the file is read from top to bottom.
+    """
+    sections: Dict[str, TxtSection] = {}
+    with open(file_path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file can't be mapped
+            return sections
+        with buffer:
+            position = 0
+            while True:
+                match = _TXT_HEADER_RE.search(buffer, position)
+                if match is None:
+                    break
+                header = match.group(1).decode()
+                sections[TXT_SECTION_KEYS[header]] = TxtSection(TXT_SECTION_KEYS[header], header, match.start())
+                position = match.end()
+                if header.endswith("["):
+                    closing = buffer.find(b"]", position)
+                    position = len(buffer) if closing == -1 else closing + 1
+    return sections
+
+def load_txt_section(file_path: str, section: TxtSection) -> Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]:
+    """
+    Parses a single section of a .txt file, found by `index_txt_sections`. The sections do not depend on each
+    other, so they can be loaded in any order, on their own or in parallel.
+
+    Parameters:
+    -----------
+    file_path : str
+        The path to the .txt file.
+    section : TxtSection
+        The section to load.
+
+    Returns:
+    --------
+    Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]
+        The value of the section, see `parse_file`.
+    """
+    with open(file_path, "rb") as raw:
+        raw.seek(section.offset)
+        file = TextIOWrapper(raw)
+        return _parse_txt_section(file, section.header, file.readline().strip())
+
+
+def _parse_txt_section(file: TextIOWrapper, header: str, stripped_line: str
+                       ) -> Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]:
+    # Parses the section of the header line `stripped_line`, the file being positioned after it
+    # The data may start on the header line, right after the "["
+    head = stripped_line.partition("[")[2]
+    if header == "A=[":
+        return parse_A(file, head)
+    elif header == "A_triplets=[":
+        return parse_A_triplets(file, stripped_line)
+    elif header == "A_rows=[":
+        return parse_A_rows(file, stripped_line)
+    elif header == "MinMax=":
+        return int(stripped_line.split("=")[1])
+    elif header == "BS=[":
+        return parse_BS(file, head)
+    elif header in ("RowNames=[", "ColNames=["):
+        return parse_names(file, head)
+    else:
+        # b, c and Eqin: the size is checked against A by `parse_file`, if A is loaded too
+        return parse_column_vector(file, None, head)
+
+
+def _load_txt_section_measured(file_path: str, section: TxtSection, end: int
+                               ) -> Tuple[Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array], SectionStats]:
+    # `load_txt_section` with its measurements (see `parse_file`). `end` is the byte offset where the section ends.
+    # The measurements are returned with the value, so that the section can be loaded in a worker process.
+    stats = SectionStats(section.key)
+    stats.start()
+    value = load_txt_section(file_path, section)
+    stats.stop()
+
+    # The lines and bytes of the section are counted after the timing
+    stats.bytes_read = end - section.offset
+    if stats.bytes_read > 0:
+        with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            data = np.frombuffer(buffer, dtype=np.uint8, count=stats.bytes_read, offset=section.offset)
+            stats.lines = int(np.count_nonzero(data == ord("\n")))
+            del data  # Release the view of the map before it is closed
+    _count_value(stats, value)
+    return value, stats
+
+
+def _count_value(stats: SectionStats, value: Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]) -> None:
+    # The non-zeros and output size of a parsed section
+    if isinstance(value, sparse.csc_array):
+        stats.nonzeros = int(value.nnz)
+        stats.nbytes = int(value.data.nbytes + value.indices.nbytes + value.indptr.nbytes)
+    elif isinstance(value, BoundsArray):
+        stats.nbytes = value.nbytes
+    elif isinstance(value, (np.ndarray, NamePool)):
+        stats.nbytes = int(value.nbytes)
+
+
+def _parse_compressed_txt(file_path: str, keys: Optional[set[str]], stats: Optional[ParseStats]
+                          ) -> Dict[str, Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]]:
+    # A compressed .txt file can't be indexed, so its sections are parsed in a single pass, from top to bottom,
+    # while a background thread decompresses the rest of the file. The sections that are not in `keys` (None for
+    # all of them) are skipped up to their "]". The stats have the times and output sizes of the sections,
+    # without their lines and bytes.
+    parsed: Dict[str, Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]] = {}
+    with open_text_input(file_path) as file:
+        for line in file:
+            stripped_line = line.strip()
+            header = next((header for header in TXT_SECTION_KEYS if stripped_line.startswith(header)), None)
+            if header is None:
+                continue
+            key = TXT_SECTION_KEYS[header]
+            if keys is not None and key not in keys:
+                if header.endswith("["):
+                    for _ in _bracket_lines(file, stripped_line.partition("[")[2]):
+                        pass
+                continue
+            if stats is None:
+                parsed[key] = _parse_txt_section(file, header, stripped_line)
+                continue
+            with stats.section(key) as section_stats:
+                parsed[key] = _parse_txt_section(file, header, stripped_line)
+                _count_value(section_stats, parsed[key])
+    return parsed
+
+def parse_file(file_path: str, sections: Optional[Iterable[str]] = None, workers: int = 1,
+               stats: Optional[ParseStats] = None,
+               validate: bool = False) -> Dict[str, Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]]:
     """
     Parses a configuration file and extracts various components into a dictionary.
 
@@ -236,61 +561,394 @@ def parse_file(file_path: str) -> Dict[str, Union[List[float],np.ndarray , int ,
     for various components like the constraint matrix, bounds, and objective 
     function coefficients.
 
+    The sections are first located with `index_txt_sections` and then every
+    section is bulk loaded on its own with `load_txt_section`, so they may
+    appear in any order and the ones that are not needed are never parsed.
+
+    Files compressed with gzip, bz2 or xz (detected by extension or magic
+    bytes) are parsed in a single pass while a background thread
+    decompresses them (`workers` is then ignored).
+
     Parameters:
     -----------
     file_path : str
         The path to the input file to be parsed. The file should be formatted 
         according to specific conventions, with sections starting with 
         identifiable prefixes (e.g., "A=[", "b=[", etc.).
+    sections : Optional[Iterable[str]]
+        The keys of the sections to load (e.g. ["b", "c"] to read the vectors
+        without the matrix). None loads all of them.
+    workers : int
+        The number of processes the sections are loaded by. 1 loads them in
+        this process.
+    stats : Optional[ParseStats]
+        Collects the wall and CPU time, lines, bytes read, non-zeros and output
+        size of every loaded section (see `parse_stats`). With more than one
+        worker the times are measured in the workers. None skips all the
+        measurements.
+    validate : bool
+        If True the loaded sections are also checked with
+        `model_checks.check_model` (indices of A and columns of the bounds in
+        range, Eqin values) in O(nnz), without copies.
 
     Returns:
     --------
-    Dict[str, Union[List[float], np.ndarray, int, sparse.csc_array]] A dictionary containing the following keys and their associated values:
+    Dict[str, Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]] A dictionary containing the following keys (the requested ones) and their associated values:
         - "MinMax": An integer indicating whether the problem is a minimization or maximization problem.
-        - "A": A sparse.csc_array representing the constraint matrix.
+        - "A": A sparse.csc_array representing the constraint matrix, read from a dense ("A=["), triplet
+          ("A_triplets=[") or row ("A_rows=[") section.
         - "b": A NumPy array representing the right-hand side vector.
         - "c": A NumPy array representing the objective function coefficients.
         - "Eqin": A NumPy array representing the type of equations (-1 for <=, 0 for =, 1 for >=).
-        - "Bounds": A list of strings containing bounds information.
+        - "Bounds": A BoundsArray with the bounds (empty if the file has no "BS=[" section).
+        - "row_names", "col_names": NamePools with the names of the rows and columns, only if the file
+          has "RowNames=[" / "ColNames=[" sections.
 
     Raises:
     -------
     FileNotFoundError
         If the specified file path does not exist.
     ValueError
-        If the file contents are not formatted correctly or if required 
-        components are missing.    
+        If the file contents are not formatted correctly, if a requested
+        component is missing or if the sizes of A, b, c and Eqin do not match.
     """
-    Bounds = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            stripped_line = line.strip()
-            if stripped_line.startswith("A=["):
-                A = parse_A(file)
-            elif stripped_line.startswith("b=["):
-                b = parse_column_vector(file , A.get_shape()[0] )
-            elif stripped_line.startswith("c=["):
-                c = parse_column_vector(file , A.get_shape()[1])
-            elif stripped_line.startswith("Eqin=["):
-                Eqin = parse_column_vector(file , A.get_shape()[0])
-            elif stripped_line.startswith("MinMax="):
-                MinMax = int(stripped_line.split()[1])
-            elif stripped_line.startswith("BS=["):
-                Bounds = parse_BS(file)
+    compressed = detect_compression(file_path) is not None
+    if compressed:
+        loaded = _parse_compressed_txt(file_path, None if sections is None else set(sections), stats)
+        index: Dict[str, TxtSection] = {}
+        available = set(loaded)
+    else:
+        index = index_txt_sections(file_path)
+        available = set(index)
+    if sections is None:
+        keys = ["MinMax", "A", "b", "c", "Eqin", "Bounds"] + [key for key in ("row_names", "col_names") if key in available]
+    else:
+        keys = list(sections)
+
+    parsed: Dict[str, Union[BoundsArray, NamePool, np.ndarray, int, sparse.csc_array]] = {}
+    missing = [key for key in keys if key not in available]
+    if "Bounds" in missing:
+        parsed["Bounds"] = BoundsArray()  # The bounds are optional, and so are the names
+    missing = [key for key in missing if key not in TXT_OPTIONAL_SECTIONS]
+    if missing:
+        raise ValueError(f"Sections {missing} not found in {file_path}")
+
+    if compressed:
+        parsed.update((key, loaded[key]) for key in keys if key in loaded)
+    else:
+        to_load = [index[key] for key in keys if key in index]
+        if stats is not None:
+            # A section ends where the next one starts
+            offsets = sorted(section.offset for section in index.values()) + [os.path.getsize(file_path)]
+            ends = [next(offset for offset in offsets if offset > section.offset) for section in to_load]
+            if workers > 1 and len(to_load) > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(to_load))) as pool:
+                    measured = list(pool.map(_load_txt_section_measured, [file_path] * len(to_load), to_load, ends))
             else:
-                continue
-                
-    return {
-        "MinMax": MinMax,
-        "A": A,
-        "b": b,
-        "c": c,
-        "Eqin": Eqin,
-        "Bounds": Bounds
-    }
+                measured = [_load_txt_section_measured(file_path, section, end) for section, end in zip(to_load, ends)]
+            values = [value for value, _ in measured]
+            for _, section_stats in measured:
+                stats.add(section_stats)
+        elif workers > 1 and len(to_load) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(to_load))) as pool:
+                values = list(pool.map(load_txt_section, [file_path] * len(to_load), to_load))
+        else:
+            values = [load_txt_section(file_path, section) for section in to_load]
+        parsed.update((section.key, value) for section, value in zip(to_load, values))
+
+    # The vectors are sized by their own section, check them against A
+    A = parsed.get("A")
+    if isinstance(A, sparse.csc_array):
+        for key, size in (("b", A.shape[0]), ("c", A.shape[1]), ("Eqin", A.shape[0]),
+                          ("row_names", A.shape[0]), ("col_names", A.shape[1])):
+            vector = parsed.get(key)
+            if isinstance(vector, (np.ndarray, NamePool)) and len(vector) != size:
+                raise ValueError(f"{key} has {len(vector)} values, expected {size} for A of shape {A.shape}")
+    if validate:
+        check_model(parsed)
+
+    return parsed
+
+
+def _name_table(prefix: str, count: int, names: Optional[Sequence[str]] = None, first: int = 0,
+                fallback: bool = False) -> np.ndarray:
+    # The names of the rows / columns written by `save_mps_file`, as Python strings: the given names
+    # (e.g. a `NamePool`, converted at once) or prefix<first>, prefix<first + 1>, ...
+    # A name that can't be written in free MPS (empty or with blanks, see `_blank_name`) raises ValueError,
+    # or gives the generated names if `fallback`
+    if names is not None:
+        if len(names) != count:
+            raise ValueError(f"Expected {count} {prefix} names, got {len(names)}")
+        table = np.empty(count, dtype=object)
+        table[:] = names.to_list() if isinstance(names, NamePool) else list(names)
+        bad = _blank_name(names, table)
+        if bad is None:
+            return table
+        if not fallback:
+            raise ValueError(f"The {prefix} name {bad!r} can't be written to a free MPS file (it is empty or has "
+                             f"blanks), write the file without the names")
+    return np.char.add(prefix, np.arange(first, first + count).astype(str)).astype(object)
+
+def _blank_name(names: Sequence[str], table: np.ndarray) -> Optional[str]:
+    # The first name that is empty or has blanks, None if there is none. The fields of a free MPS line are
+    # separated by blanks, so its names can't have any (the names of a fixed MPS file may).
+    # The bytes of a `NamePool` are checked at once.
+    if isinstance(names, NamePool):
+        if not (np.isin(names.pool, _BLANK_BYTES).any() or np.any(np.diff(names.offsets) == 0)):
+            return None
+    return next((name for name in table.tolist() if not name or len(name.split()) != 1 or name.strip() != name), None)
+
+def _objective_name(row_table: np.ndarray) -> str:
+    # The name of the objective function row: OBJ_NAME, or OBJ_NAME1, OBJ_NAME2, ... if a constraint row has it
+    name, k = OBJ_NAME, 0
+    while len(row_table) and np.any(row_table == name):
+        k += 1
+        name = f"{OBJ_NAME}{k}"
+    return name
+
+def _format_nonzeros(values: Union[np.ndarray, List[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the indices of the non-zero values and their text, formatted exactly like f"{value}". astype(str)
+    matches str() for NumPy numbers, lists go through an object array so that every element keeps its own
+    type (an int 2 is written as "2", a float 2.0 as "2.0").
+    """
+    nonzero = np.flatnonzero(np.asarray(values) != 0)
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return nonzero, values[nonzero].astype(str)
+    return nonzero, np.array(values, dtype=object)[nonzero].astype(str)
+
+def _format_entries(data: np.ndarray, prefix: str) -> np.ndarray:
+    """
+    Formats the values of A like f"{prefix}{value}", as an object array. Models repeat a few values (1.0, -1.0, ...)
+    many times, so only the distinct values are formatted. They are found by their bits, which keeps -0.0 apart from 0.0.
+    """
+    if data.dtype == object or data.size == 0:
+        return np.array([f"{prefix}{value}" for value in data], dtype=object)
+    distinct, inverse = np.unique(np.ascontiguousarray(data).view(f"u{data.itemsize}"), return_inverse=True)
+    texts = np.char.add(prefix, distinct.view(data.dtype).astype(str)).astype(object)
+    return texts[inverse.ravel()]
+
+# The MARKER lines around the integer columns, written by `save_mps_file`
+MARKER_INTORG = " MARKER  'MARKER'  'INTORG'\n"
+MARKER_INTEND = " MARKER  'MARKER'  'INTEND'\n"
+
+def _written_columns(A: sparse.csc_array, c: Union[np.ndarray, List[float]]) -> np.ndarray:
+    # The columns `_format_columns` writes a line for: the ones with a non-zero in A or in c
+    written: np.ndarray = (np.diff(A.indptr) > 0) | (np.asarray(c) != 0)
+    return written
+
+def _integer_after(A: sparse.csc_array, c: Union[np.ndarray, List[float]], integrality: Optional[np.ndarray],
+                   integer_before: bool = False) -> bool:
+    # Whether a run of integer columns is open after `_format_columns` wrote the columns of A: the integrality
+    # of the last column written, `integer_before` if none was
+    if integrality is None:
+        return integer_before
+    written = np.flatnonzero(_written_columns(A, c))
+    return bool(integrality[written[-1]]) if len(written) else integer_before
+
+def _format_columns(A: sparse.csc_array, c: Union[np.ndarray, List[float]], col_names: np.ndarray,
+                    row_names: np.ndarray, OBJ_name: str, integrality: Optional[np.ndarray] = None,
+                    integer_before: bool = False) -> Iterator[str]:
+    """
+    Formats the COLUMNS section, one batch of about `WRITE_BATCH_ENTRIES` entries at a time.
 
+    The entries of a column, followed by its objective coefficient if non-zero, are written two per line.
+    This is the same as pairing the entries and putting an odd last entry on a line with the objective
+    coefficient, so the output matches the former line by line writer.
 
-def save_mps_file(file_path: str , MinMax:int , A : sparse.csc_array , b: np.ndarray , c: np.ndarray, Eqin: np.ndarray , Bounds:list[str] ) -> None:
+    With `integrality`, a MARKER line is written before every column whose integrality differs from the one of
+    the column written before it (`integer_before` for the first one): INTORG before the first column of a run of
+    integer columns, INTEND before the first column after it. Columns without any non-zero are not written, nor
+    are their markers. A run still open after the last column is not closed, so that the columns can be
+    formatted in blocks (see `_integer_after`).
+    """
+    num_cols = A.shape[1]
+    obj_columns, c_texts = _format_nonzeros(c)
+    has_obj = np.zeros(num_cols, dtype=bool)
+    has_obj[obj_columns] = True
+    obj_texts = np.full(num_cols, "", dtype=object)
+    obj_texts[obj_columns] = np.char.add("  ", c_texts).astype(object)
+    prefixes = np.char.add(np.char.add(" ", col_names.astype(str)), "  ").astype(object)
+    column_nnz = np.diff(A.indptr)
+
+    # The MARKER lines, as part of the line start of the first line of their column
+    if integrality is not None:
+        written = np.flatnonzero((column_nnz > 0) | has_obj)
+        states = np.asarray(integrality, dtype=bool)[written]
+        changes = states != np.concatenate(([integer_before], states[:-1]))
+        if np.any(changes):
+            markers = np.where(states[changes], MARKER_INTORG, MARKER_INTEND).astype(object)
+            prefixes[written[changes]] = markers + prefixes[written[changes]]
+
+    first = 0
+    while first < num_cols:
+        # Columns until the batch holds enough entries (at least one column)
+        last = int(np.searchsorted(A.indptr, A.indptr[first] + WRITE_BATCH_ENTRIES, side="right"))
+        last = min(max(last - 1, first + 1), num_cols)
+
+        lo, hi = A.indptr[first], A.indptr[last]
+        batch_nnz = column_nnz[first:last]
+        batch_obj = has_obj[first:last]
+        counts = batch_nnz + batch_obj
+        starts = np.cumsum(counts) - counts
+
+        # Every token is 4 strings: line start, name, "  value" and line end. The entries of a column are in
+        # stored order, followed by the objective token of the column.
+        parts = np.empty((int(counts.sum()), 4), dtype=object)
+        entry_cols = np.repeat(np.arange(last - first), batch_nnz)
+        entry_pos = starts[entry_cols] + np.arange(hi - lo) - (A.indptr[first:last][entry_cols] - lo)
+        parts[entry_pos, 1] = row_names[A.indices[lo:hi]]
+        parts[entry_pos, 2] = _format_entries(A.data[lo:hi], "  ")
+        obj_pos = (starts + batch_nnz)[batch_obj]
+        parts[obj_pos, 1] = OBJ_name
+        parts[obj_pos, 2] = obj_texts[first:last][batch_obj]
+
+        # Even positions start a line with the column name, odd positions and the last token of a column end it
+        token_cols = np.repeat(np.arange(last - first), counts)
+        position = np.arange(len(parts)) - starts[token_cols]
+        opens = position % 2 == 0
+        parts[:, 0] = "  "
+        parts[opens, 0] = prefixes[first:last][token_cols[opens]]
+        parts[:, 3] = ""
+        parts[~opens | (position == counts[token_cols] - 1), 3] = "\n"
+        yield "".join(parts.ravel().tolist())
+        first = last
+
+# Name of the objective row of the .mps files written by `save_mps_file`
+OBJ_NAME = "OBJ"
+
+# The bytes that separate the fields of a free MPS line, which names can't contain
+_BLANK_BYTES = np.frombuffer(b" \t\n\r\v\f", dtype=np.uint8)
+
+# The row names of the parallel `save_mps_file`, sent once to every worker process
+_writer_state: Dict[str, Any] = {}
+
+# A range of columns of A for `_format_columns_range`: its CSC arrays (data, indices, indptr from 0), c,
+# the column names, the integrality (or None) and whether the column before the range is an integer column
+_ColumnsTask = Tuple[np.ndarray, np.ndarray, np.ndarray, Union[np.ndarray, List[float]], np.ndarray,
+                     Optional[np.ndarray], bool]
+
+def _init_format_worker(row_names: np.ndarray, num_rows: int, obj_name: str = OBJ_NAME) -> None:
+    # Runs once in every worker process, so the row names are sent to each worker only once
+    _writer_state["row_names"] = row_names
+    _writer_state["num_rows"] = num_rows
+    _writer_state["obj_name"] = obj_name
+
+def _format_columns_range(task: _ColumnsTask) -> str:
+    # The COLUMNS text of a range of columns, in a worker process (see `_iter_parallel_columns`)
+    data, indices, indptr, c, col_names, integrality, integer_before = task
+    A = sparse.csc_array((data, indices, indptr), shape=(_writer_state["num_rows"], len(indptr) - 1), copy=False)
+    return "".join(_format_columns(A, c, col_names, _writer_state["row_names"], _writer_state["obj_name"],
+                                   integrality, integer_before))
+
+def _split_columns_by_entries(indptr: np.ndarray, parts: int) -> List[Tuple[int, int]]:
+    """
+    Splits the columns of a CSC matrix (given its `indptr`) in at most `parts` ranges [first, last) of consecutive
+    columns with about the same number of non-zeros. Every range holds at least one column.
+    """
+    num_cols = len(indptr) - 1
+    targets = np.linspace(0, indptr[-1], parts + 1)[1:-1]
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(indptr, targets, side="right") - 1, [num_cols])))
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+def _iter_parallel_columns(A: sparse.csc_array, c: Union[np.ndarray, List[float]], col_names: np.ndarray,
+                           row_names: np.ndarray, integrality: Optional[np.ndarray], workers: int,
+                           obj_name: str = OBJ_NAME) -> Iterator[str]:
+    """
+    The text of `_format_columns` formatted by a pool of `workers` processes, one range of columns per
+    task, and yielded in the order of the columns. Only `PARALLEL_WRITE_AHEAD_PER_WORKER` ranges per worker are
+    formatted ahead of the one yielded, so the workers format the next ranges while the caller writes the
+    text of the previous ones, without holding the text of the whole section.
+    """
+    ranges = _split_columns_by_entries(A.indptr, workers * PARALLEL_WRITE_RANGES_PER_WORKER)
+    integer = np.asarray(integrality, dtype=bool) if integrality is not None else None
+    if integer is not None:
+        # The integrality before a range is the one of the last column written before it
+        written = _written_columns(A, c)
+        last_written = np.maximum.accumulate(np.where(written, np.arange(len(written)), -1))
+    pending: Deque["Future[str]"] = deque()
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=_init_format_worker,
+                             initargs=(row_names, A.shape[0], obj_name)) as pool:
+        for first, last in ranges:
+            # Views of the arrays of A, only the range is pickled
+            lo, hi = A.indptr[first], A.indptr[last]
+            before = False
+            if integer is not None and first > 0 and last_written[first - 1] >= 0:
+                before = bool(integer[last_written[first - 1]])
+            task = (A.data[lo:hi], A.indices[lo:hi], A.indptr[first:last + 1] - lo, c[first:last],
+                    col_names[first:last], integer[first:last] if integer is not None else None, before)
+            pending.append(pool.submit(_format_columns_range, task))
+            if len(pending) >= workers * PARALLEL_WRITE_AHEAD_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _write_mps_rows(file: TextIO, MinMax: int, Eqin: Union[np.ndarray, List[int]], row_table: np.ndarray,
+                    obj_name: str = OBJ_NAME) -> None:
+    # Writes the NAME and ROWS sections of `save_mps_file`, `obj_name` is the objective function row
+    # NAME
+    if MinMax == 1 :
+        file.write("NAME  LP_PROBLEM_NAME   (MAX)\n")  # Write the problem name    
+    else:
+        file.write("NAME  LP_PROBLEM_NAME\n")  # Write the problem name
+
+    # ROWS
+    file.write("ROWS\n")
+    convert_Eqin = {-1:"L" , 0:"E" , 1:"G"}
+    # Only the distinct signs go through the dictionary, an unknown sign raises KeyError
+    signs, sign_index = np.unique(np.asarray(Eqin), return_inverse=True)
+    letters = np.array([f" {convert_Eqin[sign]}  " for sign in signs.tolist()], dtype=object)
+    rows_text = letters[sign_index.ravel()] + row_table[:len(Eqin)] + "\n"
+    file.write("".join(rows_text.tolist()))
+    file.write(f" N  {obj_name}\n")
+
+def _write_mps_rhs_bounds(file: TextIO, b: Union[np.ndarray, List[float]], row_table: np.ndarray,
+                          bounds: BoundsArray, bound_col_names: np.ndarray, b_sets: Optional[sparse.csc_array] = None,
+                          rhs_names: Optional[Sequence[str]] = None, ranges: Optional[np.ndarray] = None,
+                          obj_constant: float = 0.0, obj_name: str = OBJ_NAME) -> None:
+    # Writes the RHS, RANGES and BOUNDS sections of `save_mps_file` and the end of the file.
+    # `bound_col_names` are the names of the columns of the bounds, in order. The first RHS set is `b` (with the
+    # objective constant), the others are the columns of `b_sets` from the second one.
+    # RHS
+    file.write("RHS\n")
+    num_sets = b_sets.shape[1] if b_sets is not None else 0
+    # The sets of a fixed MPS file may have names with blanks, they are then named RHS1, RHS2, ...
+    set_names = _name_table("RHS", max(num_sets, 1), rhs_names if num_sets else None, 1, fallback=True)
+    if obj_constant:
+        file.write(f" {set_names[0]}  {obj_name}  {-obj_constant}\n")  # The RHS of the objective is minus its constant
+    nonzero, b_texts = _format_nonzeros(b)
+    rhs_text = f" {set_names[0]}  " + row_table[nonzero] + np.char.add(np.char.add("  ", b_texts), "\n").astype(object)
+    file.write("".join(rhs_text.tolist()))
+    if num_sets > 1:
+        B = sparse.csc_array(b_sets).sorted_indices()
+        for k in range(1, num_sets):
+            rows, values = B.indices[B.indptr[k]:B.indptr[k + 1]], B.data[B.indptr[k]:B.indptr[k + 1]]
+            nonzero, texts = _format_nonzeros(values)
+            set_text = f" {set_names[k]}  " + row_table[rows[nonzero]] + np.char.add(np.char.add("  ", texts), "\n").astype(object)
+            file.write("".join(set_text.tolist()))
+
+    # RANGES (NaN marks the rows without a range, a zero range is written)
+    with_range = np.flatnonzero(~np.isnan(ranges)) if ranges is not None else np.empty(0, dtype=np.int64)
+    if len(with_range):
+        file.write("RANGES\n")
+        range_text = " RNG1  " + row_table[with_range] + _format_entries(np.asarray(ranges, dtype=float)[with_range], "  ") + "\n"
+        file.write("".join(range_text.tolist()))
+
+    # BOUNDS
+    if len(bounds):
+        file.write("BOUNDS\n")
+        values = bounds.value_texts()
+        values[values == "None"] = ""  # A bound without value keeps the separator
+        lines = bounds.type_names().astype(object) + " BND1  " + bound_col_names + "  " + values + "\n"
+        file.write("".join(lines.tolist()))
+
+    file.write("ENDATA")
+
+def save_mps_file(file_path: str , MinMax:int , A : sparse.csc_array , b: Union[np.ndarray, List[float]] , c: Union[np.ndarray, List[float]], Eqin: Union[np.ndarray, List[int]] , Bounds: Union[BoundsArray, List[str]],
+                  row_names: Optional[Sequence[str]] = None, col_names: Optional[Sequence[str]] = None,
+                  b_sets: Optional[sparse.csc_array] = None, rhs_names: Optional[Sequence[str]] = None,
+                  ranges: Optional[np.ndarray] = None, obj_constant: float = 0.0,
+                  integrality: Optional[np.ndarray] = None, workers: int = 1) -> None:
     """
     Saves a linear programming problem to a file in MPS format.
 
@@ -303,7 +961,7 @@ def save_mps_file(file_path: str , MinMax:int , A : sparse.csc_array , b: np.nda
     Parameters:
     -----------
     file_path : str
-        The path where the MPS file will be saved.
+        The path where the MPS file will be saved. A path ending with .gz, .bz2 or .xz is compressed while it is written.
     
     MinMax : int
         An integer indicating the type of problem:
@@ -314,25 +972,56 @@ def save_mps_file(file_path: str , MinMax:int , A : sparse.csc_array , b: np.nda
         A sparse matrix in Compressed Sparse Column (CSC) format representing 
         the constraint coefficients of the linear programming problem.
     
-    b : np.ndarray
-        A NumPy array representing the right-hand side (RHS) vector of the 
+    b : Union[np.ndarray, List[float]]
+        The right-hand side (RHS) vector of the 
         constraints.
     
-    c : np.ndarray
-        A NumPy array representing the objective function coefficients.
+    c : Union[np.ndarray, List[float]]
+        The objective function coefficients (a list, as returned by
+        `mps_to_matrix.parse_mps_file`, or a NumPy array).
     
-    Eqin : np.ndarray
+    Eqin : Union[np.ndarray, List[int]]
         A NumPy array specifying the type of each constraint:
         - -1 for less-than-or-equal constraints ("L"),
         - 0 for equality constraints ("E"),
         - 1 for greater-than-or-equal constraints ("G").
     
-    Bounds : list[str]
-        A list of strings specifying the variable bounds in the format 
-        required by MPS. Each string should represent one bound, including the 
+    Bounds : Union[BoundsArray, List[str]]
+        The variable bounds, as a `BoundsArray` or as a list of strings in
+        the former format. Each string should represent one bound, including the 
         type of bound, the column (variable) it applies to, and the bound 
         value (or "None" if the bound is not defined).
 
+    row_names, col_names : Optional[Sequence[str]]
+        The names of the rows and columns (e.g. the `NamePool`s returned by
+        `parse_mps_file` or `parse_file`). When None the rows are named ROW0,
+        ROW1, ... and the columns COL0, COL1, ... The names can't be empty or
+        contain blanks (a fixed MPS file may have such names). The objective
+        function row is named OBJ, or OBJ1, OBJ2, ... if a row is named OBJ.
+
+    b_sets : Optional[sparse.csc_array]
+        Every RHS set as a column of an (m x k) matrix (as returned by `parse_mps_file`). `b` is written as the
+        first set and the columns of `b_sets` from the second one as further sets.
+
+    rhs_names : Optional[Sequence[str]]
+        The names of the RHS sets, one per column of `b_sets`. When None the sets are named RHS1, RHS2, ...
+
+    ranges : Optional[np.ndarray]
+        The RANGES value of every row, NaN for the rows without one. Written in a RANGES section (set RNG1).
+
+    obj_constant : float
+        The constant of the objective function, written as minus the RHS of the objective row in the first set.
+
+    integrality : Optional[np.ndarray]
+        Whether each column is an integer variable (as returned by `parse_mps_file`). The runs of integer
+        columns are written between MARKER 'INTORG' and 'INTEND' lines.
+
+    workers : int
+        The number of processes that format the COLUMNS section. With more than one worker the columns are split
+        in ranges of about the same number of non-zeros, formatted in a process pool while this process writes
+        the text of the ranges before them, in order. The file is the same as with one worker. Matrices with
+        fewer than `PARALLEL_WRITE_MIN_ENTRIES` non-zeros are formatted in this process.
+
     Returns:
     --------
     None
@@ -342,66 +1031,39 @@ def save_mps_file(file_path: str , MinMax:int , A : sparse.csc_array , b: np.nda
     Notes:
     ------
     - The function writes the MPS sections in the following order: NAME, ROWS, 
-      COLUMNS, RHS, BOUNDS (if provided), and ENDATA.
+      COLUMNS, RHS, RANGES and BOUNDS (if provided), and ENDATA.
     - In the "COLUMNS" section, two entries (ROW, value) are written per line 
       where possible, and the objective function coefficients are added when 
       non-zero.
+    - The sections are formatted with NumPy, the COLUMNS section in batches of
+      `WRITE_BATCH_ENTRIES` non-zeros, and written through a large buffer.
     """
-    OBJ_name  = "OBJ"
-    with open(file_path, "w") as file:  # Open a file in write mode
-        # NAME
-        if MinMax == 1 :
-            file.write("NAME  LP_PROBLEM_NAME   (MAX)\n")  # Write the problem name    
-        else:
-            file.write("NAME  LP_PROBLEM_NAME\n")  # Write the problem name
-
-        # ROWS
-        file.write("ROWS\n")
-        convert_Eqin = {-1:"L" , 0:"E" , 1:"G"}
-        for i , sign in enumerate(Eqin) :             
-            file.write(f" {convert_Eqin[sign]}  ROW{i}\n")  
-        file.write(f" N  {OBJ_name}\n")
-        
+    A = sparse.csc_array(A)
+    num_rows, num_cols = A.shape
+    row_table = _name_table("ROW", max(num_rows, len(Eqin), len(b)), row_names)
+    col_table = _name_table("COL", num_cols, col_names)
+    obj_name = _objective_name(row_table)
+    bounds = as_bounds(Bounds)
+    with open_output(file_path, WRITE_BUFFER_SIZE) as file:  # Open a file in write mode (compressed for .gz, .bz2 and .xz paths)
+        # NAME and ROWS
+        _write_mps_rows(file, MinMax, Eqin, row_table, obj_name)
+
         # COLUMNS
         file.write("COLUMNS\n")
-        # Iterate over each column of the sparse matrix A
-        for col_number in range(A.shape[1]):  # Iterate over columns
-            # Write pairs of ROW and value for the current column
-            # The loop increments by 2, handling two entries per line where possible
-            start_index = A.indptr[col_number]
-            end_index = A.indptr[col_number + 1]    
-            # for i in range(A.indptr[col_number] ,A.indptr[col_number+1]  - ((A.indptr[col_number+1] - A.indptr[col_number]) % 2) ,2):
-            for i in range(start_index, end_index - ((end_index - start_index) % 2), 2):
-                file.write(f" COL{col_number}  ROW{A.indices[i]}  {A.data[i]}  ROW{A.indices[i+1]}  {A.data[i+1]}\n")
-
-            # Check if there is an unpaired last entry in this column
-            if (A.indptr[col_number+1] - A.indptr[col_number]) % 2 :
-                # If there's an odd number of entries, write the last entry separately
-                if c[col_number] != 0:                    
-                    # If the objective function coefficient for this column is non-zero, write it in the same line as the last entry
-                    file.write(f" COL{col_number}  ROW{A.indices[A.indptr[col_number+1]-1]}  {A.data[A.indptr[col_number+1]-1]}  {OBJ_name}  {c[col_number]}\n")
-                else:
-                    # Write the last unpaired entry without the objective function coefficient
-                    file.write(f" COL{col_number}  ROW{A.indices[A.indptr[col_number+1]-1]}  {A.data[A.indptr[col_number+1]-1]}\n")
-            elif c[col_number] != 0:
-                # If the number of entries is even and the objective function coefficient is non-zero, write it
-                file.write(f" COL{col_number}  {OBJ_name}  {c[col_number]}\n")
-        
-        # RHS
-        file.write("RHS\n")
-        for i , value in enumerate(b) :
-            if value != 0 :
-                file.write(f" RHS1  ROW{i}  {value}\n")  
-
-        # BOUNDS
-        if Bounds:
-            file.write("BOUNDS\n")
-            for value in Bounds: 
-                a = value.split()
-                extra = a[2] if a[2] != "None" else ""                
-                file.write(f"{a[0]} BND1  COL{a[1]}  {extra}\n")  
-        
-        file.write("ENDATA")
+        if integrality is not None and len(integrality) != num_cols:
+            raise ValueError(f"Expected {num_cols} integrality values, got {len(integrality)}")
+        if workers > 1 and num_cols and A.nnz >= PARALLEL_WRITE_MIN_ENTRIES:
+            texts = _iter_parallel_columns(A, c, col_table, row_table, integrality, workers, obj_name)
+        else:
+            texts = _format_columns(A, c, col_table, row_table, obj_name, integrality)
+        for text in texts:
+            file.write(text)
+        if _integer_after(A, c, integrality):
+            file.write(MARKER_INTEND)
+
+        # RHS, RANGES, BOUNDS and ENDATA
+        _write_mps_rhs_bounds(file, b, row_table, bounds, col_table[bounds.columns], b_sets, rhs_names, ranges,
+                              obj_constant, obj_name)
         
 
 
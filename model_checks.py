@@ -0,0 +1,103 @@
+# Consistency checks of a parsed linear program (the dictionary of mps_to_matrix.parse_mps_file or of
+# matrix_to_mps.parse_file), shared by both converters:
+#
+#   check_model(parse_mps_file("model.mps"))     # Raises ValueError on the first inconsistency
+#   parse_mps_file("model.mps", validate=True)   # The same, as part of the parse
+#
+# Every check is a length comparison or a reduction (min / max) over the arrays of the model, so the cost is
+# O(nnz + rows + columns) and no array is copied.
+
+from typing import Any, Mapping, Optional
+
+import numpy as np
+from scipy import sparse
+
+from bounds import as_bounds
+
+# The codes of the constraint types in `Eqin` (<=, =, >=)
+EQIN_CODES = (-1, 0, 1)
+
+# The vectors with one value per row and per column of A
+_ROW_KEYS = ("b", "Eqin", "row_names", "ranges")
+_COLUMN_KEYS = ("c", "col_names", "integrality")
+
+
+def _check_index_range(indices: np.ndarray, size: int, what: str) -> None:
+    # All the indices are in [0, size)
+    if len(indices) and (int(indices.min()) < 0 or int(indices.max()) >= size):
+        raise ValueError(f"The {what} indices of A are outside [0, {size})")
+
+
+def _check_compressed(A: Any, major: int, minor: int, what: str) -> None:
+    # The index pointer and the indices of a CSR / CSC matrix with `major` rows / columns of `minor` entries
+    indptr = A.indptr
+    if len(indptr) != major + 1 or int(indptr[0]) != 0:
+        raise ValueError(f"The index pointer of A has {len(indptr)} values, expected {major + 1} starting at 0")
+    if int(indptr[-1]) != len(A.indices) or len(A.indices) != len(A.data):
+        raise ValueError(f"A has {len(A.data)} values and {len(A.indices)} indices, its index pointer ends at "
+                         f"{int(indptr[-1])}")
+    if np.any(indptr[1:] < indptr[:-1]):
+        raise ValueError("The index pointer of A is not non-decreasing")
+    _check_index_range(A.indices, minor, what)
+
+
+def check_model(parsed_data: Mapping[str, Any], A_shape: Optional[tuple] = None) -> None:
+    """
+    Checks that the parts of a linear program agree in size: `b`, `Eqin`, `row_names` and `ranges` have a value
+    per row of `A`, `c`, `col_names` and `integrality` a value per column, `b_sets` a row per row, the indices of
+    `A` and the columns of the bounds are in range and `Eqin` only holds -1, 0 and 1. The parts that are missing
+    from `parsed_data` are not checked.
+
+    Parameters:
+    -----------
+    parsed_data : Mapping[str, Any]
+        The dictionary of `parse_mps_file` or `parse_file` (or an `lp_model.LPModel`).
+    A_shape : Optional[tuple]
+        The shape of `A`, when `parsed_data` has no "A" (e.g. the sections of `parse_file` without the matrix).
+        None takes the shape of `parsed_data["A"]`, or checks the vectors against each other without it.
+
+    Raises:
+    -------
+    ValueError
+        On the first inconsistency found.
+    """
+    A = parsed_data.get("A")
+    if A is not None:
+        A_shape = A.shape
+        num_rows, num_cols = A.shape
+        if isinstance(A, sparse.coo_array):
+            if not len(A.row) == len(A.col) == len(A.data):
+                raise ValueError("The row, column and value arrays of A have different lengths")
+            _check_index_range(A.row, num_rows, "row")
+            _check_index_range(A.col, num_cols, "column")
+        elif isinstance(A, sparse.csr_array):
+            _check_compressed(A, num_rows, num_cols, "column")
+        elif isinstance(A, sparse.csc_array):
+            _check_compressed(A, num_cols, num_rows, "row")
+
+    # Without A the first vector of each kind gives the size the others are checked against
+    sizes = {"row": A_shape[0] if A_shape is not None else None, "column": A_shape[1] if A_shape is not None else None}
+    for kind, keys in (("row", _ROW_KEYS), ("column", _COLUMN_KEYS)):
+        for key in keys:
+            vector = parsed_data.get(key)
+            if vector is None:
+                continue
+            if sizes[kind] is None:
+                sizes[kind] = len(vector)
+            elif len(vector) != sizes[kind]:
+                raise ValueError(f"{key} has {len(vector)} values, expected {sizes[kind]} (one per {kind})")
+
+    b_sets = parsed_data.get("b_sets")
+    if b_sets is not None and sizes["row"] is not None and b_sets.shape[0] != sizes["row"]:
+        raise ValueError(f"b_sets has {b_sets.shape[0]} rows, expected {sizes['row']}")
+
+    Eqin = parsed_data.get("Eqin")
+    if Eqin is not None and len(Eqin):
+        codes = np.asarray(Eqin)
+        if not np.isin(codes, EQIN_CODES).all():
+            raise ValueError(f"Eqin holds values other than {EQIN_CODES}")
+
+    if parsed_data.get("Bounds") is not None and sizes["column"] is not None:
+        bounds = as_bounds(parsed_data["Bounds"])
+        if len(bounds) and (int(bounds.columns.min()) < 0 or int(bounds.columns.max()) >= sizes["column"]):
+            raise ValueError(f"A bound references a column outside [0, {sizes['column']})")
@@ -0,0 +1,438 @@
+# A binary cache of parsed .mps files, so that a model is parsed once and loaded from disk afterwards.
+#
+# Usage:
+#   from mps_cache import parse_mps_file_cached
+#   parsed_data = parse_mps_file_cached("model.mps")                    # Parses and stores on the first call
+#   parsed_data = parse_mps_file_cached("model.mps", mmap_mode="r")     # Loads A and b memory mapped afterwards
+#
+# Every entry is a directory of .npy files (A as CSR arrays, b, c, Eqin, the Bounds arrays, the bytes and offsets of
+# the row and column name pools) and a meta.json file
+# (MinMax, the shape of A, the `mps_format` it was parsed with, the source file and the checksum of each of its
+# sections). .npy files can be memory mapped,
+# so large models load without reading them. An entry is found by the path of the source file and is only used if the
+# size, modification time and content hash of the file match too, and if it was parsed with the same `mps_format`.
+#
+# When the file has changed but its ROWS and COLUMNS sections have not (e.g. only the RHS or the BOUNDS were edited),
+# `parse_mps_file_cached` reuses A and c from the entry and only parses the other sections (see `parse_incremental`).
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import suppress
+from typing import Any, Literal, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from bounds import BoundsArray, as_bounds
+from compressed_io import detect_compression
+from name_pool import NamePool
+from model_checks import check_model
+from mps_to_matrix import (A_FORMATS, MpsStream, _A_arrays, objective_list, parse_mps_file, scan_mps_sections,
+                           to_A_format)
+from parse_stats import ParseStats
+
+# Bump when the layout of the entries changes, older entries are then ignored
+CACHE_FORMAT_VERSION = 10
+
+# The cache directory, can be set with the MPS_CACHE_DIR environment variable
+CACHE_DIR: str = os.environ.get("MPS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mps_to_matrix"))
+
+# The least recently used entries are removed when the cache grows beyond this size (in bytes)
+MAX_CACHE_BYTES: int = 2 << 30
+
+# MPS_CACHE=0 turns the cache off
+CACHE_ENABLED: bool = os.environ.get("MPS_CACHE", "1") != "0"
+
+# Size (in bytes) of the blocks the source file is hashed in
+_HASH_BLOCK_SIZE = 1 << 20
+
+# The modes `np.load` can memory map the arrays in
+MmapMode = Optional[Literal["r", "r+", "c"]]
+
+# The sections A, c and the column names are built from: while their checksums are unchanged an entry can be reused
+# by `parse_incremental`
+_MATRIX_SECTIONS = ("ROWS", "COLUMNS")
+
+_ARRAYS = ("A_data", "A_indices", "A_indptr", "b", "c", "c_has_cost", "Eqin", "Bounds_kinds", "Bounds_columns",
+           "Bounds_values", "Bounds_texts", "row_names_pool", "row_names_offsets", "col_names_pool", "col_names_offsets",
+           "b_sets_data", "b_sets_indices", "b_sets_indptr", "rhs_names_pool", "rhs_names_offsets", "ranges",
+           "integrality")
+
+
+def enable_cache(enabled: bool = True) -> None:
+    """
+    Turns the cache on or off. While it is off `parse_mps_file_cached` always parses and stores nothing.
+    """
+    global CACHE_ENABLED
+    CACHE_ENABLED = enabled
+
+
+def configure_cache(directory: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+    """
+    Changes the cache directory and / or the size limit of the cache (the arguments left as None are kept).
+    """
+    global CACHE_DIR, MAX_CACHE_BYTES
+    if directory is not None:
+        CACHE_DIR = directory
+    if max_bytes is not None:
+        MAX_CACHE_BYTES = max_bytes
+        _evict(MAX_CACHE_BYTES)
+
+
+def clear_cache() -> None:
+    """
+    Removes every entry of the cache.
+    """
+    _evict(0)
+
+
+def file_digest(file_path: str) -> str:
+    """
+    The BLAKE2b hash of the content of a file, read in blocks.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def section_digests(file_path: str) -> Tuple[str, list[dict[str, Any]]]:
+    """
+    Hashes an .mps file and each of its sections in a single pass.
+
+    Returns:
+    --------
+    Tuple[str, list[dict[str, Any]]]
+        The hash of the whole file (the same as `file_digest`) and, for every section found by
+        `mps_to_matrix.scan_mps_sections`, its name ("ROWS", "COLUMNS", ...), its byte range (from the start of
+        the header line to the next header) and the hash of that range. A compressed file has no sections
+        (its bytes are not the ones parsed), so it is never parsed incrementally.
+    """
+    if detect_compression(file_path) is not None:
+        return file_digest(file_path), []
+    digest = hashlib.blake2b(digest_size=20)
+    sections: list[dict[str, Any]] = []
+    with open(file_path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file can't be mapped
+            return digest.hexdigest(), sections
+        with buffer, memoryview(buffer) as view:
+            found = scan_mps_sections(buffer)
+            # The bytes before the first header, then every section from its header line
+            ranges: list[Tuple[Optional[str], int, int]] = [(None, 0, found[0].start - len(found[0].header.encode())
+                                                            if found else len(buffer))]
+            ranges += [(section.header.split()[0], section.start - len(section.header.encode()), section.end)
+                       for section in found]
+            for name, start, end in ranges:
+                section_digest = hashlib.blake2b(digest_size=20)
+                for block_start in range(start, end, _HASH_BLOCK_SIZE):
+                    block = view[block_start:min(block_start + _HASH_BLOCK_SIZE, end)]
+                    digest.update(block)
+                    section_digest.update(block)
+                    block.release()
+                if name is not None:
+                    sections.append({"name": name, "start": start, "end": end, "digest": section_digest.hexdigest()})
+    return digest.hexdigest(), sections
+
+
+def _entry_key(file_path: str) -> tuple[str, dict[str, Any]]:
+    # The entry directory name (one entry per source path) and the properties of the source file it depends on
+    path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    source = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    key = hashlib.blake2b(path.encode(), digest_size=16).hexdigest()
+    return key, source
+
+
+def _read_entry(entry_dir: str, mmap_mode: MmapMode) -> Optional[Tuple[dict, dict[str, np.ndarray]]]:
+    # The meta data and the arrays of an entry of the current format, None if there is none
+    try:
+        with open(os.path.join(entry_dir, "meta.json")) as file:
+            meta = json.load(file)
+        if meta["version"] != CACHE_FORMAT_VERSION:
+            return None
+        arrays = {name: np.load(os.path.join(entry_dir, name + ".npy"), mmap_mode=mmap_mode) for name in _ARRAYS}
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta, arrays
+
+
+def _parsed_from_entry(meta: dict, arrays: dict[str, np.ndarray]) -> dict:
+    # The dictionary of `parse_mps_file` from the meta data and the arrays of an entry
+    A = sparse.csr_array((arrays["A_data"], arrays["A_indices"], arrays["A_indptr"]), shape=tuple(meta["shape"]),
+                         copy=False)
+    return {
+        "MinMax": meta["MinMax"],
+        "A": A,
+        "b": arrays["b"],
+        "c": objective_list(arrays["c"], arrays["c_has_cost"]),
+        "Eqin": arrays["Eqin"].tolist(),
+        "Bounds": BoundsArray(arrays["Bounds_kinds"], arrays["Bounds_columns"], arrays["Bounds_values"],
+                              arrays["Bounds_texts"]),
+        "row_names": NamePool(arrays["row_names_pool"], arrays["row_names_offsets"]),
+        "col_names": NamePool(arrays["col_names_pool"], arrays["col_names_offsets"]),
+        "b_sets": sparse.csc_array((arrays["b_sets_data"], arrays["b_sets_indices"], arrays["b_sets_indptr"]),
+                                   shape=(len(arrays["b"]), len(arrays["b_sets_indptr"]) - 1), copy=False),
+        "rhs_names": NamePool(arrays["rhs_names_pool"], arrays["rhs_names_offsets"]),
+        "ranges": arrays["ranges"],
+        "obj_constant": meta["obj_constant"],
+        "integrality": arrays["integrality"],
+    }
+
+
+def _entry_size(entry_dir: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+
+
+def _evict(max_bytes: int) -> None:
+    """
+    Removes the least recently used entries (by the modification time of their directory, which every hit
+    updates) until the cache holds at most `max_bytes` bytes.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = [entry for entry in os.scandir(CACHE_DIR) if entry.is_dir()]
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    sizes = [_entry_size(entry.path) for entry in entries]
+    total = sum(sizes)
+    for entry, size in zip(entries, sizes):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry.path, ignore_errors=True)
+        total -= size
+
+
+def load_cached(file_path: str, mmap_mode: MmapMode = None, verify: bool = True,
+                mps_format: str = "auto") -> Optional[dict]:
+    """
+    Loads the cached parse of an .mps file.
+
+    Parameters:
+    -----------
+    file_path : str
+        The path of the .mps file.
+    mmap_mode : MmapMode
+        Passed to `np.load`: "r" memory maps `A` and `b` read-only instead of reading them. None reads them.
+    verify : bool
+        If True the content hash of the file must match the one of the entry, which needs a read of the file
+        (much cheaper than parsing it). If False the path, size and modification time are trusted.
+    mps_format : str
+        The layout the file is parsed with (see `mps_to_matrix.parse_mps_file`). An entry stored from a parse with
+        another layout is not used, the same file can give a different model in another layout.
+
+    Returns:
+    --------
+    Optional[dict]
+        The same dictionary as `parse_mps_file`, or None if the file is not cached (or the entry is stale).
+    """
+    key, source = _entry_key(file_path)
+    entry_dir = os.path.join(CACHE_DIR, key)
+    entry = _read_entry(entry_dir, mmap_mode)
+    if entry is None or entry[0]["source"] != source or entry[0]["mps_format"] != mps_format:
+        return None
+    meta, arrays = entry
+    if verify and meta["digest"] != file_digest(file_path):
+        return None
+
+    # Mark the entry as recently used for the eviction
+    with suppress(OSError):
+        os.utime(entry_dir)
+
+    return _parsed_from_entry(meta, arrays)
+
+
+def parse_incremental(file_path: str, mmap_mode: MmapMode = None, mps_format: str = "auto",
+                      stats: Optional[ParseStats] = None) -> Optional[dict]:
+    """
+    Parses an .mps file that changed since it was cached, reusing what the changes did not touch.
+
+    The checksums of the sections of the file are compared with the ones recorded in its cache entry. If the ROWS
+    and COLUMNS sections are unchanged, `A`, `c`, the column names and the integrality are taken from the entry and
+    only the other sections (NAME, OBJSENSE, ROWS, RHS, RANGES, BOUNDS) are parsed, with the COLUMNS section skipped without being read. Edits of
+    the right-hand sides or the bounds of a large model then cost about a read of the file instead of a parse.
+
+    Parameters:
+    -----------
+    file_path : str
+        The path of the .mps file.
+    mmap_mode : MmapMode
+        Passed to `np.load` for the reused arrays (see `load_cached`).
+    mps_format : str
+        The layout of the data lines of the sections parsed again (see `mps_to_matrix.parse_mps_file`). The entry
+        must have been stored from a parse with the same layout.
+    stats : Optional[ParseStats]
+        If given, the sections parsed again are measured into it (see `parse_stats`).
+
+    Returns:
+    --------
+    Optional[dict]
+        The same dictionary as `parse_mps_file`, or None if there is no entry for the file (in this layout) or if
+        its ROWS or COLUMNS section changed (the file must then be parsed in full).
+    """
+    entry = _read_entry(os.path.join(CACHE_DIR, _entry_key(file_path)[0]), mmap_mode)
+    if entry is None or entry[0]["mps_format"] != mps_format:
+        return None
+    meta, arrays = entry
+
+    def matrix_sections(sections: list[dict[str, Any]]) -> list[Tuple[str, str]]:
+        return [(section["name"], section["digest"]) for section in sections if section["name"] in _MATRIX_SECTIONS]
+
+    current = matrix_sections(section_digests(file_path)[1])
+    if not current or current != matrix_sections(meta.get("sections", [])):
+        return None
+
+    parsed_data = _parsed_from_entry(meta, arrays)
+    with MpsStream(file_path, use_mmap=True, stats=stats, mps_format=mps_format) as stream:
+        stream.skip_columns(parsed_data["col_names"], parsed_data["integrality"])
+        stream.finish()
+    parsed_data.update(MinMax=stream.MinMax, b=stream.b, Eqin=stream.Eqin, Bounds=stream.Bounds,
+                       row_names=stream.row_names, b_sets=stream.b_sets, rhs_names=stream.rhs_names,
+                       ranges=stream.ranges, obj_constant=stream.obj_constant)
+    return parsed_data
+
+
+def _has_cost(c: Any) -> np.ndarray:
+    # The columns of `c` with an objective function entry: the int zeros of the list of `parse_mps_file` have none
+    if isinstance(c, list):
+        return np.fromiter((not isinstance(value, int) for value in c), dtype=bool, count=len(c))
+    return np.ones(len(c), dtype=bool)
+
+
+def store_cached(file_path: str, parsed_data: dict, mps_format: str = "auto") -> None:
+    """
+    Stores the parse of an .mps file (the dictionary returned by `parse_mps_file` with `mps_format`) and evicts
+    old entries if the cache grows beyond `MAX_CACHE_BYTES`. The entry is written to a temporary directory first and
+    renamed into place, so concurrent processes never see a partial entry.
+    """
+    key, source = _entry_key(file_path)
+    A = sparse.csr_array(parsed_data["A"])
+    digest, sections = section_digests(file_path)
+    meta = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": source,
+        "mps_format": mps_format,
+        "digest": digest,
+        "sections": sections,
+        "shape": list(A.shape),
+        "MinMax": parsed_data["MinMax"],
+        "obj_constant": parsed_data["obj_constant"],
+    }
+    bounds = as_bounds(parsed_data["Bounds"])
+    row_names, col_names, rhs_names = parsed_data["row_names"], parsed_data["col_names"], parsed_data["rhs_names"]
+    b_sets = sparse.csc_array(parsed_data["b_sets"])
+    arrays = {
+        "A_data": A.data,
+        "A_indices": A.indices,
+        "A_indptr": A.indptr,
+        "b": np.asarray(parsed_data["b"], dtype=float),
+        "c": np.asarray(parsed_data["c"], dtype=float),
+        "c_has_cost": _has_cost(parsed_data["c"]),
+        "Eqin": np.asarray(parsed_data["Eqin"], dtype=np.int8),
+        "Bounds_kinds": bounds.kinds,
+        "Bounds_columns": bounds.columns,
+        "Bounds_values": bounds.values,
+        "Bounds_texts": np.asarray(bounds.texts if bounds.texts is not None else bounds.value_texts(), dtype=bytes),
+        "row_names_pool": row_names.pool,
+        "row_names_offsets": row_names.offsets,
+        "col_names_pool": col_names.pool,
+        "col_names_offsets": col_names.offsets,
+        "b_sets_data": b_sets.data,
+        "b_sets_indices": b_sets.indices,
+        "b_sets_indptr": b_sets.indptr,
+        "rhs_names_pool": rhs_names.pool,
+        "rhs_names_offsets": rhs_names.offsets,
+        "ranges": np.asarray(parsed_data["ranges"], dtype=float),
+        "integrality": np.asarray(parsed_data["integrality"], dtype=bool),
+    }
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=CACHE_DIR)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(temp_dir, name + ".npy"), array)
+        with open(os.path.join(temp_dir, "meta.json"), "w") as file:
+            json.dump(meta, file)
+
+        entry_dir = os.path.join(CACHE_DIR, key)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(temp_dir, entry_dir)
+    except OSError:
+        # Another process stored the same entry first, or the disk is full: the cache is only an optimization
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return
+
+    _evict(MAX_CACHE_BYTES)
+
+
+def parse_mps_file_cached(input_file_path: str, mmap_mode: MmapMode = None, verify: bool = True,
+                          incremental: bool = True, **parse_options: Any) -> dict:
+    """
+    `parse_mps_file` with a cache: the file is parsed the first time and loaded from the cache afterwards,
+    until it changes. When it changes only the changed sections are parsed again if possible.
+
+    Parameters:
+    -----------
+    input_file_path : str
+        The path to the .mps file.
+    mmap_mode : MmapMode
+        "r" memory maps the cached arrays of `A` and `b` (see `load_cached`).
+    verify : bool
+        Check the content hash of the file before using a cache entry (see `load_cached`).
+    incremental : bool
+        If the file changed, reuse `A` and `c` from the entry when the ROWS and COLUMNS sections did not
+        change (see `parse_incremental`). False always parses a changed file in full.
+    **parse_options : Any
+        Passed to `parse_mps_file` on a miss (use_mmap, workers). The other options apply to every call:
+        - A_format: the format of `A` (the cache itself stores `A` in CSR format);
+        - mps_format: only the entries stored from a parse with the same layout are used (see `load_cached`);
+        - validate: the model is checked with `model_checks.check_model`, whether it was parsed or loaded;
+        - stats: a `ParseStats` that gets a "cache" section for the lookup of the entry (with the non-zeros and
+          the size of the arrays loaded on a hit), then the sections parsed on a miss.
+
+    Returns:
+    --------
+    dict
+        The same dictionary as `parse_mps_file`.
+
+    Raises:
+    -------
+    ValueError:
+        With `validate`, if the model is inconsistent (see `model_checks.check_model`).
+    """
+    if not CACHE_ENABLED:
+        return parse_mps_file(input_file_path, **parse_options)
+
+    A_format = parse_options.pop("A_format", "csr")
+    if A_format not in A_FORMATS:
+        raise ValueError(f"Unknown format {A_format!r}, expected one of {A_FORMATS}")
+    validate = parse_options.pop("validate", False)
+    stats: Optional[ParseStats] = parse_options.pop("stats", None)
+    mps_format = parse_options.get("mps_format", "auto")
+
+    section = stats.begin("cache") if stats is not None else None
+    parsed_data = load_cached(input_file_path, mmap_mode, verify, mps_format)
+    if stats is not None and section is not None:
+        if parsed_data is not None:
+            arrays = list(_A_arrays(parsed_data["A"])) + [parsed_data["b"], parsed_data["ranges"]]
+            section.nonzeros = int(parsed_data["A"].nnz)
+            section.nbytes = int(sum(array.nbytes for array in arrays))
+        stats.end(section)
+
+    if parsed_data is None:
+        if incremental:
+            parsed_data = parse_incremental(input_file_path, mmap_mode, mps_format, stats)
+        if parsed_data is None:
+            parsed_data = parse_mps_file(input_file_path, stats=stats, **parse_options)
+        if validate:
+            check_model(parsed_data)
+        store_cached(input_file_path, parsed_data, mps_format)
+    elif validate:
+        check_model(parsed_data)
+    parsed_data["A"] = to_A_format(parsed_data["A"], A_format)
+    return parsed_data
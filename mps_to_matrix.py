@@ -1,13 +1,22 @@
 # Made with help from GPT
 
-import tkinter as tk
-from tkinter import filedialog
 import os
-from typing import Any
+import re
+import mmap
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from typing import Any, Generator, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from scipy import sparse
 
+from bounds import BOUND_CODES, BoundsArray, as_bounds
+from compressed_io import DecompressingReader, InputFile, open_input, open_output
+from model_checks import check_model
+from name_pool import NamePool, NameTable, build_name_table, lookup_names
+from parse_stats import ParseStats, SectionStats
+
 import time
 
 def select_file(window_title: str = "Select a file") -> str:
@@ -26,6 +35,10 @@ def select_file(window_title: str = "Select a file") -> str:
         - The dialog restricts the file selection to `.mps` files by default, but allows selecting any file type.
         - The initial directory is set to the current working directory.
     """ 
+    # tkinter is imported here so that the module can be used without a display (e.g. by batch_convert)
+    import tkinter as tk
+    from tkinter import filedialog
+
     # Create a root window (it won't be displayed)
     root = tk.Tk()
     root.withdraw()  # Hide the root window
@@ -66,6 +79,10 @@ def select_save_file_path(default_name: str = "untitled.txt", save_dir: str = os
         - The `.txt` extension is added automatically if the user does not specify one.
     """
 
+    # tkinter is imported here so that the module can be used without a display (e.g. by batch_convert)
+    import tkinter as tk
+    from tkinter import filedialog
+
     # Create a root window (it won't be displayed)
     root = tk.Tk()
     root.withdraw()  # Hide the root window
@@ -83,8 +100,1300 @@ def select_save_file_path(default_name: str = "untitled.txt", save_dir: str = os
     return file_path
 
 
+# Size (in bytes) of the blocks the sections (mainly COLUMNS) are read and tokenized in
+COLUMNS_CHUNK_SIZE: int = 1 << 22
+
+# Size (in bytes) of the windows a memory mapped file is scanned for section headers in
+SCAN_WINDOW_SIZE: int = 1 << 26
+
+# Number of columns of the blocks yielded by `MpsStream.column_blocks` and `iter_column_blocks`
+BLOCK_COLUMNS: int = 4096
+
+# COLUMNS sections smaller than this (in bytes) are parsed in the main process even if workers are requested
+PARALLEL_MIN_BYTES: int = 1 << 22
+
+# Layouts of the constraint matrix in the files written by `save_txt_file`
+TXT_LAYOUTS = ("dense", "triplets", "rows")
+
+# Sparse formats `parse_mps_file` can return `A` in
+A_FORMATS = ("csr", "csc", "coo")
+
+# How the data lines of an .mps file are split into fields: "free" at whitespace, "fixed" at the byte columns of
+# fixed MPS (names may then contain spaces), "auto" as free MPS falling back to fixed MPS where free MPS fails
+MPS_FORMATS = ("auto", "free", "fixed")
+
+# Typical size (in bytes) of an entry of the COLUMNS section, used to preallocate the arrays of `A`
+ENTRY_BYTES_ESTIMATE: int = 24
+
+# Number of elements of A formatted at once by the dense layout of `save_txt_file`
+TXT_BLOCK_ELEMENTS: int = 1 << 20
+
+# Section headers start in the first column of a line, data lines start with a space
+_SECTION_HEADER_RE = re.compile(rb"^(?:NAME|OBJSENSE|ROWS|COLUMNS|RHS|BOUNDS|RANGES|ENDATA)", re.MULTILINE)
+
+# The token of the integer MARKER lines of the COLUMNS section
+_MARKER_RE = re.compile(rb"'MARKER'")
+
+# The fields of fixed MPS as 0-based [start, end) byte columns (type, name, row, value, row, value), and the
+# byte columns between them, which are blank
+_FIXED_TYPE = (1, 3)
+_FIXED_FIELDS = ((4, 12), (14, 22), (24, 36), (39, 47), (49, 61))
+_FIXED_GAPS = (0, 3, 12, 13, 22, 23, 36, 37, 38, 47, 48)
+
+# The values of the OBJSENSE section
+_OBJSENSE = {"MAX": 1, "MAXIMIZE": 1, "MIN": -1, "MINIMIZE": -1}
+
+# A block of complete lines of an .mps file, read from a stream (bytes) or a slice of a memory mapped file
+_Chunk = Union[bytes, memoryview]
+
+# Lookup table of the bytes a section header can start with
+_HEADER_START = np.zeros(256, dtype=bool)
+_HEADER_START[ord("A"):ord("Z") + 1] = True
+
+
+class _TypedBuffer:
+    """
+    A growable one dimensional NumPy array, used instead of a Python list to collect large amounts of numbers.
+    The capacity doubles every time it runs out, so appending n values costs O(n) amortized.
+    """
+
+    def __init__(self, dtype: Any, capacity: int = 1024) -> None:
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int) -> None:
+        # Grow the underlying array (at least doubling it) if `extra` more values do not fit
+        needed = self._size + extra
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            try:
+                # Grown in place by the allocator, large blocks without holding the old and the new copy at once.
+                # NumPy refuses if a view of the array is alive.
+                self._data.resize(capacity)
+            except ValueError:
+                grown = np.empty(capacity, dtype=self._data.dtype)
+                grown[:self._size] = self._data[:self._size]
+                self._data = grown
+
+    def extend(self, values: np.ndarray) -> None:
+        self._reserve(len(values))
+        self._data[self._size:self._size + len(values)] = values
+        self._size += len(values)
+
+    def extend_zeros(self, count: int) -> None:
+        self._reserve(count)
+        self._data[self._size:self._size + count] = 0
+        self._size += count
+
+    def consume(self, count: int) -> None:
+        # Remove the first `count` values, moving the rest to the front
+        self._data[:self._size - count] = self._data[count:self._size]
+        self._size -= count
+
+    def view(self) -> np.ndarray:
+        # A view (not a copy) of the values appended so far
+        return self._data[:self._size]
+
+    def release(self) -> np.ndarray:
+        # Hands the values over as an array of exactly their size and empties the buffer. The array is shrunk
+        # in place (without a copy when the allocator can shrink the block), so no view of it may be alive.
+        data = self._data
+        data.resize(self._size, refcheck=False)
+        self._data = np.empty(0, dtype=data.dtype)
+        self._size = 0
+        return data
+
+
+def _find_section_header(chunk: _Chunk) -> int:
+    """
+    Returns the offset of the first section header line in a block of complete lines, or -1 if there is none.
+    Only the lines that start with an uppercase letter are checked against the section names.
+    """
+    raw = np.frombuffer(chunk, dtype=np.uint8)
+    line_starts = np.concatenate(([0], np.flatnonzero(raw[:-1] == ord("\n")) + 1))
+    for start in line_starts[_HEADER_START[raw[line_starts]]].tolist():
+        if _SECTION_HEADER_RE.match(chunk, start):
+            return int(start)
+    return -1
+
+
+def _read_section_chunks(file: InputFile, chunk_size: int = COLUMNS_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Reads the data lines of the current section in blocks of about `chunk_size` bytes.
+
+    Every block ends on a line boundary. When the next section header is found the file is
+    rewound to the start of the header line, so the caller can keep reading line by line from there.
+
+    Parameters:
+    -----------
+    file : InputFile
+        A file opened in binary mode (see `compressed_io.open_input`), positioned right after a section header line.
+        It must be able to seek back over the last block read.
+    chunk_size : int
+        The approximate size (in bytes) of each block.
+
+    Yields:
+    -------
+    bytes
+        Blocks of complete data lines of the section.
+    """
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        if not chunk.endswith(b"\n"):
+            chunk += file.readline()  # Complete the last line of the block
+
+        header = _find_section_header(chunk)
+        if header >= 0:
+            # Rewind to the header line so that it is processed by the caller
+            file.seek(header - len(chunk), os.SEEK_CUR)
+            if header:
+                yield chunk[:header]
+            return
+        yield chunk
+
+
+class MpsSection(NamedTuple):
+    """
+    The location of a section in an .mps file, as found by `scan_mps_sections`.
+    """
+    header: str   # The header line of the section, e.g. "NAME          AFIRO"
+    start: int    # Offset of the first data line of the section (right after the header line)
+    end: int      # Offset right after the last data line of the section (the start of the next header)
+
+
+def scan_mps_sections(buffer: Union[bytes, mmap.mmap]) -> list[MpsSection]:
+    """
+    Finds the sections of an .mps file held in memory or memory mapped, without decoding its lines.
+
+    The buffer is scanned with NumPy in windows of `SCAN_WINDOW_SIZE` bytes for the lines that start
+    with an uppercase letter, which are then checked against the section names. The scan stops at ENDATA.
+
+    Parameters:
+    -----------
+    buffer : Union[bytes, mmap.mmap]
+        The content of the .mps file.
+
+    Returns:
+    --------
+    list[MpsSection]
+        The sections in the order they appear in the file, the last one being ENDATA (if present).
+    """
+    raw = np.frombuffer(buffer, dtype=np.uint8)  # A view, no copy is made
+    sections: list[MpsSection] = []
+
+    for window_start in range(0, len(raw), SCAN_WINDOW_SIZE):
+        window = raw[window_start:window_start + SCAN_WINDOW_SIZE]
+        line_starts = np.flatnonzero(window == ord("\n")) + window_start + 1
+        if window_start == 0:
+            line_starts = np.concatenate(([0], line_starts))
+        line_starts = line_starts[line_starts < len(raw)]
+
+        for start in line_starts[_HEADER_START[raw[line_starts]]].tolist():
+            if not _SECTION_HEADER_RE.match(buffer, start):
+                continue
+            line_end = buffer.find(b"\n", start)
+            data_start = len(raw) if line_end < 0 else line_end + 1
+            header = bytes(buffer[start:data_start]).decode()
+            if sections:
+                sections[-1] = sections[-1]._replace(end=start)  # The previous section ends here
+            sections.append(MpsSection(header, data_start, len(raw)))
+            if header.startswith("ENDATA"):
+                return sections
+
+    return sections
+
+
+def _iter_file_sections(file: InputFile) -> Generator[Tuple[str, Iterator[_Chunk]], None, None]:
+    """
+    Yields the header line and the blocks of data lines of every section of an .mps file read as a stream.
+    Blocks of a section that the caller does not read are skipped.
+    """
+    for raw_line in file:
+        line = raw_line.decode()
+
+        # Ignore comment lines (starting with '*') and empty lines
+        if line.startswith('*') or line.strip() == '':
+            continue
+
+        chunks = _read_section_chunks(file, COLUMNS_CHUNK_SIZE)
+        yield line, chunks
+        for _ in chunks:
+            pass
+
+
+def _iter_buffer_sections(buffer: mmap.mmap, sections: list[MpsSection]
+                          ) -> Generator[Tuple[str, Iterator[_Chunk]], None, None]:
+    """
+    Yields the header line and the blocks of data lines of every section (found by `scan_mps_sections`)
+    of a memory mapped .mps file. The blocks are slices of the map, so no data is copied.
+    """
+    for section in sections:
+        yield section.header, _iter_buffer_chunks(buffer, section.start, section.end)
+
+
+def _iter_buffer_chunks(buffer: mmap.mmap, start: int, end: int) -> Iterator[memoryview]:
+    # Split buffer[start:end] in blocks of about COLUMNS_CHUNK_SIZE bytes that end on a line boundary
+    with memoryview(buffer) as view:
+        while start < end:
+            stop = min(start + COLUMNS_CHUNK_SIZE, end)
+            if stop < end:
+                stop = buffer.find(b"\n", stop - 1, end) + 1 or end
+            yield view[start:stop]
+            start = stop
+
+
+def _iter_lines(chunks: Iterable[_Chunk]) -> Iterator[str]:
+    # The decoded data lines of a section, skipping comment lines (starting with '*') and empty lines
+    for chunk in chunks:
+        for line in bytes(chunk).decode().splitlines():
+            if not line.startswith('*') and line.strip() != '':
+                yield line
+
+
+def _gather_tokens(raw: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Copies the tokens `raw[starts[i]:ends[i]]` into a fixed width bytes array (NumPy dtype 'S'), without
+    creating a Python object per token.
+    """
+    lengths = ends - starts
+    width = max(int(lengths.max()), 1) if len(lengths) else 1
+    out = np.zeros((len(starts), width), dtype=np.uint8)
+    last = len(raw) - 1
+    for k in range(width):
+        # The k-th byte of every token, NUL padded past the end of the shorter tokens
+        out[:, k] = np.where(k < lengths, raw[np.minimum(starts + k, last)], 0)
+    return out.view(f"S{width}").ravel()
+
+
+class _Entries(NamedTuple):
+    """
+    The tokens of a block of `NAME  ROW  VALUE  [ROW  VALUE]` lines (COLUMNS, RHS and RANGES sections),
+    as returned by `_tokenize_entries` and `_tokenize_fixed_entries`.
+    """
+    line_names: np.ndarray     # The first field (column or set name) of every data line, as a bytes array
+    entry_lines: np.ndarray    # The line (index into line_names) each (ROW, VALUE) entry belongs to
+    entry_names: np.ndarray    # The row name of each entry, as a bytes array
+    entry_values: np.ndarray   # The value of each entry, as a float64 array
+    marker_lines: np.ndarray   # For every MARKER line, the index of the data line that follows it
+    marker_starts: np.ndarray  # For every MARKER line, True for 'INTORG' and False for 'INTEND'
+
+
+def _no_entries() -> _Entries:
+    return _Entries(np.empty(0, dtype="S1"), np.empty(0, dtype=np.int64), np.empty(0, dtype="S1"), np.empty(0),
+                    np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+
+
+def _marker_kinds(kinds: np.ndarray) -> np.ndarray:
+    # True for the 'INTORG' markers, False for the 'INTEND' ones
+    starts: np.ndarray = kinds == b"'INTORG'"
+    unknown = ~starts & (kinds != b"'INTEND'")
+    if np.any(unknown):
+        raise ValueError(f"Unknown MARKER {kinds[unknown][0].decode()}")
+    return starts
+
+
+def _tokenize_entries(chunk: _Chunk) -> _Entries:
+    """
+    Tokenizes a block of free MPS `NAME  ROW  VALUE  [ROW  VALUE]` lines (as found in the COLUMNS section) in one go.
+
+    The token boundaries and the line each token belongs to are found with NumPy on the raw bytes,
+    so no Python work is done per line or per entry. Integer MARKER lines (`NAME  'MARKER'  'INTORG'`) are
+    taken out of the data lines and returned apart.
+
+    Parameters:
+    -----------
+    chunk : _Chunk
+        Complete data lines of the section, as bytes or as a slice of a memory mapped file.
+
+    Returns:
+    --------
+    _Entries
+        The name of every line and the row names and values of the entries, see `_Entries`.
+
+    Raises:
+    -------
+    ValueError
+        If a row name is not followed by a value, a value is not a number or a MARKER is unknown.
+    """
+    # A token starts at a non-whitespace byte preceded by whitespace (space, tab, newline or another control
+    # character) and ends before the next whitespace
+    raw = np.frombuffer(chunk, dtype=np.uint8)
+    is_space = np.empty(len(raw) + 2, dtype=bool)
+    is_space[0] = is_space[-1] = True
+    np.less_equal(raw, ord(" "), out=is_space[1:-1])
+    is_token = ~is_space[1:-1]
+    token_starts = np.flatnonzero(is_token & is_space[:-2])
+    token_ends = np.flatnonzero(is_token & is_space[2:]) + 1
+    if len(token_starts) == 0:
+        return _no_entries()
+
+    # Merge the newlines and the token starts in byte order, a token is the first of its line
+    # when it comes right after a newline (or at the start of the block)
+    events = np.zeros(len(raw), dtype=np.int8)
+    events[raw == ord("\n")] = 1
+    events[token_starts] = 2
+    events = events[np.flatnonzero(events)]
+    first_in_line = np.concatenate(([True], events[:-1] == 1))[events == 2]
+
+    # Drop the tokens of the comment lines (lines starting with '*')
+    line_token_starts = token_starts[first_in_line]
+    if np.any(raw[line_token_starts] == ord("*")):
+        at_line_start = (line_token_starts == 0) | (raw[np.maximum(line_token_starts - 1, 0)] == ord("\n"))
+        is_comment = (raw[line_token_starts] == ord("*")) & at_line_start
+        keep = ~is_comment[np.cumsum(first_in_line) - 1]
+        token_starts, token_ends, first_in_line = token_starts[keep], token_ends[keep], first_in_line[keep]
+        if len(token_starts) == 0:
+            return _no_entries()
+
+    line_starts = np.flatnonzero(first_in_line)
+    token_line = np.cumsum(first_in_line) - 1
+
+    # Position of every token in its line: 0 is the column name, odd positions are row names, even are values
+    position = np.arange(len(token_starts)) - line_starts[token_line]
+    name_mask = (position % 2) == 1
+    value_mask = ((position % 2) == 0) & (position > 0)
+    if np.count_nonzero(name_mask) != np.count_nonzero(value_mask):
+        raise ValueError("Malformed line in the COLUMNS section: a row name is not followed by a value")
+
+    line_names = _gather_tokens(raw, token_starts[line_starts], token_ends[line_starts])
+    entry_lines = token_line[name_mask]
+    entry_names = _gather_tokens(raw, token_starts[name_mask], token_ends[name_mask])
+    value_tokens = _gather_tokens(raw, token_starts[value_mask], token_ends[value_mask])
+    if _MARKER_RE.search(chunk) is None:
+        return _Entries(line_names, entry_lines, entry_names, value_tokens.astype(np.float64),
+                        np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+
+    # The MARKER lines are dropped, the data lines are renumbered without them
+    is_marker = entry_names == b"'MARKER'"
+    marker_starts = _marker_kinds(value_tokens[is_marker])
+    is_data_line = np.ones(len(line_names), dtype=bool)
+    is_data_line[entry_lines[is_marker]] = False
+    data_lines_before = np.cumsum(is_data_line) - is_data_line  # Data lines before each line
+    keep = is_data_line[entry_lines]
+    return _Entries(line_names[is_data_line], data_lines_before[entry_lines[keep]], entry_names[keep],
+                    value_tokens[keep].astype(np.float64), data_lines_before[entry_lines[is_marker]], marker_starts)
+
+
+def _line_bounds(raw: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # The start and end (without the line end) of the data lines of a block, skipping blank and comment lines
+    newlines = np.flatnonzero(raw == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(raw)]))
+    ends -= (ends > starts) & (raw[np.maximum(ends - 1, 0)] == ord("\r"))
+    printable = np.concatenate(([0], np.cumsum(raw > ord(" "))))
+    data = (printable[ends] > printable[starts]) & (raw[np.minimum(starts, len(raw) - 1)] != ord("*"))
+    return starts[data], ends[data]
+
+
+def _marker_line_indices(chunk: _Chunk, starts: np.ndarray) -> np.ndarray:
+    # The lines (indices into `starts`) holding a 'MARKER' token
+    positions = [match.start() for match in _MARKER_RE.finditer(chunk)]
+    return np.unique(np.searchsorted(starts, positions, side="right") - 1) if positions else np.empty(0, dtype=np.int64)
+
+
+def _is_fixed_layout(chunk: _Chunk) -> bool:
+    """
+    Whether every data line of a block (MARKER lines aside) leaves blank the columns between the fields of
+    fixed MPS, so that it can be read with `_tokenize_fixed_entries`.
+    """
+    raw = np.frombuffer(chunk, dtype=np.uint8)
+    starts, ends = _line_bounds(raw)
+    data = np.ones(len(starts), dtype=bool)
+    data[_marker_line_indices(chunk, starts)] = False
+    starts, ends = starts[data], ends[data]
+    for gap in _FIXED_GAPS:
+        positions = starts + gap
+        if np.any(raw[positions[positions < ends]] != ord(" ")):
+            return False
+    return True
+
+
+def _fixed_field(raw: np.ndarray, starts: np.ndarray, ends: np.ndarray, field: Tuple[int, int]) -> np.ndarray:
+    # The field at the byte columns [field[0], field[1]) of every line, without the blanks around it
+    return np.char.strip(_gather_tokens(raw, np.minimum(starts + field[0], ends), np.minimum(starts + field[1], ends)))
+
+
+def _interleave(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    # [first[0], second[0], first[1], second[1], ...] for two bytes arrays of any widths
+    out = np.empty(2 * len(first), dtype=f"S{max(first.itemsize, second.itemsize)}")
+    out[0::2], out[1::2] = first, second
+    return out
+
+
+def _tokenize_fixed_entries(chunk: _Chunk) -> _Entries:
+    """
+    Tokenizes a block of fixed MPS lines: the fields are read at their byte columns (5-12 for the name, 15-22 and
+    40-47 for the row names, 25-36 and 50-61 for the values), so names may contain spaces. Returns the same
+    `_Entries` as `_tokenize_entries`, the MARKER lines are recognized by their tokens wherever they are.
+
+    Raises:
+    -------
+    ValueError
+        If a row name is not followed by a value, a value is not a number or a MARKER is unknown.
+    """
+    raw = np.frombuffer(chunk, dtype=np.uint8)
+    starts, ends = _line_bounds(raw)
+    if len(starts) == 0:
+        return _no_entries()
+
+    # The MARKER lines are few, they are split in Python
+    is_data_line = np.ones(len(starts), dtype=bool)
+    markers = _marker_line_indices(chunk, starts)
+    is_data_line[markers] = False
+    kinds = [bytes(raw[starts[line]:ends[line]]).split() for line in markers.tolist()]
+    if any(len(tokens) < 3 or tokens[1] != b"'MARKER'" for tokens in kinds):
+        raise ValueError("Malformed MARKER line")
+    marker_starts = _marker_kinds(np.array([tokens[2] for tokens in kinds], dtype="S8"))
+    marker_lines = (np.cumsum(is_data_line) - is_data_line)[markers]
+    starts, ends = starts[is_data_line], ends[is_data_line]
+
+    # Both (row, value) pairs of every line, in line order, keeping the ones with a row name
+    line_names, row1, value1, row2, value2 = (_fixed_field(raw, starts, ends, field) for field in _FIXED_FIELDS)
+    names, values = _interleave(row1, row2), _interleave(value1, value2)
+    present = names != b""
+    entry_lines = np.repeat(np.arange(len(starts)), 2)[present]
+    try:
+        entry_values = values[present].astype(np.float64)
+    except ValueError:
+        raise ValueError("Malformed line in fixed MPS: a row name is not followed by a number") from None
+    return _Entries(line_names, entry_lines, names[present], entry_values, marker_lines, marker_starts)
+
+
+def _tokenize_lookup(chunk: _Chunk, mps_format: str, row_table: NameTable) -> Tuple[_Entries, np.ndarray]:
+    """
+    Tokenizes a block of entry lines in `mps_format` (one of `MPS_FORMATS`) and looks up the row of every entry
+    in `row_table`. In "auto" format the block is read as free MPS and, if that fails (a malformed line or an
+    unknown row, as when names contain spaces) and its lines fit the fixed columns, as fixed MPS.
+
+    Raises:
+    -------
+    KeyError:
+        If an entry references a row that is not in `row_table`.
+    ValueError:
+        If a line is malformed.
+    """
+    if mps_format != "fixed":
+        try:
+            entries = _tokenize_entries(chunk)
+            return entries, lookup_names(row_table, entries.entry_names)
+        except (ValueError, KeyError):
+            if mps_format == "free" or not _is_fixed_layout(chunk):
+                raise
+    entries = _tokenize_fixed_entries(chunk)
+    return entries, lookup_names(row_table, entries.entry_names)
+
+
+def _row_name_table(row_names: NamePool, objective_fun: str) -> NameTable:
+    # Sorted table of the row names, the objective function row is mapped to -1
+    return build_name_table(np.append(row_names.to_bytes_array(), objective_fun.encode()),
+                            np.append(np.arange(len(row_names)), -1))
+
+
+def _line_column_name(buffer: Union[bytes, mmap.mmap], start: int, end: int) -> Tuple[bytes, int]:
+    # The first token of the line starting at `start` (empty for comment and empty lines) and the start of the next line
+    stop = buffer.find(b"\n", start, end) + 1 or end
+    tokens = bytes(buffer[start:stop]).split(None, 1)
+    if not tokens or tokens[0].startswith(b"*"):
+        return b"", stop
+    return tokens[0], stop
+
+
+def _split_columns_range(buffer: Union[bytes, mmap.mmap], start: int, end: int, parts: int) -> list[Tuple[int, int]]:
+    """
+    Splits the byte range [start, end) of a COLUMNS section in about `parts` ranges of similar size.
+    The ranges start at column name transitions, so that no column is split across two ranges.
+    """
+    bounds = [start]
+    for k in range(1, parts):
+        # Move to the first line starting at or after the even split point
+        position = buffer.find(b"\n", start + (end - start) * k // parts - 1, end) + 1 or end
+
+        # Skip the lines of the column found there, the next column starts a new range
+        first_name = b""
+        while position < end:
+            name, next_position = _line_column_name(buffer, position, end)
+            if name and first_name and name != first_name:
+                break
+            first_name = first_name or name
+            position = next_position
+
+        if bounds[-1] < position < end:
+            bounds.append(position)
+    bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# State of the worker processes of the parallel COLUMNS parser, set by `_init_columns_worker`
+_worker_state: dict[str, Any] = {}
+
+
+def _init_columns_worker(input_file_path: str, row_names: NamePool, objective_fun: str, mps_format: str) -> None:
+    # Runs once in every worker process, so the row names are sent to each worker only once
+    _worker_state["input_file_path"] = input_file_path
+    _worker_state["row_names"] = row_names
+    _worker_state["objective_fun"] = objective_fun
+    _worker_state["mps_format"] = mps_format
+
+
+def _parse_columns_range(byte_range: Tuple[int, int]) -> Tuple[Optional["ColumnBlock"], int]:
+    """
+    Parses the columns in a byte range of the COLUMNS section, in a worker process.
+    Returns them as a single block whose `first_column` is 0 (the caller renumbers the columns), and the
+    integer state at the end of the range. The integrality of the columns before the first MARKER of the range
+    depends on the ranges before it, they are -1 (see `_ColumnsParser`).
+    """
+    parser = _ColumnsParser(_worker_state["row_names"], _worker_state["objective_fun"], _worker_state["mps_format"],
+                            integer_state=-1)
+    with open(_worker_state["input_file_path"], 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for chunk in _iter_buffer_chunks(buffer, *byte_range):
+                parser.feed(chunk)
+                del chunk  # Release the view of the map before it is closed
+    blocks = parser.pop_blocks(sys.maxsize, final=True)
+    return (blocks[0] if blocks else None), parser.integer_state
+
+
+def _counted_chunks(chunks: Iterator[_Chunk], section: SectionStats) -> Iterator[_Chunk]:
+    # Passes the blocks of lines of a section through, counting their lines and bytes
+    for chunk in chunks:
+        section.count_lines(chunk)
+        yield chunk
+
+
+def _block_nbytes(block: "ColumnBlock") -> int:
+    # Size of the arrays of a block of columns
+    return int(block.A.data.nbytes + block.A.indices.nbytes + block.A.indptr.nbytes + block.c.nbytes)
+
+
+class ColumnBlock(NamedTuple):
+    """
+    A block of consecutive columns of the constraint matrix `A`, as yielded by `iter_column_blocks`.
+    """
+    first_column: int      # Index of the first column of the block in `A`
+    A: sparse.csc_array    # The columns of `A` (with all the rows of `A`) in CSC format
+    c: np.ndarray          # The objective function coefficients of the columns
+    names: NamePool        # The names of the columns
+    integer: np.ndarray    # True for the columns between MARKER 'INTORG' and 'INTEND' lines (bool)
+    has_cost: np.ndarray   # True for the columns with an entry in the objective function row (bool)
+
+
+class _ColumnsParser:
+    """
+    Parses the COLUMNS section of an .mps file, a block of lines at a time.
+
+    Each block of lines is tokenized with `_tokenize_lookup` (in `mps_format`), row names are mapped to row indices
+    with a sorted name table, and the non-zero values are written straight into typed NumPy buffers. The buffers
+    only hold the columns that have not been handed out by `pop_blocks` yet.
+
+    The columns between MARKER 'INTORG' and 'INTEND' lines are integer. `integer_state` is whether the section
+    is in an integer block where the parser starts: 1 or 0, or -1 if it is unknown (a worker parsing a range of
+    the section), which leaves the columns before the first MARKER at -1 for the caller to resolve.
+    """
+
+    def __init__(self, row_names: NamePool, objective_fun: str, mps_format: str = "auto", integer_state: int = 0) -> None:
+        self.num_rows = len(row_names)
+        self.first_column = 0                     # Index of the first pending column in A
+        self.mps_format = mps_format
+        self.integer_state = integer_state        # 1 / 0 inside / outside an integer block, -1 unknown
+
+        # Pending columns (not handed out yet)
+        self._values = _TypedBuffer(np.float64)   # Non-zero values of A
+        self._rows = _TypedBuffer(np.int64)       # Row indices of the non-zero values of A
+        self._col_counts = _TypedBuffer(np.int64) # Number of non-zero values in each column
+        self._c = _TypedBuffer(np.float64)        # Objective function coefficients
+        self._has_cost = _TypedBuffer(np.bool_)   # Whether the columns have an objective function entry
+        self._integer = _TypedBuffer(np.int8)     # Integrality of the columns (1, 0 or -1, see integer_state)
+        self._names: list[bytes] = []             # Column names, still encoded
+        self._last_column_name = b""              # The column of the last line of the previous block
+
+        # Sorted table of the row names, the objective function row is mapped to -1
+        self._row_table = _row_name_table(row_names, objective_fun)
+
+    def feed(self, chunk: _Chunk) -> None:
+        """
+        Parses a block of complete data lines of the COLUMNS section.
+
+        Raises:
+        -------
+        KeyError:
+            If an entry references a row that is not declared in the ROWS section.
+        ValueError:
+            If a line is malformed.
+        """
+        # Map the row names to row indices (-1 marks the objective function)
+        (line_names, entry_line, _, entry_values, marker_lines, marker_starts), entry_rows = \
+            _tokenize_lookup(chunk, self.mps_format, self._row_table)
+
+        # The integrality of every line: the state set by the last MARKER before it
+        states = np.concatenate(([self.integer_state], marker_starts.astype(np.int8)))
+        self.integer_state = int(states[-1])
+        if len(line_names) == 0:
+            return
+        line_integer = states[np.searchsorted(marker_lines, np.arange(len(line_names)), side="right")]
+
+        # A new column starts wherever the column name differs from the one of the previous line
+        new_column = np.empty(len(line_names), dtype=bool)
+        new_column[0] = line_names[0] != self._last_column_name
+        new_column[1:] = line_names[1:] != line_names[:-1]
+        line_column = len(self._names) - 1 + np.cumsum(new_column)  # Index among the pending columns
+
+        new_names = line_names[new_column].tolist()
+        self._names.extend(new_names)
+        self._col_counts.extend_zeros(len(new_names))
+        self._c.extend_zeros(len(new_names))
+        self._has_cost.extend_zeros(len(new_names))
+        self._integer.extend(line_integer[new_column])
+        self._last_column_name = line_names[-1]
+        entry_column = line_column[entry_line]
+
+        # Add the matrix elements and count them per column
+        in_A = entry_rows >= 0
+        self._values.extend(entry_values[in_A])
+        self._rows.extend(entry_rows[in_A])
+        counts = np.bincount(entry_column[in_A] - line_column[0])
+        self._col_counts.view()[line_column[0]:line_column[0] + len(counts)] += counts
+
+        # Update the objective function coefficients
+        self._c.view()[entry_column[~in_A]] = entry_values[~in_A]
+        self._has_cost.view()[entry_column[~in_A]] = True
+
+    def pop_blocks(self, block_size: int, final: bool = False) -> list[ColumnBlock]:
+        """
+        Hands out the pending columns in blocks of `block_size` columns.
+
+        The last pending column may continue in the next block of lines, so it is kept unless `final` is True,
+        in which case all the pending columns are handed out (the last block may then be smaller).
+        """
+        complete = len(self._names) if final else max(len(self._names) - 1, 0)
+        num_columns = complete if final else complete - complete % block_size
+        if num_columns == 0:
+            return []
+
+        indptr = np.zeros(num_columns + 1, dtype=np.int64)
+        np.cumsum(self._col_counts.view()[:num_columns], out=indptr[1:])
+        values, rows, c, integer = self._values.view(), self._rows.view(), self._c.view(), self._integer.view()
+        has_cost = self._has_cost.view()
+
+        blocks = []
+        for start in range(0, num_columns, block_size):
+            stop = min(start + block_size, num_columns)
+            first, last = indptr[start], indptr[stop]
+            A_block = sparse.csc_array((values[first:last].copy(), rows[first:last].copy(), indptr[start:stop + 1] - first),
+                                       shape=(self.num_rows, stop - start))
+            blocks.append(ColumnBlock(self.first_column + start, A_block, c[start:stop].copy(),
+                                      NamePool.from_bytes(self._names[start:stop]), integer[start:stop].copy(),
+                                      has_cost[start:stop].copy()))
+
+        # Drop the handed out columns from the pending buffers
+        self._values.consume(int(indptr[-1]))
+        self._rows.consume(int(indptr[-1]))
+        self._col_counts.consume(num_columns)
+        self._c.consume(num_columns)
+        self._has_cost.consume(num_columns)
+        self._integer.consume(num_columns)
+        del self._names[:num_columns]
+        self.first_column += num_columns
+
+        return blocks
+
+
+class MpsStream:
+    """
+    Reads an .mps file as a stream, handing out the constraint matrix `A` in blocks of columns.
+
+    Opening the stream parses the sections before COLUMNS (NAME and ROWS), so `MinMax`, `Eqin` and the
+    row names are available right away. `column_blocks` then yields the columns of `A` (and their slice of `c`)
+    while the COLUMNS section is being read, so only about one block of columns is held in memory at a time.
+    Finally `finish` parses the sections after COLUMNS (RHS, RANGES and BOUNDS).
+
+    Example:
+    --------
+    >>> with MpsStream("model.mps", block_size=1000) as stream:
+    ...     for block in stream.column_blocks():
+    ...         process(block.A, block.c)
+    ...     stream.finish()
+    ...     b, Bounds = stream.b, stream.Bounds
+    """
+
+    def __init__(self, input_file_path: str, block_size: int = BLOCK_COLUMNS, use_mmap: bool = False,
+                 workers: int = 1, stats: Optional[ParseStats] = None, mps_format: str = "auto") -> None:
+        """
+        Parameters:
+        -----------
+        input_file_path : str
+            The path to the .mps file to be parsed.
+        block_size : int
+            The number of columns of each block (the last block may be smaller).
+        use_mmap : bool
+            If True the file is memory mapped instead of read as a stream (see `parse_mps_file`).
+            Ignored for a compressed file.
+        workers : int
+            The number of processes that parse the COLUMNS section (see `parse_mps_file`). With more than one
+            worker the file is memory mapped and each block holds the columns parsed by one worker,
+            so the blocks do not have `block_size` columns. Ignored for a compressed file.
+        stats : Optional[ParseStats]
+            Collects the time, lines, non-zeros and output size of every section as it is parsed (see `parse_stats`).
+            None skips all the measurements.
+        mps_format : str
+            The layout of the data lines (one of `MPS_FORMATS`, see `parse_mps_file`).
+
+        Raises:
+        -------
+        ValueError:
+            If `mps_format` is unknown.
+        """
+        if mps_format not in MPS_FORMATS:
+            raise ValueError(f"Unknown MPS format {mps_format!r}, expected one of {MPS_FORMATS}")
+        self.input_file_path = input_file_path
+        self.block_size = block_size
+        self.workers = workers
+        self.stats = stats
+        self.mps_format = mps_format
+
+        # Problem data, filled in as the sections are parsed
+        self.problem_name: str = ""
+        self.MinMax: int = -1                # Default is minimization (-1), can be updated for maximization
+        self.objective_fun: str = ""         # Name of the objective function
+        self.Eqin: list[int] = []            # Stores equality type for each constraint (<=, =, >=)
+        self.row_names = NamePool()          # The names of the constraint rows, in order
+        self._col_name_parts: list[NamePool] = []  # The names of the columns of each block (see col_names)
+        self._integer_parts: list[np.ndarray] = []  # The integrality of the columns of each block (see integrality)
+        self._row_table = _row_name_table(self.row_names, "")  # The rows by name, for the RHS and RANGES sections
+        self.num_columns: int = 0            # Number of columns handed out so far
+        self.b: np.ndarray = np.zeros(0)     # The right-hand side vector b, the first RHS set (filled by finish)
+        self.b_sets = sparse.csc_array((0, 0))  # Every RHS set, one per column (filled by finish)
+        self.rhs_names = NamePool()          # The names of the RHS sets, in the order of the columns of b_sets
+        self.ranges: np.ndarray = np.zeros(0)  # The RANGES value of every row, NaN without one (filled by finish)
+        self.obj_constant: float = 0.0       # The constant of the objective function (minus its RHS value)
+        self.Bounds = BoundsArray()          # Variable bounds extracted from the BOUNDS section (filled by finish)
+
+        # A compressed file is decompressed by a background thread and always read as a stream
+        file = self._file = open_input(input_file_path)
+        self.compressed = isinstance(file, DecompressingReader)
+        self._buffer: Optional[mmap.mmap] = None
+        self._columns_range = (0, 0)  # Byte range of the COLUMNS section (memory mapped files only)
+        if (use_mmap or workers > 1) and not isinstance(file, DecompressingReader):
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._section_list = scan_mps_sections(self._buffer)
+            self._sections = _iter_buffer_sections(self._buffer, self._section_list)
+        else:
+            self._sections = _iter_file_sections(self._file)
+        self._columns_chunks: Iterator[_Chunk] = iter(())
+        self._columns_done = False
+        self._finished = False
+
+        try:
+            self._parse_until_columns()
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def col_names(self) -> NamePool:
+        # The names of the columns handed out so far, in order (all of them once finish has run)
+        if len(self._col_name_parts) != 1:
+            self._col_name_parts = [NamePool.concatenate(self._col_name_parts)]
+        return self._col_name_parts[0]
+
+    @property
+    def integrality(self) -> np.ndarray:
+        # Whether each column handed out so far lies between MARKER INTORG and INTEND lines (bool array)
+        if len(self._integer_parts) != 1:
+            self._integer_parts = [np.concatenate(self._integer_parts) if self._integer_parts
+                                   else np.zeros(0, dtype=bool)]
+        return self._integer_parts[0]
+
+    @property
+    def columns_size_hint(self) -> int:
+        # Size (in bytes) of the COLUMNS section: exact for a memory mapped file, otherwise the size of the
+        # rest of the file (an upper bound, up to a block already read). For a compressed file, the size of the
+        # compressed file (a lower bound, typically by a factor of 5 to 10)
+        if self._buffer is not None:
+            start, end = self._columns_range
+            return end - start
+        if isinstance(self._file, DecompressingReader):
+            return os.path.getsize(self.input_file_path)
+        return max(os.fstat(self._file.fileno()).st_size - self._file.tell(), 0)
+
+    @property
+    def Restrains_names(self) -> dict[str, int]:
+        # Maps row names to row indices (built on demand, the names are kept in `row_names`)
+        return self.row_names.to_dict()
+
+    @property
+    def A_cols_names(self) -> dict[str, int]:
+        # Maps column names to column indices (built on demand, the names are kept in `col_names`)
+        return self.col_names.to_dict()
+
+    def __enter__(self) -> "MpsStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the file. Called automatically when the stream is used as a context manager.
+        """
+        self._sections.close()
+        if self._buffer is not None:
+            # Views of the map kept alive by a traceback would make closing fail, the map is
+            # then released when they are garbage collected
+            with suppress(BufferError):
+                self._buffer.close()
+        self._file.close()
+
+    def _parse_until_columns(self) -> None:
+        # Parse the sections before COLUMNS and stop with the COLUMNS data blocks ready to be read
+        for line, chunks in self._sections:
+            if line.startswith("COLUMNS"):
+                self._columns_chunks = chunks
+                if self._buffer is not None:
+                    section = next(section for section in self._section_list if section.header == line)
+                    self._columns_range = (section.start, section.end)
+                return
+            if not self._parse_section(line, chunks):
+                break
+        self._columns_done = True  # There is no COLUMNS section
+
+    def column_blocks(self) -> Iterator[ColumnBlock]:
+        """
+        Parses the COLUMNS section, yielding the columns of `A` in blocks of `block_size` columns.
+
+        Yields:
+        -------
+        ColumnBlock
+            The next block of columns, with its slice of the objective function coefficients `c`.
+
+        Raises:
+        -------
+        KeyError:
+            If an entry references a row that is not declared in the ROWS section.
+        """
+        if self._columns_done:
+            return
+        self._columns_done = True
+        if self.stats is None:
+            yield from self._column_blocks()
+            return
+
+        # Measured: the time spent by the caller on each block is not counted
+        section = self.stats.begin("COLUMNS")
+        try:
+            for block in self._column_blocks(section):
+                section.nonzeros += block.A.nnz
+                section.nbytes += _block_nbytes(block)
+                section.stop()
+                try:
+                    yield block
+                finally:
+                    section.start()
+        finally:
+            self.stats.end(section)
+
+    def _column_blocks(self, section: Optional[SectionStats] = None) -> Iterator[ColumnBlock]:
+        # Parses the COLUMNS section (see `column_blocks`), counting its lines and bytes in `section` if given
+        start, end = self._columns_range
+        if self.workers > 1 and end - start >= PARALLEL_MIN_BYTES:
+            yield from self._parallel_column_blocks(section)
+            return
+
+        chunks = self._columns_chunks if section is None else _counted_chunks(self._columns_chunks, section)
+        parser = _ColumnsParser(self.row_names, self.objective_fun, self.mps_format)
+        for chunk in chunks:
+            parser.feed(chunk)
+            for block in parser.pop_blocks(self.block_size):
+                block = block._replace(integer=block.integer.astype(bool))
+                self._add_block_names(block)
+                yield block
+        for block in parser.pop_blocks(self.block_size, final=True):
+            block = block._replace(integer=block.integer.astype(bool))
+            self._add_block_names(block)
+            yield block
+
+    def skip_columns(self, col_names: NamePool, integrality: Optional[np.ndarray] = None) -> None:
+        """
+        Skips the COLUMNS section without parsing it, taking the names of its columns (and their integrality,
+        all False if None) from an earlier parse of the same section (see `mps_cache.parse_incremental`). `finish` then only parses the sections
+        after COLUMNS. With a memory mapped file the skipped section is not even read.
+
+        Raises:
+        -------
+        ValueError:
+            If columns have already been read through `column_blocks`.
+        """
+        if self.num_columns:
+            raise ValueError("The COLUMNS section has already been read")
+        self._columns_done = True
+        self._col_name_parts = [col_names]
+        self._integer_parts = [np.zeros(len(col_names), dtype=bool) if integrality is None
+                               else np.asarray(integrality, dtype=bool)]
+        self.num_columns = len(col_names)
+
+    def _add_block_names(self, block: ColumnBlock) -> None:
+        self._col_name_parts.append(block.names)
+        self._integer_parts.append(block.integer)
+        self.num_columns = block.first_column + len(block.names)
+
+    def _parallel_column_blocks(self, section: Optional[SectionStats] = None) -> Iterator[ColumnBlock]:
+        # Split the COLUMNS section at column name transitions and parse the ranges in a process pool
+        assert self._buffer is not None
+        ranges = _split_columns_range(self._buffer, *self._columns_range, self.workers)
+        if section is not None:
+            # The workers read the section, its lines are counted here (the CPU time of the workers is not included)
+            start, end = self._columns_range
+            data = np.frombuffer(self._buffer, dtype=np.uint8, count=end - start, offset=start)
+            section.lines += int(np.count_nonzero(data == ord("\n")))
+            section.bytes_read += end - start
+            del data  # Release the view of the map
+        integer_state = 0
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges)), initializer=_init_columns_worker,
+                                 initargs=(self.input_file_path, self.row_names, self.objective_fun,
+                                           self.mps_format)) as pool:
+            # The results come back in the order of the ranges, the columns are numbered accordingly and
+            # the integrality left unknown by a worker is the state at the end of the ranges before it
+            for block, end_state in pool.map(_parse_columns_range, ranges):
+                if block is not None:
+                    integer = np.where(block.integer < 0, integer_state, block.integer).astype(bool)
+                    block = block._replace(first_column=self.num_columns, integer=integer)
+                    self._add_block_names(block)
+                    yield block
+                if end_state >= 0:
+                    integer_state = end_state
+
+    def finish(self) -> None:
+        """
+        Parses the sections after COLUMNS (RHS, RANGES and BOUNDS) and stores them in `b`, `b_sets`, `rhs_names`,
+        `obj_constant`, `ranges` and `Bounds`. Any columns that have not been read through `column_blocks` yet are
+        parsed and skipped.
+        """
+        if self._finished:
+            return
+        self._finished = True
+
+        for _ in self.column_blocks():
+            pass
+
+        for line, chunks in self._sections:
+            if not self._parse_section(line, chunks):
+                break
+
+        num_rows = len(self.row_names)
+        if self.b_sets.shape[0] != num_rows:
+            self.b_sets = sparse.csc_array((num_rows, 0))  # There is no RHS section, all the right-hand sides are 0
+        if len(self.b) != num_rows:
+            self.b = np.zeros(num_rows)
+        if len(self.ranges) != num_rows:
+            self.ranges = np.full(num_rows, np.nan)  # There is no RANGES section
+
+    def _parse_section(self, line: str, chunks: Iterator[_Chunk]) -> bool:
+        """
+        Parses a section (other than COLUMNS) given its header line and its blocks of data lines.
+        Returns False once ENDATA is reached.
+        """
+        if self.stats is None or line.startswith("ENDATA"):
+            return self._parse_section_data(line, chunks)
+
+        section = self.stats.begin(line.split()[0])
+        counted = _counted_chunks(chunks, section)
+        try:
+            more = self._parse_section_data(line, counted)
+            for _ in counted:
+                pass  # The lines of an ignored section are counted too
+            return more
+        finally:
+            section.nbytes = self._section_nbytes(section.name)
+            self.stats.end(section)
+
+    def _section_nbytes(self, name: str) -> int:
+        # Size of the arrays a section (other than COLUMNS) is parsed into
+        if name == "ROWS":
+            return self.row_names.nbytes + 8 * len(self.Eqin)
+        if name == "OBJSENSE":
+            return 8
+        if name == "RHS":
+            return int(self.b.nbytes + self.b_sets.data.nbytes + self.b_sets.indices.nbytes + self.b_sets.indptr.nbytes)
+        if name == "RANGES":
+            return int(self.ranges.nbytes)
+        if name == "BOUNDS":
+            return self.Bounds.nbytes
+        return 0
+
+    def _parse_section_data(self, line: str, chunks: Iterator[_Chunk]) -> bool:
+        # Check which section the header line starts
+        if line.startswith("NAME"):
+            # NAME section: Get the problem name (the rest of the line, it may contain spaces in fixed MPS) and
+            # infer if it's a maximization problem from a trailing "(MAX)"
+            self.problem_name = line[4:].strip()
+            if self.problem_name.upper().endswith("(MAX)"):
+                self.MinMax = 1
+                self.problem_name = self.problem_name[:-5].rstrip()
+        elif line.startswith("OBJSENSE"):
+            self._parse_objsense(line, chunks)
+        elif line.startswith("ROWS"):
+            self._parse_rows(chunks)
+        elif line.startswith("RHS"):
+            self._parse_rhs(chunks)
+        elif line.startswith("RANGES"):
+            self.ranges = np.full(len(self.row_names), np.nan)  # NaN marks the rows without a range
+            self._parse_ranges(chunks)
+        elif line.startswith("BOUNDS"):
+            self._parse_bounds(chunks)
+        elif line.startswith("ENDATA"):
+            return False  # End of file marker, stop processing
+        # The data of any unknown section is ignored
+        return True
+
+    def _parse_objsense(self, line: str, chunks: Iterator[_Chunk]) -> None:
+        # OBJSENSE section: MAX / MIN (or MAXIMIZE / MINIMIZE), on the header line (free MPS) or on a data line
+        for token in line.split()[1:] + [token for data in _iter_lines(chunks) for token in data.split()]:
+            try:
+                self.MinMax = _OBJSENSE[token.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown OBJSENSE {token!r}") from None
+
+    def _parse_rows(self, chunks: Iterator[_Chunk]) -> None:
+        # ROWS section: Determine the equality type and set up constraint row mapping
+        # Helper dictionary to convert 'L', 'E', 'G' in ROWS section to numerical values
+        convert_dict = {"L": -1, "E": 0, "G": 1}
+        row_names: list[str] = []
+        for line in _iter_lines(chunks):
+            a = line.split()
+            if self.mps_format == "fixed" or (self.mps_format == "auto" and len(a) > 2):
+                # Fixed MPS: the type is in columns 2-3 and the name in columns 5-12, it may contain spaces
+                a = [line[_FIXED_TYPE[0]:_FIXED_TYPE[1]].strip(), line[_FIXED_FIELDS[0][0]:_FIXED_FIELDS[0][1]].strip()]
+            try:
+                # Add the equality type (L/E/G) and collect the row names (their position is the row index)
+                self.Eqin.append( convert_dict[a[0]] ) 
+                row_names.append(a[1])
+            except KeyError as e :
+                #  EAFP (Easier to Ask for Forgiveness than Permission)
+                if str(e) == "'N'": # 'N' indicates the objective function row
+                    self.objective_fun = a[1]
+                else:
+                    raise   # Re-raise any unexpected KeyErrors
+        self.row_names = NamePool.from_names(row_names)
+        self._row_table = _row_name_table(self.row_names, self.objective_fun)
+
+    def _parse_rhs(self, chunks: Iterator[_Chunk]) -> None:
+        # RHS section: Every RHS set (the first token of the lines) is a column of `b_sets`, numbered in the order
+        # the sets first appear, and `b` is the first one. The lines have the layout of the COLUMNS lines
+        # (`RHS_NAME  ROW  VALUE  [ROW  VALUE]`), so each block is tokenized at once and its row names are
+        # looked up together (a KeyError is raised for an unknown row). A value of the objective
+        # row is minus the objective constant (only the one of the first set is kept).
+        set_numbers: dict[bytes, int] = {}
+        rows, sets, values = _TypedBuffer(np.int64), _TypedBuffer(np.int64), _TypedBuffer(np.float64)
+        for chunk in chunks:
+            entries, entry_rows = _tokenize_lookup(chunk, self.mps_format, self._row_table)
+            if not len(entries.line_names):
+                continue
+            distinct, first_line, line_sets = np.unique(entries.line_names, return_index=True, return_inverse=True)
+            numbers = np.empty(len(distinct), dtype=np.int64)
+            for k in np.argsort(first_line).tolist():
+                numbers[k] = set_numbers.setdefault(bytes(distinct[k]), len(set_numbers))
+            entry_sets = numbers[line_sets.ravel()][entries.entry_lines]
+            entry_values = entries.entry_values
+
+            is_objective = entry_rows < 0
+            if np.any(is_objective):
+                first_set = is_objective & (entry_sets == 0)
+                if np.any(first_set):
+                    self.obj_constant = -float(entry_values[first_set][-1])
+                keep = ~is_objective
+                entry_sets, entry_rows, entry_values = entry_sets[keep], entry_rows[keep], entry_values[keep]
+            rows.extend(entry_rows)
+            sets.extend(entry_sets)
+            values.extend(entry_values)
+
+        # A value given twice for the same row and set keeps the last one
+        num_rows = len(self.row_names)
+        keys = sets.view() * num_rows + rows.view()
+        _, last = np.unique(keys[::-1], return_index=True)
+        kept = len(keys) - 1 - last
+        self.b_sets = sparse.csc_array((values.view()[kept], (rows.view()[kept], sets.view()[kept])),
+                                       shape=(num_rows, len(set_numbers)))
+        self.rhs_names = NamePool.from_bytes(list(set_numbers))
+        self.b = self.b_sets[:, [0]].toarray().ravel() if set_numbers else np.zeros(num_rows)
+
+    def _parse_ranges(self, chunks: Iterator[_Chunk]) -> None:
+        # RANGES section: The range of every row of the first RANGES set (the others are ignored, as by most solvers),
+        # tokenized like the RHS section. Ranges of the objective row are meaningless and ignored.
+        first_set: Optional[bytes] = None
+        for chunk in chunks:
+            entries, entry_rows = _tokenize_lookup(chunk, self.mps_format, self._row_table)
+            if not len(entries.line_names):
+                continue
+            if first_set is None:
+                first_set = bytes(entries.line_names[0])
+            keep = (entries.line_names[entries.entry_lines] == first_set) & (entry_rows >= 0)
+            self.ranges[entry_rows[keep]] = entries.entry_values[keep]
+
+    def _parse_bounds(self, chunks: Iterator[_Chunk]) -> None:
+        # BOUNDS section: Parse variable bounds and store them as arrays. In "auto" format the section is read as
+        # free MPS and, if that fails and its lines fit the fixed columns, again as fixed MPS (as the COLUMNS blocks)
+        lines = list(_iter_lines(chunks))
+        if self.mps_format != "fixed":
+            try:
+                self.Bounds = self._bounds_of([line.split() for line in lines])
+                return
+            except (ValueError, KeyError, IndexError):
+                if self.mps_format == "free" or not _is_fixed_layout("\n".join(lines).encode()):
+                    raise
+        # Fixed MPS: type, bound set, column and value at their columns, the names may contain spaces
+        fields = [[line[start:end].strip() for start, end in (_FIXED_TYPE, *_FIXED_FIELDS[:3])] for line in lines]
+        self.Bounds = self._bounds_of([a if a[3] else a[:3] for a in fields])
+
+    def _bounds_of(self, lines: list[list[str]]) -> BoundsArray:
+        # The bounds of the fields of the BOUNDS lines (type, bound set, column and optional value)
+        kinds: list[int] = []
+        columns: list[bytes] = []
+        texts: list[str] = []
+        for a in lines:
+            kinds.append(BOUND_CODES[a[0]])
+            columns.append(a[2].encode())
+            texts.append(a[3] if len(a) > 3 else "None")  # "None" marks a bound with no explicit value
+
+        # The column names are looked up and the values converted at once, their texts are kept for the writers
+        column_names = np.array(columns) if columns else np.empty(0, dtype="S1")
+        return BoundsArray.from_texts(kinds, self.col_names.lookup(column_names), texts)
+
+def iter_column_blocks(input_file_path: str, block_size: int = BLOCK_COLUMNS, use_mmap: bool = False,
+                       workers: int = 1, stats: Optional[ParseStats] = None,
+                       mps_format: str = "auto") -> Iterator[ColumnBlock]:
+    """
+    Streams an .mps file and yields the constraint matrix `A` in blocks of `block_size` columns,
+    each with its slice of the objective function coefficients `c`.
+
+    Only about one block of columns is held in memory at a time, so the blocks can be processed
+    (or written out) before the whole model has been read. Use `MpsStream` to also get the rest of the model.
+
+    Parameters:
+    -----------
+    input_file_path : str
+        The path to the .mps file to be parsed.
+    block_size : int
+        The number of columns of each block (the last block may be smaller).
+    use_mmap : bool
+        If True the file is memory mapped instead of read as a stream (see `parse_mps_file`).
+    workers : int
+        The number of processes that parse the COLUMNS section (see `MpsStream`).
+    stats : Optional[ParseStats]
+        Collects the measurements of every section (see `MpsStream`).
+    mps_format : str
+        The layout of the data lines (one of `MPS_FORMATS`, see `parse_mps_file`).
+
+    Yields:
+    -------
+    ColumnBlock
+        The blocks of columns, in order.
+    """
+    with MpsStream(input_file_path, block_size, use_mmap, workers, stats, mps_format) as stream:
+        yield from stream.column_blocks()
+
+
+def objective_list(c: np.ndarray, has_cost: np.ndarray) -> list[float]:
+    """
+    The objective function coefficients as the list `parse_mps_file` returns: the float values of the columns with
+    an entry in the objective function row and an int 0 for the others (written as "0" by `save_txt_file`).
+    """
+    values = c.astype(object)
+    values[~has_cost] = 0
+    return list(values.tolist())
+
+
+def _assemble_A(values: np.ndarray, rows: np.ndarray, col_counts: np.ndarray, num_rows: int,
+                A_format: str) -> Union[sparse.csr_array, sparse.csc_array, sparse.coo_array]:
+    """
+    Builds `A` in `A_format` from the arrays collected by `parse_mps_file` (taking them over, not copying them),
+    with its exact shape: `num_rows` rows (the rows of the ROWS section, including the trailing rows without
+    entries) and a column per column of the COLUMNS section (including the ones with only an objective coefficient).
+    The indices are int32 if the shape and the number of non-zeros allow it, int64 otherwise.
+    """
+    num_cols = len(col_counts)
+    index_dtype = np.int32 if max(num_rows, num_cols, len(values)) < 2**31 else np.int64
+    rows = rows.astype(index_dtype, copy=False)
+    if A_format == "coo":
+        cols = np.repeat(np.arange(num_cols, dtype=index_dtype), col_counts)
+        return sparse.coo_array((values, (rows, cols)), shape=(num_rows, num_cols))
+
+    # Cumulative number of non-zeros in each column
+    A_cols = np.zeros(num_cols + 1, dtype=index_dtype)
+    np.cumsum(col_counts, out=A_cols[1:])
+    # Compressed sparse column format (CSC), converted to CSR format if requested
+    A_sparse_csc = sparse.csc_array((values, rows, A_cols), shape=(num_rows, num_cols))
+    if A_format == "csc":
+        return A_sparse_csc
+    return A_sparse_csc.tocsr()
+
+
+def _A_arrays(A: Union[sparse.csr_array, sparse.csc_array, sparse.coo_array]) -> Tuple[np.ndarray, ...]:
+    # The arrays that hold `A`
+    if isinstance(A, sparse.coo_array):
+        return (A.data, A.row, A.col)
+    return (A.data, A.indices, A.indptr)
+
+
+def to_A_format(A: Any, A_format: str) -> Union[sparse.csr_array, sparse.csc_array, sparse.coo_array]:
+    """
+    Converts a sparse matrix to one of `A_FORMATS` (without a copy if it is in that format already).
 
-def parse_mps_file(input_file_path: str) -> dict:
+    Raises:
+    -------
+    ValueError:
+        If `A_format` is not one of `A_FORMATS`.
+    """
+    if A_format == "csr":
+        return sparse.csr_array(A)
+    if A_format == "csc":
+        return sparse.csc_array(A)
+    if A_format == "coo":
+        return sparse.coo_array(A)
+    raise ValueError(f"Unknown format {A_format!r}, expected one of {A_FORMATS}")
+
+
+def range_bounds(b: Any, Eqin: Any, ranges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The lower and upper limits of the rows, given their right-hand sides, types and RANGES values (as returned by
+    `parse_mps_file`). For a row with range R: "L" rows get [b - |R|, b], "G" rows [b, b + |R|] and "E" rows
+    [b, b + R] or [b + R, b] depending on the sign of R. Without a range the limits are [-inf, b], [b, inf] and [b, b].
+
+    Parameters:
+    -----------
+    b : array_like
+        The right-hand sides, a vector or an (m x k) block of RHS sets (e.g. `b_sets.toarray()`), which then gives
+        (m x k) limits.
+    Eqin : array_like
+        The type of every row (-1 for <=, 0 for =, 1 for >=).
+    ranges : np.ndarray
+        The RANGES value of every row, NaN for the rows without one.
+
+    Returns:
+    --------
+    Tuple[np.ndarray, np.ndarray]
+        The lower and upper limits, with the shape of `b`.
+    """
+    b = np.asarray(b, dtype=float)
+    Eqin = np.asarray(Eqin).reshape(-1, *([1] * (b.ndim - 1)))
+    ranges = np.asarray(ranges, dtype=float).reshape(Eqin.shape)
+    has_range = ~np.isnan(ranges)
+    R = np.where(has_range, ranges, 0.0)
+
+    lower = np.where(Eqin == -1, np.where(has_range, b - np.abs(R), -np.inf), b)
+    upper = np.where(Eqin == 1, np.where(has_range, b + np.abs(R), np.inf), b)
+    # Equality rows are widened on the side of the sign of their range
+    lower = np.where((Eqin == 0) & (R < 0), b + R, lower)
+    upper = np.where((Eqin == 0) & (R > 0), b + R, upper)
+    return lower, upper
+
+
+def parse_mps_file(input_file_path: str, use_mmap: bool = False, workers: int = 1,
+                   stats: Optional[ParseStats] = None, A_format: str = "csr", mps_format: str = "auto",
+                   validate: bool = False) -> dict:
     """
     Parses the content of an .mps file and returns its components in a structured format. 
     The function extracts information related to constraints, objective function, bounds, and matrix data, 
@@ -93,196 +1402,177 @@ def parse_mps_file(input_file_path: str) -> dict:
     Parameters:
     input_file_path : str
         The path to the .mps file to be parsed.
+    use_mmap : bool
+        If True the file is memory mapped instead of read as a stream. The sections are located by scanning
+        the raw bytes and the COLUMNS section is tokenized straight from the map, without copying it,
+        so multi-GB files can be parsed with a memory budget of about the size of the parsed data.
+    workers : int
+        The number of processes that parse the COLUMNS section. With more than one worker the file is
+        memory mapped, the COLUMNS section is split in byte ranges at column name transitions and each range
+        is parsed in a process pool. Sections smaller than `PARALLEL_MIN_BYTES` are parsed in this process.
+    stats : Optional[ParseStats]
+        Collects the wall and CPU time, lines, bytes read, non-zeros and output size of every section, plus an
+        "assemble" section for building the matrix (see `parse_stats`). None skips all the measurements.
+    A_format : str
+        The sparse format of the returned `A` (one of `A_FORMATS`). "csc" and "coo" return the arrays the
+        matrix is built in, without the sorting copy of the conversion to "csr" (`save_mps_file` takes CSC).
+    mps_format : str
+        The layout of the data lines (one of `MPS_FORMATS`). "free" splits them at blanks, "fixed" reads their
+        fields at the byte columns of fixed MPS (so names may contain spaces), and "auto" reads every block
+        of lines as free MPS, falling back to fixed MPS for a block that fails to parse and fits the fixed columns.
+        Names with spaces are kept by `save_txt_file` (one name per line); `matrix_to_mps.save_mps_file` writes
+        free MPS and raises ValueError for them, the model is then written without its names.
+    validate : bool
+        If True the parsed model is checked with `model_checks.check_model` (the sizes of A, b, c, Eqin and the
+        names agree, the indices of A and the columns of the bounds are in range) in O(nnz), without copies.
 
     Returns:
     dict: A dictionary containing the parsed data from the .mps file with the following keys:    
         - 'MinMax' (int): Indicates if the problem is a minimization (-1) or maximization (1).
-        - 'A' (scipy.sparse.csr_matrix): The constraint matrix `A` stored in CSR (Compressed Sparse Row) format.
-        - 'b' (np.ndarray): The right-hand side vector `b` for the constraints.
+        - 'A' (scipy.sparse.csr_array): The constraint matrix `A` stored in CSR (Compressed Sparse Row) format,
+          or in the format given by `A_format`. The indices are int32 when they fit.
+        - 'b' (np.ndarray): The right-hand side vector `b` for the constraints (the first RHS set).
         - 'c' (list[float]): The coefficient vector `c` for the objective function.
         - 'Eqin' (list[int]): A list indicating the equality type of each constraint (-1 for <=, 0 for =, 1 for >=).
-        - 'Bounds' (list[str]): A list of bounds for variables extracted from the BOUNDS section of the file.
+        - 'Bounds' (BoundsArray): The bounds of the BOUNDS section as arrays of type codes, columns and values.
+          It is also a sequence of the former "TYPE column value" strings.
+        - 'row_names' (NamePool): The names of the constraint rows, in the order of the rows of `A`.
+        - 'col_names' (NamePool): The names of the columns of `A`, in order.
+        - 'b_sets' (scipy.sparse.csc_array): Every RHS set of the file as a column of an (m x k) matrix, so that
+          several scenarios can be solved against one `A` (the first column is `b`).
+        - 'rhs_names' (NamePool): The names of the RHS sets, in the order of the columns of `b_sets`.
+        - 'ranges' (np.ndarray): The RANGES value of every row (of the first RANGES set), NaN for the rows
+          without one. See `range_bounds` for the interval it gives.
+        - 'obj_constant' (float): The constant of the objective function, minus the value of the objective row
+          in the first RHS set (0 if it has none).
+        - 'integrality' (np.ndarray): Whether each column is an integer variable, i.e. lies between
+          `'MARKER' 'INTORG'` and `'MARKER' 'INTEND'` lines (bool per column; BV, LI and UI bounds stay in 'Bounds').
 
     Notes:
     - The function uses the CSC (Compressed Sparse Column) format to build the matrix `A` before converting it to CSR format for easier row access.
+    - The arrays of `A` are preallocated from the size of the COLUMNS section and trimmed in place at the end,
+      so without the conversion to CSR the parse holds about one copy of the matrix.
+    - The COLUMNS section is read in blocks of `COLUMNS_CHUNK_SIZE` bytes and each block is tokenized with NumPy at once.
+    - The file is read through `MpsStream`, the blocks of columns it yields are collected into `A`.
+    - Files compressed with gzip, bz2 or xz (detected by extension or magic bytes) are decompressed by a background
+      thread while they are parsed, always as a stream (`use_mmap` and `workers` are ignored).
     - The MPS file format is a fixed-width format, and this parser assumes well-formed MPS files.
     - Sections such as 'ROWS', 'COLUMNS', 'RHS', and 'BOUNDS' are processed accordingly.
-    - `MinMax` is inferred based on the problem name (if indicated in the first line).
+    - `MinMax` is given by the OBJSENSE section, or by a problem name ending with "(MAX)".
     
     Raises:
     -------
     KeyError:
         If a key error occurs when referencing unknown rows or columns in the MPS file.
+    ValueError:
+        If `A_format` is not one of `A_FORMATS`, `mps_format` is not one of `MPS_FORMATS`, a line is malformed or
+        (with `validate`) the parsed model is inconsistent.
     """
+    if A_format not in A_FORMATS:
+        raise ValueError(f"Unknown format {A_format!r}, expected one of {A_FORMATS}")
+
+    # Stream the file and collect the blocks of columns of A
+    with MpsStream(input_file_path, BLOCK_COLUMNS, use_mmap, workers, stats, mps_format) as stream:
+        # Initialize variables to store matrix components and other data
+        # Compressed Sparse Column (CSC), preallocated for the estimated number of entries (the pages that
+        # are never written are never touched). The row indices are int32 if the rows can be numbered with it.
+        capacity = max(stream.columns_size_hint // ENTRY_BYTES_ESTIMATE, 1024)
+        A_values = _TypedBuffer(np.float64, capacity)   # Stores non-zero values in the matrix A
+        A_rows = _TypedBuffer(np.int32 if len(stream.row_names) < 2**31 else np.int64, capacity)  # Row indices
+        col_counts = _TypedBuffer(np.int64)   # Stores the number of non-zeros in each column
+        c = _TypedBuffer(np.float64)          # Objective function coefficients
+        has_cost = _TypedBuffer(np.bool_)     # Whether the columns have an objective function entry
+
+        for block in stream.column_blocks():
+            A_values.extend(block.A.data)
+            A_rows.extend(block.A.indices)
+            col_counts.extend(np.diff(block.A.indptr))
+            c.extend(block.c)
+            has_cost.extend(block.has_cost)
+        stream.finish()
 
-    
-    # Initialize variables to store matrix components and other data
-    # Compressed Sparse Column (CSC)        
-    A_values: list[float] = []  # Stores non-zero values in the matrix A
-    A_rows: list[int] = []      # Stores row indices of non-zero values in A
-    A_cols: list[int] = []      # Stores cumulative number of non-zeros in each column
-    A_cols_names: dict[str, int] = {}  # Maps column names to their respective indices
-    last_column_name: str = ""   # Tracks the last processed column name
-    nnz: int = 0                 # Counter for non-zero elements in matrix A
-    current_row: int
-    current_col: int = -1        # Tracks the current column index in A
-    zeros_in_c_in_a_row: int = 0  # Tracks consecutive zeros in the objective function vector c
-
-
-    # Initialize vectors and other data structures
-    b: np.ndarray
-    c: list[float] = []          # Objective function coefficients
-    Eqin: list[int] = []         # Stores equality type for each constraint (<=, =, >=)
-    MinMax: int = -1             # Default is minimization (-1), can be updated for maximization
-    Bounds: list[str] = []       # Stores variable bounds extracted from the BOUNDS section
-
-    # Helper dictionary to convert 'L', 'E', 'G' in ROWS section to numerical values
-    convert_dict = {"L": -1, "E": 0, "G": 1}
-    
-    # Problem metadata
-    problem_name: str = ""
-    objective_fun: str = ""      # Name of the objective function
-    num_of_restrains: int = 0    # Number of constraints (rows)
-    Restrains_names: dict[str, int] = {}  # Maps row names to row indices
-
-    # Variable to keep track of the current section in the .mps file
-    current_section = None
-
+    print("Parsing Completed")
+    section = stats.begin("assemble") if stats is not None else None
+    A = _assemble_A(A_values.release(), A_rows.release(), col_counts.view(), len(stream.row_names), A_format)
+    if stats is not None and section is not None:
+        section.nbytes = int(sum(array.nbytes for array in _A_arrays(A)))
+        stats.end(section)
 
-    # Open the input file and start processing line by line
-    with open(input_file_path, 'r') as file:
-        for line in file:
-            # Ignore comment lines (starting with '*') and empty lines
-            if line.startswith('*') or line.strip() == '':
-                continue
+    # Return the parsed data as a dictionary
+    parsed_data = {"MinMax":stream.MinMax, "A":A , "b":stream.b , "c":objective_list(c.view(), has_cost.view()) , "Eqin":stream.Eqin , "Bounds":stream.Bounds,
+                   "row_names":stream.row_names, "col_names":stream.col_names, "b_sets":stream.b_sets,
+                   "rhs_names":stream.rhs_names, "ranges":stream.ranges, "obj_constant":stream.obj_constant,
+                   "integrality":stream.integrality}
+    if validate:
+        check_model(parsed_data)
+    return parsed_data
 
-            # Check if the line indicates a new section in the .mps file
-            if line.startswith(("NAME", "ROWS", "COLUMNS", "RHS", "BOUNDS", "RANGES", "ENDATA")):
-                if line.startswith("NAME"):
-                    # NAME section: Get the problem name and infer if it's a maximization problem
-                    current_section = "NAME"
-                    problem_name = line.split()[1]  # Extract the problem name
-                    if len(line.split()) == 3:
-                        MinMax = 1  # If there's an indicator for maximization
-                elif line.startswith("ROWS"):
-                    current_section = "ROWS"  # Transition to ROWS section
-                elif line.startswith("COLUMNS"):
-                    current_section = "COLUMNS"  # Transition to COLUMNS section
-                elif line.startswith("RHS"):
-                    b = np.zeros(num_of_restrains)  # Initialize the RHS vector b
-                    current_section = "RHS"  # Transition to RHS section
-                elif line.startswith("BOUNDS"):
-                    current_section = "BOUNDS"  # Transition to BOUNDS section
-                elif line.startswith("RANGES"):
-                    current_section = "RANGES"  # RANGES section (not handled in detail here)
-                elif line.startswith("ENDATA"):
-                    break  # End of file marker, stop processing
-            else:
-                # Process data based on the current section
-                if current_section == "ROWS":
-                    # ROWS section: Determine the equality type and set up constraint row mapping
-                    a = line.split()
-                    try:
-                        # Add the equality type (L/E/G) and map row names to indices
-                        Eqin.append( convert_dict[a[0]] ) 
-                        Restrains_names[a[1]] = num_of_restrains
-                        num_of_restrains += 1
-                    except KeyError as e :
-                        #  EAFP (Easier to Ask for Forgiveness than Permission)
-                        if str(e) == "'N'": # 'N' indicates the objective function row
-                            objective_fun = a[1]
-                        else:
-                            raise   # Re-raise any unexpected KeyErrors
-                elif current_section == "COLUMNS":
-                    # COLUMNS section: Parse the matrix A and objective function coefficients
-                    
-                    a = line.strip().split() 
-                    #  Current column is current_col
-                    #  a[0] is the column name (variable name ie X1) 
-                    #  Current row is current_row
-                    #  a[1] is the row name (restrictions)
-                    #  a[2] is the value (coefficient of X1)
-                    #  a[3] is the row name (restrictions)   (if they exist)
-                    #  a[4] is the value (coefficient of X1) (if they exist)
-                    if a[0] != last_column_name :
-                         # New column detected, update column index and track its start position
-                        last_column_name = a[0]
-                        current_col += 1 
-                        A_cols_names[a[0]] = current_col
-                        A_cols.append(nnz)
-                        zeros_in_c_in_a_row += 1
-
-                    
-                    # Add matrix elements or update the objective function c
-                    try:
-                        current_row = Restrains_names[a[1]]
-                        A_values.append(float(a[2])) # Add value to A
-                        A_rows.append(current_row) # Add row index for the value
-                        nnz += 1  # Increment non-zero counter
-                    except KeyError as e:
-                        if str(e) == "'" + objective_fun + "'" :
-                            # Update the objective function coefficient for the current column
-                            c.extend([0] * (zeros_in_c_in_a_row-1)) # Fill in missing zeros
-                            # c[current_col] = float(a[2])
-                            zeros_in_c_in_a_row = 0 
-                            c.append(float(a[2])) # Add the coefficient value
-                        else:
-                            raise  # Re-raise the exception if it's a different key
-
-                    # Handle possible second value in the same line (optional column entry)
-                    try:
-                        current_row = Restrains_names[a[3]]
-                        A_values.append(float(a[4])) # Add another value to A
-                        A_rows.append(current_row) # Add row index for the value
-                        nnz += 1  # Increment non-zero counter
-                    except KeyError as e:
-                        if str(e) == "'" + objective_fun + "'":
-                            # c[current_col] = float(a[4])
-                            c.extend([0] * (zeros_in_c_in_a_row-1))
-                            zeros_in_c_in_a_row = 0 
-                            c.append(float(a[4]))  # Add second coefficient value
-                        else:
-                            raise  # Re-raise the exception if it's a different key
-                    except IndexError:
-                        pass # Handle cases where second entry is missing
-                elif current_section == "RHS":
-                    # RHS section: Assign values to the right-hand side vector b
-                    a = line.strip().split() 
-                    
-                    b[Restrains_names[a[1]]] = float(a[2])  # Assign value to the appropriate row
-                    try:
-                        b[Restrains_names[a[3]]] = float(a[4]) # Handle optional second value
-                    except IndexError:
-                        pass
-                elif current_section == "BOUNDS":      
-                    # BOUNDS section: Parse variable bounds and store them              
-                    a = line.split()  # Split the line into a list of strings
-                    if len(a) == 3:
-                        a_string = f"{a[0]} {A_cols_names[a[2]]} None" # Bound with no explicit value
-                    else:
-                        a_string = f"{a[0]} {A_cols_names[a[2]]} {a[3]}" # Bound with value
-
-                    # Append the string to the Bounds list
-                    Bounds.append(a_string) 
-                else:
-                    continue
 
+def _format_dense_rows(A: sparse.csr_array) -> Iterator[str]:
+    """
+    Formats the rows of `A` as the dense "A=[" section, one block of rows (about `TXT_BLOCK_ELEMENTS` elements) at a time.
+    Every element is right aligned in 11 characters and separated by two spaces, like f"{elem:>11}".
 
-    # Finalize column data and add last index to A_cols
-    A_cols.append(nnz)
-    c.extend([0] * zeros_in_c_in_a_row) # Ensure the objective function has all coefficients
+    Most elements are zeros, so a block is a byte grid of 13 byte cells filled with the formatted zero, and only
+    the non-zeros are formatted and copied into it. Values longer than 11 characters break the fixed width,
+    the blocks that contain one are joined as strings instead.
+    """
+    num_rows, num_cols = A.shape
+    rows_per_block = max(1, TXT_BLOCK_ELEMENTS // max(num_cols, 1))
+    cell = np.frombuffer(f"{A.dtype.type(0):>11}  ".encode(), dtype=np.uint8)
+    for first in range(0, num_rows, rows_per_block):
+        block = A[first:first + rows_per_block]
+        block_rows = block.shape[0]
+        if num_cols == 0:
+            yield "\n" * block_rows
+            continue
+
+        grid = np.tile(cell, (block_rows, num_cols, 1))
+        if block.nnz:
+            # astype(str) formats floats like str(), so the output matches the f-string formatting
+            texts = np.char.rjust(block.data.astype(str), 11)
+            if texts.dtype.itemsize > 11 * 4:
+                dense = np.char.rjust(block.toarray().astype(str), 11).tolist()
+                yield "".join("  ".join(row) + "\n" for row in dense)
+                continue
 
+            rows = np.repeat(np.arange(block_rows), np.diff(block.indptr))
+            cells = np.frombuffer(texts.astype("S11").tobytes(), dtype=np.uint8).reshape(-1, 11)
+            grid[rows, block.indices, :11] = cells
+        grid[:, -1, 11] = ord("\n")  # The separator after the last element of a row becomes the line end
+        yield grid.reshape(block_rows, -1)[:, :-1].tobytes().decode("ascii")
 
-    print("Parsing Completed")
-    # Convert matrix A to compressed sparse column format (CSC) and then to CSR format for efficiency    
-    A_sparse_csc = sparse.csc_array((A_values,A_rows,A_cols)) 
-    A_sparse_csr = A_sparse_csc.tocsr()
 
-    # Return the parsed data as a dictionary
-    return {"MinMax":MinMax, "A":A_sparse_csr , "b":b , "c":c , "Eqin":Eqin , "Bounds":Bounds}
+def _format_triplet_rows(A: sparse.csr_array) -> Iterator[str]:
+    """
+    Formats the non-zeros of `A` as "row col value" lines (0-based indices, row by row), one block at a time.
+    """
+    coo = A.tocoo()
+    for first in range(0, coo.nnz, TXT_BLOCK_ELEMENTS):
+        part = slice(first, first + TXT_BLOCK_ELEMENTS)
+        lines = np.char.add(np.char.add(np.char.add(np.char.add(
+            coo.row[part].astype(str), " "), coo.col[part].astype(str)), " "), coo.data[part].astype(str))
+        yield "\n".join(lines.tolist()) + "\n"
 
 
-def save_txt_file(file_path: str , MinMax:int , A : sparse.csr_array , b: np.ndarray , c: list[float], Eqin: list[int] , Bounds:list[str] ) -> None:
+def _format_index_rows(A: sparse.csr_array) -> Iterator[str]:
+    """
+    Formats every row of `A` as a line of "col:value" pairs (0-based columns), an empty row as an empty line.
+    """
+    num_rows = A.shape[0]
+    rows_per_block = max(1, TXT_BLOCK_ELEMENTS // max(A.nnz // max(num_rows, 1), 1))
+    for first in range(0, num_rows, rows_per_block):
+        block = A[first:first + rows_per_block]
+        pairs = np.char.add(np.char.add(block.indices.astype(str), ":"), block.data.astype(str)).tolist()
+        indptr = block.indptr.tolist()
+        yield "".join(" ".join(pairs[indptr[i]:indptr[i + 1]]) + "\n" for i in range(len(indptr) - 1))
+
+
+def save_txt_file(file_path: str , MinMax:int , A : sparse.csr_array , b: np.ndarray , c: list[float], Eqin: list[int] , Bounds: Union[BoundsArray, list[str]], layout: str = "dense",
+                  row_names: Optional[Sequence[str]] = None, col_names: Optional[Sequence[str]] = None,
+                  b_sets: Optional[sparse.csc_array] = None, rhs_names: Optional[Sequence[str]] = None,
+                  ranges: Optional[np.ndarray] = None, obj_constant: float = 0.0,
+                  integrality: Optional[np.ndarray] = None) -> None:
     """
     Saves the linear programming problem data to a text file in a structured format, including the constraint matrix, 
     objective function, bounds, and constraint types.
@@ -290,7 +1580,7 @@ def save_txt_file(file_path: str , MinMax:int , A : sparse.csr_array , b: np.nda
     Parameters:
     -----------
     file_path : str
-        The path where the text file will be saved.
+        The path where the text file will be saved. A path ending with .gz, .bz2 or .xz is compressed while it is written.
     MinMax : int
         Indicates whether the problem is a minimization (-1) or maximization (1).
     A : sparse.csr_array
@@ -301,40 +1591,56 @@ def save_txt_file(file_path: str , MinMax:int , A : sparse.csr_array , b: np.nda
         The coefficients of the objective function.
     Eqin : list[int]
         List indicating the type of each constraint (-1 for <=, 0 for =, 1 for >=).
-    Bounds : list[str]
-        List of bounds for variables, if any.
+    Bounds : Union[BoundsArray, list[str]]
+        The bounds of the variables, if any (a `BoundsArray` or "TYPE column value" strings).
+    layout : str
+        How `A` is written (one of `TXT_LAYOUTS`):
+        - "dense": every element, one row per line ("A=[" section).
+        - "triplets": one "row col value" line per non-zero ("A_triplets=[ m n" section).
+        - "rows": one line of "col:value" pairs per row ("A_rows=[ m n" section).
+        Indices are 0-based. The sparse layouts grow with the non-zeros instead of m*n and are meant for large models.
+    row_names, col_names : Optional[Sequence[str]]
+        The names of the rows and columns (e.g. the `NamePool`s of `parse_mps_file`), written in the "RowNames=["
+        and "ColNames=[" sections so that `matrix_to_mps` can write the .mps file back with the original names.
+    b_sets, rhs_names, ranges, obj_constant, integrality :
+        The other RHS sets, the ranges, the objective constant and the integrality of `parse_mps_file`, accepted so that its
+        dictionary can be passed as is. The .txt format has no place for them, they are not written.
 
     Returns:
     --------
     None
 
+    Raises:
+    -------
+    ValueError
+        If `layout` is not one of `TXT_LAYOUTS`.
+
     Notes:
     ------
-    - The constraint matrix `A` is written as a dense matrix with appropriate formatting.
-    - The bounds section is only written if the `Bounds` list is not empty.
+    - The matrix is formatted in large blocks with NumPy and every block is written with a single call.
+    - The bounds section is only written if the `Bounds` list is not empty, the name sections only if names are given.
+    - `matrix_to_mps.parse_file` reads all layouts.
     
     Example:
     --------
-    >>> save_txt_file("output.txt", MinMax, A_sparse, b, c, Eqin, Bounds)
+    >>> save_txt_file("output.txt", MinMax, A_sparse, b, c, Eqin, Bounds, layout="triplets")
     """
-    with open(file_path, "w") as file:  # Open a file in write mode
+    if layout not in TXT_LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {TXT_LAYOUTS}")
+
+    A = sparse.csr_array(A)
+    with open_output(file_path) as file:  # Open a file in write mode (compressed for .gz, .bz2 and .xz paths)
 
         # Write A 
-        file.write("A=[\n")  # Start the matrix format
-        for i in range(A.shape[0]):  # Iterate over rows
-            row_start = A.indptr[i]
-            row_end = A.indptr[i + 1]
-            col_indices = A.indices[row_start:row_end]
-            data = A.data[row_start:row_end]
-            
-            # Initialize an empty row and fill with zeros
-            row = np.zeros(A.shape[1], dtype=A.dtype)
-            
-            # Place the non-zero elements into the row
-            row[col_indices] = data
-            
-            # Write the formatted row to the file
-            file.write("  ".join(f"{elem:>11}" for elem in row) + "\n")
+        if layout == "dense":
+            file.write("A=[\n")  # Start the matrix format
+            file.writelines(_format_dense_rows(A))
+        elif layout == "triplets":
+            file.write(f"A_triplets=[ {A.shape[0]} {A.shape[1]}\n")  # The shape can't be inferred from the non-zeros
+            file.writelines(_format_triplet_rows(A))
+        else:
+            file.write(f"A_rows=[ {A.shape[0]} {A.shape[1]}\n")
+            file.writelines(_format_index_rows(A))
         
         file.write("]\n\n")  # Close the matrix format
 
@@ -352,7 +1658,12 @@ def save_txt_file(file_path: str , MinMax:int , A : sparse.csr_array , b: np.nda
 
         # Write BS if they exist
         if Bounds :
-            file.write("BS=[\n " + "\n ".join(Bounds) + "\n]\n")  # Format and write all values in one go
+            file.write("BS=[\n " + "\n ".join(as_bounds(Bounds).to_strings()) + "\n]\n")  # Format and write all values in one go
+
+        # Write the names, they need no formatting
+        for header, names in (("RowNames=[", row_names), ("ColNames=[", col_names)):
+            if names is not None and len(names):
+                file.write(f"\n{header}\n " + "\n ".join(names) + "\n]\n")
 
 
 def main() -> None:
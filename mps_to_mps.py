@@ -0,0 +1,131 @@
+# Direct .mps -> .mps rewriting, e.g. to normalize a model to the ROW<i> / COL<j> names of `save_mps_file`
+# without going through a .txt file:
+#   parse_mps_file -> save_txt_file (dense, O(m*n)) -> parse_file -> save_mps_file
+# becomes a single streaming pass: the columns parsed by `MpsStream` are formatted block by block, in their
+# CSC layout, by the writers of `save_mps_file`, so the time and memory are linear in the size of the model.
+#
+# Usage:
+#   python mps_to_mps.py model.mps canonical.mps                 # ROW<i> / COL<j> names
+#   python mps_to_mps.py model.mps rewritten.mps --keep-names    # The original names, in the layout of save_mps_file
+
+import argparse
+import os
+import time
+from typing import NamedTuple, TextIO
+
+import numpy as np
+
+from compressed_io import open_output
+from matrix_to_mps import (MARKER_INTEND, WRITE_BUFFER_SIZE, _format_columns, _integer_after, _name_table,
+                           _objective_name, _write_mps_rhs_bounds, _write_mps_rows)
+from mps_to_matrix import BLOCK_COLUMNS, MPS_FORMATS, MpsStream
+
+
+class RewriteResult(NamedTuple):
+    """
+    The size of a rewritten model.
+    """
+    num_rows: int
+    num_columns: int
+    nnz: int
+
+
+def rewrite_mps_file(input_file_path: str, output_file_path: str, keep_names: bool = False, use_mmap: bool = False,
+                     workers: int = 1, block_size: int = BLOCK_COLUMNS, mps_format: str = "auto") -> RewriteResult:
+    """
+    Rewrites an .mps file in the layout of `matrix_to_mps.save_mps_file`, one block of columns at a time.
+    Every RHS set (with its original name), the ranges, the objective constant and the integer MARKER runs are kept.
+    The output is the same as `save_mps_file(output_file_path, **parse_mps_file(input_file_path))` (without the
+    names unless `keep_names`), but the matrix is never converted to CSR and back, nor held in memory as a whole.
+
+    Parameters:
+    -----------
+    input_file_path : str
+        The .mps file to read (it may be compressed, see `compressed_io.open_input`).
+    output_file_path : str
+        The .mps file to write, compressed if it ends with .gz, .bz2 or .xz.
+    keep_names : bool
+        If True the original row and column names are kept, otherwise the rows are named ROW0, ROW1, ...
+        and the columns COL0, COL1, ... The names of a fixed MPS file may contain blanks, which the free MPS
+        output can't hold: such a name raises ValueError (the row names before anything is written).
+    use_mmap, workers, block_size, mps_format :
+        How the input is parsed (see `mps_to_matrix.MpsStream`).
+
+    Returns:
+    --------
+    RewriteResult
+        The number of rows, columns and non-zeros written.
+
+    Raises:
+    -------
+    KeyError:
+        If an entry or a bound of the input references an unknown row or column.
+    ValueError:
+        If `keep_names` is True and a name is empty or has blanks. The partly written output is removed, as
+        it is on any other error.
+    """
+    with MpsStream(input_file_path, block_size, use_mmap, workers, mps_format=mps_format) as stream:
+        # The row names are checked before the output is created
+        num_rows = len(stream.row_names)
+        row_table = _name_table("ROW", num_rows, stream.row_names if keep_names else None)
+        file = open_output(output_file_path, WRITE_BUFFER_SIZE)
+        try:
+            with file:
+                nnz = _rewrite_stream(stream, file, keep_names, row_table)
+        except BaseException:
+            os.remove(output_file_path)
+            raise
+    return RewriteResult(num_rows, stream.num_columns, nnz)
+
+
+def _rewrite_stream(stream: MpsStream, file: TextIO, keep_names: bool, row_table: np.ndarray) -> int:
+    # Writes the model of `stream` (positioned at its COLUMNS section) to `file`, returns the number of non-zeros
+    nnz = 0
+    obj_name = _objective_name(row_table)
+    _write_mps_rows(file, stream.MinMax, stream.Eqin, row_table, obj_name)
+
+    file.write("COLUMNS\n")
+    integer = False  # Whether a run of integer columns is open at the end of the blocks written so far
+    for block in stream.column_blocks():
+        # The entries of a column are written by row, like the CSC matrix of parse_mps_file
+        A = block.A.sorted_indices() if not block.A.has_sorted_indices else block.A
+        col_table = _name_table("COL", A.shape[1], block.names if keep_names else None, block.first_column)
+        file.writelines(_format_columns(A, block.c, col_table, row_table, obj_name, block.integer, integer))
+        integer = _integer_after(A, block.c, block.integer, integer)
+        nnz += A.nnz
+    if integer:
+        file.write(MARKER_INTEND)
+    stream.finish()
+
+    # Only the names of the columns that have bounds are needed
+    bounds = stream.Bounds
+    if keep_names:
+        bound_col_names = np.char.decode(stream.col_names.to_bytes_array()[bounds.columns], "utf-8").astype(object)
+    else:
+        bound_col_names = np.char.add("COL", bounds.columns.astype(str)).astype(object)
+    # The RHS sets keep their names (they name scenarios, not rows or columns)
+    _write_mps_rhs_bounds(file, stream.b, row_table, bounds, bound_col_names, stream.b_sets, stream.rhs_names,
+                          stream.ranges, stream.obj_constant, obj_name)
+    return nnz
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rewrite an .mps file in the canonical layout of save_mps_file.")
+    parser.add_argument("input", help="The .mps file to read")
+    parser.add_argument("output", help="The .mps file to write")
+    parser.add_argument("--keep-names", action="store_true", help="Keep the original row and column names")
+    parser.add_argument("--mmap", action="store_true", help="Memory map the input")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Processes that parse the COLUMNS section")
+    parser.add_argument("--format", choices=MPS_FORMATS, default="auto", help="Free or fixed MPS (default: auto)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = rewrite_mps_file(args.input, args.output, args.keep_names, args.mmap, args.workers,
+                              mps_format=args.format)
+    print(f"{args.output}: {result.num_rows} rows, {result.num_columns} columns, {result.nnz} non-zeros "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+# Compact storage for the row and column names of a linear program.
+#
+# A million names as Python `str` objects (plus the dict that maps them to indices) take well over 100 MB.
+# A `NamePool` keeps all the names in one contiguous bytes buffer with an offsets array (about the size of
+# the names themselves plus 8 bytes per name) and looks names up with a sorted table of 64-bit hashes that
+# is built the first time it is needed.
+
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union, overload
+
+import numpy as np
+
+# A table of names sorted by hash: the hashes, the names and the index each name maps to
+NameTable = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def name_keys(names: np.ndarray) -> np.ndarray:
+    """
+    Hashes a bytes array of names to uint64 keys. Names of up to 8 bytes are mapped to distinct keys.
+    """
+    width = -(-names.dtype.itemsize // 8) * 8
+    words = names.astype(f"S{width}").view(np.uint64).reshape(-1, width // 8)
+    keys: np.ndarray = words[:, 0].copy()
+    for j in range(1, words.shape[1]):
+        keys *= np.uint64(0x9E3779B97F4A7C15)
+        keys ^= words[:, j]
+    return keys
+
+
+def build_name_table(names: np.ndarray, indices: np.ndarray) -> NameTable:
+    """
+    Builds a table of the bytes array `names` sorted by their `name_keys` hash, for looking up many names at once
+    with `lookup_names`. `indices` are the values the names map to.
+    """
+    keys = name_keys(names)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], names[order], np.asarray(indices, dtype=np.int64)[order]
+
+
+def lookup_names(table: NameTable, names: np.ndarray) -> np.ndarray:
+    """
+    Returns the index of every name of the bytes array `names` in a table built by `build_name_table`.
+
+    Raises:
+    -------
+    KeyError:
+        If a name is not in the table.
+    """
+    sorted_keys, sorted_names, sorted_indices = table
+    if len(sorted_keys) == 0:
+        if len(names):
+            raise KeyError(names[0].decode())
+        return np.empty(0, dtype=np.int64)
+
+    keys = name_keys(names)
+    if len(sorted_keys) > 1 and not np.all(sorted_keys[1:] != sorted_keys[:-1]):
+        # Two names of the table share a hash, look up by name instead
+        order = np.argsort(sorted_names, kind="stable")
+        sorted_keys, sorted_names, sorted_indices = sorted_names[order], sorted_names[order], sorted_indices[order]
+        keys = names
+
+    position = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    missing = sorted_names[position] != names
+    if missing.any():
+        raise KeyError(names[np.argmax(missing)].decode())
+    indices: np.ndarray = sorted_indices[position]
+    return indices
+
+
+class NamePool(Sequence):
+    """
+    An immutable sequence of names stored in one bytes buffer:
+        pool    : uint8 array with the UTF-8 bytes of all the names, one after the other
+        offsets : int64 array, name i is pool[offsets[i]:offsets[i + 1]]
+
+    Indexing and iterating give `str` names, `lookup` maps many names to their indices at once.
+    A `NamePool` equals a list of the same names.
+    """
+
+    def __init__(self, pool: Union[bytes, np.ndarray] = b"", offsets: Optional[Iterable[int]] = None) -> None:
+        self.pool = np.frombuffer(pool, dtype=np.uint8) if isinstance(pool, bytes) else np.asarray(pool, np.uint8)
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        self._table: Optional[NameTable] = None
+
+    @classmethod
+    def from_bytes(cls, names: Sequence[bytes]) -> "NamePool":
+        # From a sequence of encoded names (e.g. the tokens of a line), without decoding them
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, names), dtype=np.int64, count=len(names)), out=offsets[1:])
+        return cls(b"".join(names), offsets)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "NamePool":
+        return cls.from_bytes([name.encode() for name in names])
+
+    @classmethod
+    def from_bytes_array(cls, names: np.ndarray) -> "NamePool":
+        """
+        From a NumPy bytes ('S') array, such as the tokens gathered by the .mps tokenizer.
+        """
+        if names.size == 0:
+            return cls()
+        width = names.dtype.itemsize
+        lengths = np.char.str_len(names).astype(np.int64)
+        characters = np.ascontiguousarray(names).view(np.uint8).reshape(-1, width)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(characters[np.arange(width) < lengths[:, None]], offsets)
+
+    @classmethod
+    def concatenate(cls, pools: Iterable["NamePool"]) -> "NamePool":
+        pools = list(pools)
+        if not pools:
+            return cls()
+        sizes = np.cumsum([0] + [len(pool.pool) for pool in pools[:-1]])
+        offsets = np.concatenate([pools[0].offsets[:1]] + [pool.offsets[1:] + size for pool, size in zip(pools, sizes)])
+        return cls(np.concatenate([pool.pool for pool in pools]), offsets)
+
+    @property
+    def nbytes(self) -> int:
+        # Memory used by the names (the hash table, once built, takes about 3 times more)
+        return int(self.pool.nbytes + self.offsets.nbytes)
+
+    def to_bytes_array(self) -> np.ndarray:
+        """
+        The names as a NumPy bytes array, as wide as the longest name.
+        """
+        lengths = np.diff(self.offsets)
+        width = max(int(lengths.max(initial=0)), 1)
+        characters = np.zeros((len(self), width), dtype=np.uint8)
+        mask = np.arange(width) < lengths[:, None]
+        characters[mask] = self.pool[(self.offsets[:-1, None] + np.arange(width))[mask]]
+        return characters.view(f"S{width}").ravel()
+
+    def to_list(self) -> list[str]:
+        data = self.pool.tobytes()
+        offsets = self.offsets.tolist()
+        return [data[offsets[i]:offsets[i + 1]].decode() for i in range(len(offsets) - 1)]
+
+    def to_dict(self) -> dict[str, int]:
+        # The former name -> index dictionary
+        return {name: index for index, name in enumerate(self.to_list())}
+
+    def lookup(self, names: Union[np.ndarray, Iterable[str]]) -> np.ndarray:
+        """
+        The indices of many names at once (a bytes array or strings). A repeated name maps to its first index.
+
+        Raises:
+        -------
+        KeyError:
+            If a name is not in the pool.
+        """
+        if not isinstance(names, np.ndarray):
+            names = np.array([name.encode() for name in names], dtype="S1" if not names else None)
+        if self._table is None:
+            self._table = build_name_table(self.to_bytes_array(), np.arange(len(self)))
+        return lookup_names(self._table, names)
+
+    def index(self, name: Any, start: int = 0, stop: Optional[int] = None) -> int:
+        # Hash lookup instead of the linear search of Sequence.index
+        try:
+            position = int(self.lookup([name])[0])
+        except KeyError:
+            raise ValueError(f"{name!r} is not in the pool") from None
+        if position < start or (stop is not None and position >= stop):
+            return int(super().index(name, start, len(self) if stop is None else stop))
+        return position
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        try:
+            self.lookup([name])
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "NamePool": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "NamePool"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return NamePool.from_names(self.to_list()[index])
+            stop = max(start, stop)
+            offsets = self.offsets[start:stop + 1]
+            return NamePool(self.pool[offsets[0]:offsets[-1]], offsets - offsets[0])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("name index out of range")
+        return bytes(self.pool[self.offsets[index]:self.offsets[index + 1]]).decode()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_list())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, NamePool):
+            return np.array_equal(self.offsets, other.offsets) and np.array_equal(self.pool, other.pool)
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __getstate__(self) -> dict:
+        # The hash table is rebuilt when needed instead of being pickled (e.g. to worker processes)
+        return {"pool": self.pool, "offsets": self.offsets}
+
+    def __setstate__(self, state: dict) -> None:
+        self.pool, self.offsets, self._table = state["pool"], state["offsets"], None
+
+    def __repr__(self) -> str:
+        return f"NamePool({len(self)} names, {self.nbytes} bytes)"
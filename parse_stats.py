@@ -0,0 +1,143 @@
+# Per-section instrumentation of the parsers (mps_to_matrix.parse_mps_file and matrix_to_mps.parse_file).
+#
+# Usage:
+#   stats = ParseStats()
+#   parsed_data = parse_mps_file("model.mps", stats=stats)
+#   print(stats.report())                      # One line per section: wall / CPU time, lines, bytes, non-zeros
+#
+#   parse_mps_file("model.mps", stats=ParseStats(callback=logger.info))   # Log every section as soon as it is parsed
+#
+# Without a `ParseStats` the parsers skip all the counting, so the instrumentation costs nothing when it is off.
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+class SectionStats:
+    """
+    The measurements of one section of a parse. The times are accumulated over `start` / `stop` pairs,
+    so a section that is parsed in several pieces (e.g. COLUMNS, read in blocks) adds them up.
+    """
+    __slots__ = ("name", "wall_seconds", "cpu_seconds", "lines", "bytes_read", "nonzeros", "nbytes",
+                 "_wall_start", "_cpu_start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wall_seconds = 0.0    # Elapsed time
+        self.cpu_seconds = 0.0     # CPU time of this process (worker processes are not included)
+        self.lines = 0             # Data lines of the section
+        self.bytes_read = 0        # Size of the section in the file
+        self.nonzeros = 0          # Non-zero values of A found in the section
+        self.nbytes = 0            # Size of the arrays the section was parsed into
+        self._wall_start = self._cpu_start = 0.0
+
+    def start(self) -> None:
+        self._wall_start, self._cpu_start = time.perf_counter(), time.process_time()
+
+    def stop(self) -> None:
+        self.wall_seconds += time.perf_counter() - self._wall_start
+        self.cpu_seconds += time.process_time() - self._cpu_start
+
+    def count_lines(self, chunk: Any) -> None:
+        # Adds the lines and bytes of a block of complete lines (bytes or a memoryview)
+        data = bytes(chunk) if isinstance(chunk, memoryview) else chunk
+        self.lines += data.count(b"\n")
+        self.bytes_read += len(data)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith("_")}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Picklable, so that worker processes can send their measurements back
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"SectionStats({self.as_dict()})"
+
+
+class ParseStats:
+    """
+    Collects the `SectionStats` of a parse, in the order the sections were parsed.
+
+    Parameters:
+    -----------
+    callback : Optional[Callable[[SectionStats], Any]]
+        Called with the measurements of every section as soon as it is parsed (e.g. to log them).
+    """
+
+    def __init__(self, callback: Optional[Callable[[SectionStats], Any]] = None) -> None:
+        self.callback = callback
+        self.sections: list[SectionStats] = []
+
+    def begin(self, name: str) -> SectionStats:
+        """
+        Starts measuring a section. Every `begin` must be matched by an `end`.
+        """
+        section = SectionStats(name)
+        self.sections.append(section)
+        section.start()
+        return section
+
+    def end(self, section: SectionStats) -> None:
+        section.stop()
+        if self.callback is not None:
+            self.callback(section)
+
+    def add(self, section: SectionStats) -> None:
+        # Adds a section measured elsewhere (e.g. in a worker process)
+        self.sections.append(section)
+        if self.callback is not None:
+            self.callback(section)
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[SectionStats]:
+        section = self.begin(name)
+        try:
+            yield section
+        finally:
+            self.end(section)
+
+    def __getitem__(self, name: str) -> SectionStats:
+        # The first section with this name
+        for section in self.sections:
+            if section.name == name:
+                return section
+        raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return any(section.name == name for section in self.sections)
+
+    @property
+    def wall_seconds(self) -> float:
+        return sum(section.wall_seconds for section in self.sections)
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(section.cpu_seconds for section in self.sections)
+
+    def as_dicts(self) -> list[dict[str, Any]]:
+        # The measurements as JSON serializable dictionaries, e.g. for structured logs
+        return [section.as_dict() for section in self.sections]
+
+    def report(self) -> str:
+        """
+        The measurements as a table, one line per section and a total.
+        """
+        lines = [f"{'section':<12}{'wall (s)':>10}{'cpu (s)':>10}{'lines':>11}{'MB read':>10}{'nonzeros':>11}"
+                 f"{'MB out':>9}"]
+        for section in self.sections + [self._total()]:
+            lines.append(f"{section.name:<12}{section.wall_seconds:>10.4f}{section.cpu_seconds:>10.4f}"
+                         f"{section.lines:>11}{section.bytes_read / 2**20:>10.2f}{section.nonzeros:>11}"
+                         f"{section.nbytes / 2**20:>9.2f}")
+        return "\n".join(lines)
+
+    def _total(self) -> SectionStats:
+        total = SectionStats("total")
+        for name in ("wall_seconds", "cpu_seconds", "lines", "bytes_read", "nonzeros", "nbytes"):
+            setattr(total, name, sum(getattr(section, name) for section in self.sections))
+        return total